@@ -0,0 +1,250 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Sweeps the click worker across intervals, hold lengths, clicks per event and
+timing policies against a recording backend, then writes the measured
+percent error as JSON and optionally regenerates the README accuracy graph.
+Run with: python -m src.bench.accuracy --output results.json --graph graph.png
+"""
+
+import argparse
+import json
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.timerfd import WakeableEvent
+from src.core.timing import TimingEngine, TimingPolicy, seconds_to_ns
+
+DEFAULT_INTERVALS_MS: list[float] = [1, 2, 5, 9, 17, 33, 50, 100, 250, 500, 1000]
+DEFAULT_EVENT_COUNT: int = 100
+DEFAULT_POINT_BUDGET_SECONDS: float = 2.0
+MIN_EVENT_COUNT: int = 5
+
+
+class SweepPoint(NamedTuple):
+    """The measured accuracy of one combination of sweep inputs."""
+
+    timing_policy: str
+    interval_ms: float
+    hold_length_ms: float
+    clicks_per_event: int
+    event_count: int
+    mean_period_ms: float
+    mean_percent_error: float
+    max_percent_error: float
+
+
+def _event_count_for(interval_ms: float, event_count: int, budget: float) -> int:
+    """Returns how many events to measure so the point stays within the budget."""
+    if interval_ms <= 0:
+        return event_count
+    budget_events = int(budget * 1000 / interval_ms)
+    return max(MIN_EVENT_COUNT, min(event_count, budget_events))
+
+
+def measure_point(
+    timing_policy: TimingPolicy,
+    interval_ms: float,
+    hold_length_ms: float,
+    clicks_per_event: int,
+    event_count: int,
+) -> SweepPoint:
+    """Runs the click worker once and measures the period between its events."""
+    input_backend = RecordingBackend()
+    worker_inputs = WorkerInputs(
+        interval=interval_ms / 1000,
+        hold_length=hold_length_ms / 1000,
+        clicks_per_event=clicks_per_event,
+        event_count=event_count,
+        mouse_button=MouseButton.left,
+        location=(None, None),
+        is_using_location_x=False,
+        is_using_location_y=False,
+        is_using_held_clicks=hold_length_ms > 0,
+        is_continuous=False,
+        input_backend=input_backend,
+        timing_policy=timing_policy,
+    )
+    ClickWorker(WakeableEvent(), threading.Event()).start(worker_inputs)
+
+    presses = [
+        record.time_ns for record in input_backend.records if record.action == "press"
+    ]
+    event_times = presses[::clicks_per_event]
+    periods = [later - earlier for earlier, later in zip(event_times, event_times[1:])]
+
+    interval_ns = seconds_to_ns(interval_ms / 1000)
+    percent_errors = [
+        abs(period - interval_ns) / interval_ns * 100 for period in periods
+    ]
+
+    return SweepPoint(
+        timing_policy.name,
+        interval_ms,
+        hold_length_ms,
+        clicks_per_event,
+        event_count,
+        sum(periods) / len(periods) / 1e6,
+        sum(percent_errors) / len(percent_errors),
+        max(percent_errors),
+    )
+
+
+def run_sweep(arguments: argparse.Namespace) -> list[SweepPoint]:
+    """Measures every combination of the sweep inputs."""
+    points: list[SweepPoint] = []
+    for policy_name in arguments.policies:
+        for hold_length_ms in arguments.hold_lengths_ms:
+            for clicks_per_event in arguments.clicks_per_event:
+                for interval_ms in arguments.intervals_ms:
+                    event_count = _event_count_for(
+                        interval_ms, arguments.events, arguments.budget
+                    )
+                    point = measure_point(
+                        TimingPolicy[policy_name.upper()],
+                        interval_ms,
+                        hold_length_ms,
+                        clicks_per_event,
+                        event_count,
+                    )
+                    print(
+                        f"{point.timing_policy:<7} "
+                        f"interval={point.interval_ms:>7.1f}ms "
+                        f"hold={point.hold_length_ms:>5.1f}ms "
+                        f"clicks={point.clicks_per_event:<3} "
+                        f"error={point.mean_percent_error:>7.3f}% "
+                        f"(max {point.max_percent_error:.3f}%)"
+                    )
+                    points.append(point)
+    return points
+
+
+def compare_to_baseline(points: list[SweepPoint], baseline_path: Path) -> None:
+    """Prints the change in mean percent error against a previous result file."""
+    baseline = {
+        (
+            row["timing_policy"],
+            row["interval_ms"],
+            row["hold_length_ms"],
+            row["clicks_per_event"],
+        ): row
+        for row in json.loads(baseline_path.read_text(encoding="utf-8"))
+    }
+    for point in points:
+        row = baseline.get(point[:4])
+        if row is None:
+            continue
+        change = point.mean_percent_error - row["mean_percent_error"]
+        print(
+            f"{point.timing_policy:<7} interval={point.interval_ms:>7.1f}ms "
+            f"baseline={row['mean_percent_error']:>7.3f}% "
+            f"current={point.mean_percent_error:>7.3f}% change={change:+.3f}%"
+        )
+
+
+def write_graph(points: list[SweepPoint], graph_path: Path) -> None:
+    """Plots the mean percent error for each interval, one line per sweep series."""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        from matplotlib import pyplot
+    except ImportError:
+        print("Skipping graph, matplotlib is not installed")
+        return
+
+    series: dict[str, list[SweepPoint]] = {}
+    for point in points:
+        label = point.timing_policy.title()
+        if point.hold_length_ms or point.clicks_per_event != 1:
+            label += (
+                f" (hold {point.hold_length_ms}ms, {point.clicks_per_event} clicks)"
+            )
+        series.setdefault(label, []).append(point)
+
+    figure, axes = pyplot.subplots(figsize=(9.8, 6.3))
+    for label, series_points in series.items():
+        axes.plot(
+            [point.interval_ms for point in series_points],
+            [point.mean_percent_error for point in series_points],
+            marker="o",
+            label=label,
+        )
+    axes.set_xscale("log")
+    axes.set_xlabel("Interval (ms)")
+    axes.set_ylabel("Percent Error (%)")
+    axes.set_title("Clikr Interval Percent Error")
+    axes.grid(True, which="both", alpha=0.3)
+    axes.legend()
+    figure.tight_layout()
+    figure.savefig(graph_path)
+    print(f"Wrote graph to {graph_path}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Parses the arguments, runs the sweep and writes the results."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--intervals-ms", nargs="+", type=float, default=DEFAULT_INTERVALS_MS
+    )
+    parser.add_argument("--hold-lengths-ms", nargs="+", type=float, default=[0])
+    parser.add_argument("--clicks-per-event", nargs="+", type=int, default=[1])
+    parser.add_argument(
+        "--policies",
+        nargs="+",
+        choices=[policy.name.lower() for policy in TimingPolicy],
+        default=[policy.name.lower() for policy in TimingPolicy],
+    )
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENT_COUNT)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_POINT_BUDGET_SECONDS,
+        help="approximate seconds to spend measuring each point",
+    )
+    parser.add_argument("--output", type=Path, help="path to write the JSON results")
+    parser.add_argument("--graph", type=Path, help="path to write the error graph")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare to")
+    arguments = parser.parse_args(argv)
+    if any(interval_ms <= 0 for interval_ms in arguments.intervals_ms):
+        parser.error("intervals must be greater than 0ms")
+
+    TimingEngine.calibrate()
+    points = run_sweep(arguments)
+
+    if arguments.output is not None:
+        arguments.output.write_text(
+            json.dumps([point._asdict() for point in points], indent=2),
+            encoding="utf-8",
+        )
+        print(f"Wrote results to {arguments.output}")
+
+    if arguments.baseline is not None:
+        compare_to_baseline(points, arguments.baseline)
+
+    if arguments.graph is not None:
+        write_graph(points, arguments.graph)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmarks the click throughput of each input backend.
+Run headless under Xvfb with: xvfb-run python -m src.bench.backends
+"""
+
+import argparse
+import time
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import (
+    InputBackendError,
+    InputBackendType,
+    create_input_backend,
+)
+
+DEFAULT_CLICK_COUNT: int = 10_000
+
+
+def benchmark_backend(backend_type: InputBackendType, click_count: int) -> float:
+    """Returns the clicks per second achieved by the provided backend type."""
+    input_backend = create_input_backend(backend_type)
+    try:
+        start_time = time.perf_counter_ns()
+        for _ in range(click_count):
+            input_backend.click(MouseButton.left)
+            input_backend.flush()
+        elapsed_ns = time.perf_counter_ns() - start_time
+    finally:
+        input_backend.close()
+    return click_count / (elapsed_ns / 1e9)
+
+
+def main() -> None:
+    """Parses the arguments and prints the throughput of each backend."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clicks", type=int, default=DEFAULT_CLICK_COUNT)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend_type.name.lower() for backend_type in InputBackendType],
+        default=[backend_type.name.lower() for backend_type in InputBackendType],
+    )
+    arguments = parser.parse_args()
+
+    for backend_name in arguments.backends:
+        backend_type = InputBackendType[backend_name.upper()]
+        try:
+            clicks_per_second = benchmark_backend(backend_type, arguments.clicks)
+        except InputBackendError as error:
+            print(f"{backend_type.name:<8} unavailable: {error}")
+            continue
+        print(
+            f"{backend_type.name:<8} {clicks_per_second:>12.0f} clicks/s "
+            f"{1e6 / clicks_per_second:>9.2f}us/click"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compares the interval jitter of the in-thread click engine against the
+process-isolated click engine while background threads in this process
+simulate UI repaints, logging and hook callbacks competing for the GIL.
+Run with: python -m src.bench.jitter --interval-ms 5 --events 1000
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.click_worker import ClickWorkerManager, WorkerInputs
+from src.core.process_engine import ProcessClickWorkerManager
+from src.core.telemetry import TelemetryStats
+
+DEFAULT_INTERVAL_MS: float = 5.0
+DEFAULT_EVENT_COUNT: int = 1000
+DEFAULT_LOAD_THREADS: int = 4
+LOAD_SLICE_SECONDS: float = 0.002
+POLL_SECONDS: float = 0.05
+
+
+class JitterResult(NamedTuple):
+    """The measured jitter of one engine mode under one load."""
+
+    mode: str
+    load_threads: int
+    event_count: int
+    p50_jitter_ms: float
+    p99_jitter_ms: float
+    max_overrun_ms: float
+    clicks_per_second: float
+
+
+def _simulate_ui_load(stop_event: threading.Event) -> None:
+    """Holds the GIL with bursts of Python work, like repaints and log formatting."""
+    logger = logging.getLogger("clikr.bench.load")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    while not stop_event.is_set():
+        slice_end = time.perf_counter() + LOAD_SLICE_SECONDS
+        while time.perf_counter() < slice_end:
+            logger.info("%s", ",".join(str(value) for value in range(64)))
+        time.sleep(LOAD_SLICE_SECONDS)
+
+
+def measure_mode(
+    use_engine_process: bool, interval_ms: float, event_count: int, load_threads: int
+) -> JitterResult:
+    """Runs one engine mode for the provided number of events under load."""
+    if use_engine_process:
+        manager: ClickWorkerManager | ProcessClickWorkerManager = (
+            ProcessClickWorkerManager(lambda: None)
+        )
+    else:
+        manager = ClickWorkerManager(lambda: None)
+
+    worker_inputs = WorkerInputs(
+        interval=interval_ms / 1000,
+        hold_length=0.0,
+        clicks_per_event=1,
+        event_count=event_count,
+        mouse_button=MouseButton.left,
+        location=(None, None),
+        is_using_location_x=False,
+        is_using_location_y=False,
+        is_using_held_clicks=False,
+        is_continuous=False,
+        input_backend=RecordingBackend(record=False),
+    )
+
+    stop_event = threading.Event()
+    load = [
+        threading.Thread(target=_simulate_ui_load, args=(stop_event,), daemon=True)
+        for _ in range(load_threads)
+    ]
+    for thread in load:
+        thread.start()
+
+    try:
+        manager.start(worker_inputs)
+        while manager.is_running:
+            time.sleep(POLL_SECONDS)
+        stats: TelemetryStats = manager.telemetry.stats
+    finally:
+        stop_event.set()
+        for thread in load:
+            thread.join()
+        manager.shutdown()
+
+    return JitterResult(
+        "process" if use_engine_process else "thread",
+        load_threads,
+        stats.event_count,
+        stats.p50_jitter_ns / 1e6,
+        stats.p99_jitter_ns / 1e6,
+        stats.max_overrun_ns / 1e6,
+        stats.clicks_per_second,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Parses the arguments, measures both engine modes and prints the results."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--interval-ms", type=float, default=DEFAULT_INTERVAL_MS)
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENT_COUNT)
+    parser.add_argument(
+        "--load-threads", nargs="+", type=int, default=[0, DEFAULT_LOAD_THREADS]
+    )
+    parser.add_argument("--output", type=Path, help="path to write the JSON results")
+    arguments = parser.parse_args(argv)
+    if arguments.interval_ms <= 0:
+        parser.error("interval must be greater than 0ms")
+
+    results: list[JitterResult] = []
+    for load_threads in arguments.load_threads:
+        for use_engine_process in (False, True):
+            result = measure_mode(
+                use_engine_process,
+                arguments.interval_ms,
+                arguments.events,
+                load_threads,
+            )
+            print(
+                f"{result.mode:<8} load={result.load_threads:<3} "
+                f"p50={result.p50_jitter_ms:>7.3f}ms "
+                f"p99={result.p99_jitter_ms:>7.3f}ms "
+                f"max={result.max_overrun_ms:>7.3f}ms "
+                f"{result.clicks_per_second:>8.1f} CPS"
+            )
+            results.append(result)
+
+    if arguments.output is not None:
+        arguments.output.write_text(
+            json.dumps([result._asdict() for result in results], indent=2),
+            encoding="utf-8",
+        )
+        print(f"Wrote results to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measures how accurately the click job engine keeps many concurrent jobs on
+their schedules. Jobs with random intervals, held clicks and bursts share one
+recording backend and one engine thread, and the timing error of every job's
+events is summarised per job count.
+Run with: python -m src.bench.jobs --job-counts 1 16 64 128
+"""
+
+import argparse
+import random
+import time
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.click_worker import WorkerInputs
+from src.core.jobs import ClickJobEngine, JobStats
+from src.core.timing import TimingEngine, TimingPolicy
+
+DEFAULT_JOB_COUNTS: list[int] = [1, 16, 64]
+DEFAULT_DURATION_SECONDS: float = 5.0
+MIN_INTERVAL_MS: float = 5.0
+MAX_INTERVAL_MS: float = 50.0
+HELD_JOB_FRACTION: float = 0.25
+BURST_JOB_FRACTION: float = 0.25
+HOLD_LENGTH_MS: float = 2.0
+BURST_CLICKS: int = 3
+BURST_SPACING_MS: float = 1.0
+
+
+def _job_inputs(
+    job_index: int, input_backend: RecordingBackend, timing_policy: TimingPolicy
+) -> WorkerInputs:
+    """Returns the inputs of a continuous job with a random interval and click style."""
+    style = random.random()
+    is_held = style < HELD_JOB_FRACTION
+    is_burst = not is_held and style < HELD_JOB_FRACTION + BURST_JOB_FRACTION
+    return WorkerInputs(
+        interval=random.uniform(MIN_INTERVAL_MS, MAX_INTERVAL_MS) / 1000,
+        hold_length=HOLD_LENGTH_MS / 1000 if is_held else 0.0,
+        clicks_per_event=BURST_CLICKS if is_burst else 1,
+        event_count=None,
+        mouse_button=MouseButton.left,
+        location=(job_index, job_index),
+        is_using_location_x=True,
+        is_using_location_y=True,
+        is_using_held_clicks=is_held,
+        is_continuous=True,
+        input_backend=input_backend,
+        timing_policy=timing_policy,
+        burst_spacing=BURST_SPACING_MS / 1000 if is_burst else 0.0,
+    )
+
+
+def measure(
+    job_count: int, duration: float, timing_policy: TimingPolicy
+) -> list[JobStats]:
+    """Runs the provided number of jobs for the duration and returns their stats."""
+    input_backend = RecordingBackend(record=False)
+    engine = ClickJobEngine(timing_policy)
+    for job_index in range(job_count):
+        engine.add(_job_inputs(job_index, input_backend, timing_policy))
+    time.sleep(duration)
+    engine.shutdown()
+    return list(engine.job_stats.values())
+
+
+def main() -> None:
+    """Parses the arguments and prints the timing accuracy for each job count."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--job-counts", nargs="+", type=int, default=DEFAULT_JOB_COUNTS)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_SECONDS)
+    parser.add_argument(
+        "--policy",
+        choices=[policy.name.lower() for policy in TimingPolicy],
+        default=TimingEngine.DEFAULT_POLICY.name.lower(),
+    )
+    arguments = parser.parse_args()
+
+    for job_count in arguments.job_counts:
+        job_stats = measure(
+            job_count, arguments.duration, TimingPolicy[arguments.policy.upper()]
+        )
+        p50_jitters = sorted(stats.timing.p50_jitter_ns for stats in job_stats)
+        p99_jitters = sorted(stats.timing.p99_jitter_ns for stats in job_stats)
+        events = sum(stats.events for stats in job_stats)
+        late_slots = sum(stats.schedule.late_slots for stats in job_stats)
+        print(
+            f"jobs={job_count:<4} events={events:<7} "
+            f"events/s={events / arguments.duration:>8.1f} "
+            f"median_p50={p50_jitters[len(p50_jitters) // 2] / 1e6:>6.3f}ms "
+            f"median_p99={p99_jitters[len(p99_jitters) // 2] / 1e6:>6.3f}ms "
+            f"worst_p99={p99_jitters[-1] / 1e6:>6.3f}ms "
+            f"late_slots={late_slots}"
+        )
+
+
+if __name__ == "__main__":
+    main()
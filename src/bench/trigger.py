@@ -0,0 +1,176 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measures how quickly the pixel trigger turns a screen change into a click.
+A window over the watched region is repainted at random moments while the
+click worker waits on the region and clicks into a recording backend.
+Run headless under Xvfb with: xvfb-run python -m src.bench.trigger
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Any
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.screen import ScreenCaptureError, ScreenRegion
+from src.core.timerfd import WakeableEvent
+from src.core.trigger import DEFAULT_POLL_RATE, PixelTriggerSettings
+
+DEFAULT_CHANGE_COUNT: int = 100
+REGION: ScreenRegion = ScreenRegion(0, 0, 32, 32)
+TRIGGER_COLOUR: tuple[int, int, int] = (255, 0, 0)
+MIN_EVENT_GAP_SECONDS: float = 0.05
+MIN_CHANGE_DELAY_SECONDS: float = 0.08
+MAX_CHANGE_DELAY_SECONDS: float = 0.15
+CLICK_TIMEOUT_SECONDS: float = 1.0
+CLICK_POLL_SECONDS: float = 0.0002
+
+
+def _open_window(display: Any, region: ScreenRegion) -> Any:
+    """Maps an undecorated black window over the provided region."""
+    screen = display.screen()
+    window = screen.root.create_window(
+        region.x,
+        region.y,
+        region.width,
+        region.height,
+        0,
+        screen.root_depth,
+        background_pixel=screen.black_pixel,
+        override_redirect=True,
+    )
+    window.map()
+    display.sync()
+    return window
+
+
+def _paint(display: Any, window: Any, pixel: int) -> None:
+    """Fills the window with the provided pixel value and waits for the server."""
+    window.change_attributes(background_pixel=pixel)
+    window.clear_area()
+    display.sync()
+
+
+def _wait_for_press(input_backend: RecordingBackend, press_count: int) -> int:
+    """Returns the time of the press after the provided count, or -1 on timeout."""
+    timeout = time.perf_counter() + CLICK_TIMEOUT_SECONDS
+    while time.perf_counter() < timeout:
+        presses = [
+            record for record in input_backend.records if record.action == "press"
+        ]
+        if len(presses) > press_count:
+            return presses[press_count].time_ns
+        time.sleep(CLICK_POLL_SECONDS)
+    return -1
+
+
+def measure(poll_rate: float, change_count: int) -> list[int]:
+    """Returns the latency in nanoseconds from each screen change to its click."""
+    from Xlib.display import Display
+    from Xlib.error import DisplayError
+
+    try:
+        display = Display()
+    except DisplayError as error:
+        raise ScreenCaptureError(
+            f"could not connect to the X server: {error}"
+        ) from error
+    window = _open_window(display, REGION)
+    trigger_pixel = (
+        display.screen()
+        .default_colormap.alloc_color(*(channel * 257 for channel in TRIGGER_COLOUR))
+        .pixel
+    )
+    black_pixel = display.screen().black_pixel
+
+    input_backend = RecordingBackend()
+    worker_inputs = WorkerInputs(
+        interval=MIN_EVENT_GAP_SECONDS,
+        hold_length=0.0,
+        clicks_per_event=1,
+        event_count=change_count,
+        mouse_button=MouseButton.left,
+        location=(None, None),
+        is_using_location_x=False,
+        is_using_location_y=False,
+        is_using_held_clicks=False,
+        is_continuous=False,
+        input_backend=input_backend,
+        pixel_trigger=PixelTriggerSettings(REGION, TRIGGER_COLOUR, poll_rate=poll_rate),
+    )
+    stop_event = WakeableEvent()
+    click_worker = ClickWorker(stop_event, threading.Event())
+    worker_thread = threading.Thread(target=click_worker.start, args=(worker_inputs,))
+    worker_thread.start()
+
+    latencies: list[int] = []
+    try:
+        for press_count in range(change_count):
+            time.sleep(
+                random.uniform(MIN_CHANGE_DELAY_SECONDS, MAX_CHANGE_DELAY_SECONDS)
+            )
+            _paint(display, window, trigger_pixel)
+            change_time = time.perf_counter_ns()
+            press_time = _wait_for_press(input_backend, press_count)
+            _paint(display, window, black_pixel)
+            if press_time < 0:
+                print(f"change {press_count} was not clicked within the timeout")
+                break
+            latencies.append(press_time - change_time)
+    finally:
+        stop_event.set()
+        worker_thread.join()
+        window.destroy()
+        display.close()
+
+    print(f"worker trigger stats {click_worker.trigger_stats}")
+    return latencies
+
+
+def main() -> None:
+    """Parses the arguments and prints the change-to-click latency."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--changes", type=int, default=DEFAULT_CHANGE_COUNT)
+    parser.add_argument(
+        "--poll-rates", nargs="+", type=float, default=[DEFAULT_POLL_RATE]
+    )
+    arguments = parser.parse_args()
+
+    for poll_rate in arguments.poll_rates:
+        try:
+            latencies = sorted(measure(poll_rate, arguments.changes))
+        except (ImportError, ScreenCaptureError) as error:
+            print(f"pixel trigger unavailable: {error}")
+            return
+        if not latencies:
+            continue
+        print(
+            f"poll_rate={poll_rate:<7.1f} changes={len(latencies):<5} "
+            f"mean={sum(latencies) / len(latencies) / 1e6:>7.3f}ms "
+            f"p99={latencies[int(0.99 * (len(latencies) - 1))] / 1e6:>7.3f}ms "
+            f"max={latencies[-1] / 1e6:>7.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Headless runner for Clikr, which drives the click engine without the window
+or Qt. Run a fixed configuration from flags or a JSON config file with:
+    python -m src.cli run --interval-ms 50 --count 100
+    python -m src.cli run --config clicks.json
+Run several click configurations at once, each from its own config file, with:
+    python -m src.cli jobs FIRST.json SECOND.json
+Convert a CSV or JSON Lines click script once into a schedule file with:
+    python -m src.cli import SCRIPT SCHEDULE
+and run the schedule with:
+    python -m src.cli play SCHEDULE
+The run's statistics are printed at the end, and the exit code is 0 if the
+run completed, 1 if it failed and 130 if it was stopped by a signal.
+"""
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import (
+    InputBackend,
+    InputBackendError,
+    InputBackendType,
+    create_input_backend,
+)
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.errors import MacroError
+from src.core.holds import HoldController, HoldOverrunPolicy
+from src.core.jobs import ClickJobEngine
+from src.core.logs import setup_logging
+from src.core.pointer import PointerTracker
+from src.core.schedule import EventSchedule, OverrunPolicy
+from src.core.timerfd import WakeableEvent
+from src.core.timing import TimingEngine, TimingPolicy
+
+if TYPE_CHECKING:
+    from src.core.sequence import ClickSequence
+
+DEFAULT_BACKEND: InputBackendType = InputBackendType.PYNPUT
+DEFAULT_INTERVAL_MS: float = 100.0
+FAILED_EXIT_CODE: int = 1
+JOBS_POLL_SECONDS: float = 0.1
+STOPPED_EXIT_CODE: int = 130
+
+
+def _run_click_worker(worker_inputs: WorkerInputs) -> tuple[ClickWorker, int]:
+    """
+    Runs the click worker with the provided inputs on an engine thread until
+    it finishes, or until SIGINT or SIGTERM stops it, and returns the worker
+    with the exit code of the run.
+    """
+    stop_event = WakeableEvent()
+    completed_event = threading.Event()
+    click_worker = ClickWorker(
+        stop_event, threading.Event(), finished_callback=completed_event.set
+    )
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: stop_event.set())
+
+    worker_thread = threading.Thread(
+        target=click_worker.start, args=(worker_inputs,), name="ClickEngine"
+    )
+    worker_thread.start()
+    worker_thread.join()
+    worker_inputs.input_backend.close()
+    stop_event.close()
+
+    if completed_event.is_set():
+        return click_worker, 0
+    if stop_event.is_set():
+        logging.info("Click worker was stopped")
+        return click_worker, STOPPED_EXIT_CODE
+    return click_worker, FAILED_EXIT_CODE
+
+
+def _input_backend(arguments: argparse.Namespace) -> InputBackend:
+    """Returns the input backend named by the arguments."""
+    return create_input_backend(InputBackendType[arguments.backend.upper()])
+
+
+def _worker_inputs(
+    arguments: argparse.Namespace,
+    input_backend: InputBackend,
+    timing_policy: TimingPolicy,
+    sequence: Optional["ClickSequence"] = None,
+) -> WorkerInputs:
+    """Returns the click worker inputs described by the click arguments."""
+    interval = arguments.interval_ms / 1000
+    if arguments.cps is not None:
+        interval = arguments.clicks / arguments.cps
+    return WorkerInputs(
+        interval=interval,
+        hold_length=arguments.hold_ms / 1000,
+        clicks_per_event=arguments.clicks,
+        event_count=arguments.count or None,
+        mouse_button=MouseButton[arguments.button],
+        location=(arguments.x, arguments.y),
+        is_using_location_x=arguments.x is not None,
+        is_using_location_y=arguments.y is not None,
+        is_using_held_clicks=arguments.hold_ms > 0,
+        is_continuous=arguments.count == 0,
+        input_backend=input_backend,
+        timing_policy=timing_policy,
+        overrun_policy=OverrunPolicy[arguments.overrun_policy.upper()],
+        burst_spacing=arguments.burst_spacing_ms / 1000,
+        target_cps=arguments.cps,
+        pointer_revalidation_period=arguments.revalidation_period,
+        hold_overrun_policy=HoldOverrunPolicy[arguments.hold_overrun_policy.upper()],
+        sequence=sequence,
+    )
+
+
+def _run_clicks(arguments: argparse.Namespace) -> int:
+    """Runs the click configuration described by the arguments and returns the exit code."""
+    try:
+        sequence = None
+        if arguments.sequence is not None:
+            from src.core.sequence import ClickSequence, load_sequence
+
+            sequence = ClickSequence(load_sequence(arguments.sequence))
+        input_backend = _input_backend(arguments)
+    except (OSError, ValueError, InputBackendError) as error:
+        logging.error("Could not start the click worker: %s", error)
+        return FAILED_EXIT_CODE
+
+    worker_inputs = _worker_inputs(
+        arguments,
+        input_backend,
+        TimingPolicy[arguments.timing_policy.upper()],
+        sequence,
+    )
+    logging.info("Running click worker with inputs %s", worker_inputs)
+    click_worker, exit_code = _run_click_worker(worker_inputs)
+
+    print(f"timing={click_worker.telemetry.stats}")
+    print(f"schedule={click_worker.schedule_stats}")
+    if click_worker.first_click_latency_ns is not None:
+        print(f"first_click_latency={click_worker.first_click_latency_ns / 1e6:.3f}ms")
+    if click_worker.rate_stats is not None:
+        print(f"rate={click_worker.rate_stats}")
+    if click_worker.sequence_stats is not None:
+        print(f"sequence={click_worker.sequence_stats}")
+    return exit_code
+
+
+def _run_jobs(arguments: argparse.Namespace) -> int:
+    """
+    Runs every job config at once on the click job engine until they all
+    finish, or until SIGINT or SIGTERM stops them, and returns the exit code.
+    """
+    try:
+        input_backend = _input_backend(arguments)
+    except InputBackendError as error:
+        logging.error("Could not start the click jobs: %s", error)
+        return FAILED_EXIT_CODE
+
+    stop_event = threading.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: stop_event.set())
+
+    timing_policy = TimingPolicy[arguments.timing_policy.upper()]
+    job_engine = ClickJobEngine(timing_policy)
+    for config, job_arguments in zip(arguments.configs, arguments.jobs):
+        worker_inputs = _worker_inputs(job_arguments, input_backend, timing_policy)
+        job_id = job_engine.add(worker_inputs)
+        logging.info("Running click job %d from %s", job_id, config)
+    while not job_engine.wait_until_idle(JOBS_POLL_SECONDS):
+        if stop_event.is_set():
+            break
+    job_engine.shutdown()
+    input_backend.close()
+
+    job_stats = job_engine.job_stats
+    for stats in job_stats.values():
+        print(f"job={stats}")
+    if stop_event.is_set():
+        logging.info("Click jobs were stopped")
+        return STOPPED_EXIT_CODE
+    if not all(stats.is_finished for stats in job_stats.values()):
+        return FAILED_EXIT_CODE
+    return 0
+
+
+def _import_script(arguments: argparse.Namespace) -> int:
+    """Converts a click script into a schedule file and returns the exit code."""
+    from src.core.macro import convert_script
+
+    try:
+        event_count = convert_script(arguments.script, arguments.schedule)
+    except (OSError, ValueError) as error:
+        logging.error("Could not import the script: %s", error)
+        return FAILED_EXIT_CODE
+    logging.info("Imported %d events into %s", event_count, arguments.schedule)
+    return 0
+
+
+def _play_schedule(arguments: argparse.Namespace) -> int:
+    """Runs a schedule file through the click worker and returns the exit code."""
+    from src.core.macro import DEFAULT_SPEED, MacroFile, MacroSettings
+
+    try:
+        macro_file = MacroFile(arguments.schedule)
+        input_backend = _input_backend(arguments)
+    except (MacroError, InputBackendError) as error:
+        logging.error("Could not start the schedule: %s", error)
+        return FAILED_EXIT_CODE
+
+    worker_inputs = WorkerInputs(
+        interval=0.0,
+        hold_length=0.0,
+        clicks_per_event=1,
+        event_count=arguments.repeat or None,
+        mouse_button=MouseButton.left,
+        location=(None, None),
+        is_using_location_x=False,
+        is_using_location_y=False,
+        is_using_held_clicks=False,
+        is_continuous=arguments.repeat == 0,
+        input_backend=input_backend,
+        timing_policy=TimingPolicy[arguments.timing_policy.upper()],
+        macro=MacroSettings(macro_file.path, arguments.speed or DEFAULT_SPEED),
+    )
+    logging.info(
+        "Playing %d events from %s %s",
+        macro_file.event_count,
+        macro_file.path,
+        "until stopped" if arguments.repeat == 0 else f"{arguments.repeat} times",
+    )
+    click_worker, exit_code = _run_click_worker(worker_inputs)
+
+    if click_worker.macro_stats is not None:
+        print(f"schedule={click_worker.macro_stats}")
+    return exit_code
+
+
+def _config_arguments(path: Path) -> list[str]:
+    """
+    Returns the options of a JSON config file as command line arguments.
+    The file holds an object keyed by the long option names, with dashes or
+    underscores, where true enables a flag and a list passes several values.
+    Raises ValueError if the file cannot be read or is not a JSON object.
+    """
+    try:
+        config = json.loads(path.read_text())
+    except (OSError, ValueError) as error:
+        raise ValueError(f"could not read config {path}: {error}") from error
+    if not isinstance(config, dict):
+        raise ValueError(f"config {path} must hold a JSON object")
+
+    config_arguments: list[str] = []
+    for name, value in config.items():
+        option = "--" + name.removeprefix("--").replace("_", "-")
+        if value is True:
+            config_arguments.append(option)
+        elif isinstance(value, list):
+            config_arguments.extend([option, *map(str, value)])
+        elif value is not None and value is not False:
+            config_arguments.extend([option, str(value)])
+    return config_arguments
+
+
+def _add_engine_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments shared by every command that runs the click engine."""
+    parser.add_argument(
+        "--backend",
+        choices=[backend_type.name.lower() for backend_type in InputBackendType],
+        default=DEFAULT_BACKEND.name.lower(),
+        help="how the clicks are injected (null sends nothing, for dry runs)",
+    )
+    parser.add_argument(
+        "--timing-policy",
+        choices=[policy.name.lower() for policy in TimingPolicy],
+        default=TimingEngine.DEFAULT_POLICY.name.lower(),
+        help="how the click engine waits for each event (timerfd is Linux only)",
+    )
+
+
+def _add_click_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments that describe a click configuration."""
+    parser.add_argument(
+        "--interval-ms",
+        type=float,
+        default=DEFAULT_INTERVAL_MS,
+        help="the time between the starts of two click events",
+    )
+    parser.add_argument(
+        "--cps",
+        type=float,
+        help="a target rate in clicks per second, which replaces the interval",
+    )
+    parser.add_argument(
+        "--hold-ms", type=float, default=0.0, help="how long each click is held"
+    )
+    parser.add_argument(
+        "--clicks", type=int, default=1, help="how many clicks each event sends"
+    )
+    parser.add_argument(
+        "--burst-spacing-ms",
+        type=float,
+        default=0.0,
+        help="the time between the clicks of one event",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=0,
+        help="how many click events to run, or 0 to run until stopped",
+    )
+    parser.add_argument(
+        "--button",
+        choices=[
+            MouseButton.left.name,
+            MouseButton.middle.name,
+            MouseButton.right.name,
+        ],
+        default=MouseButton.left.name,
+        help="the mouse button to click",
+    )
+    parser.add_argument("--x", type=int, help="the x coordinate to click at")
+    parser.add_argument("--y", type=int, help="the y coordinate to click at")
+    parser.add_argument(
+        "--revalidation-period",
+        type=float,
+        default=PointerTracker.DEFAULT_REVALIDATION_PERIOD_SECONDS,
+        help=(
+            "how often in seconds a fixed location is checked against the real "
+            "pointer, so a pointer moved by someone else is moved back"
+        ),
+    )
+    parser.add_argument(
+        "--overrun-policy",
+        choices=[policy.name.lower() for policy in OverrunPolicy],
+        default=EventSchedule.DEFAULT_OVERRUN_POLICY.name.lower(),
+        help="how click events that were missed are handled",
+    )
+    parser.add_argument(
+        "--hold-overrun-policy",
+        choices=[policy.name.lower() for policy in HoldOverrunPolicy],
+        default=HoldController.DEFAULT_POLICY.name.lower(),
+        help="how held click events longer than the interval are handled",
+    )
+
+
+def _click_argument_error(arguments: argparse.Namespace) -> Optional[str]:
+    """Returns why the click arguments are invalid, or None if they are valid."""
+    if arguments.interval_ms <= 0 and arguments.cps is None:
+        return "--interval-ms must be greater than 0"
+    if arguments.cps is not None and arguments.cps <= 0:
+        return "--cps must be greater than 0"
+    if arguments.clicks < 1:
+        return "--clicks must be 1 or more"
+    if arguments.count < 0:
+        return "--count must be 0 or more"
+    if arguments.revalidation_period < 0:
+        return "--revalidation-period must be 0 or more"
+    return None
+
+
+def _job_arguments(parser: argparse.ArgumentParser, config: Path) -> argparse.Namespace:
+    """
+    Returns the click arguments read from a job config, which holds the same
+    options as a run config apart from the sequence and the engine options
+    shared by every job.
+    """
+    try:
+        config_arguments = _config_arguments(config)
+    except ValueError as error:
+        parser.error(str(error))
+    job_parser = argparse.ArgumentParser(prog=f"{parser.prog} jobs {config}")
+    _add_click_arguments(job_parser)
+    job_arguments = job_parser.parse_args(config_arguments)
+    click_argument_error = _click_argument_error(job_arguments)
+    if click_argument_error is not None:
+        job_parser.error(click_argument_error)
+    return job_arguments
+
+
+def _parse_arguments(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Returns the runner arguments parsed from the provided arguments or the
+    command line, with any config file's options applied first.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a fixed click configuration")
+    run_parser.add_argument(
+        "--config",
+        type=Path,
+        metavar="PATH",
+        help="a JSON object of these options, which the other flags override",
+    )
+    _add_click_arguments(run_parser)
+    run_parser.add_argument(
+        "--sequence",
+        type=Path,
+        metavar="PATH",
+        help="walk the steps of a CSV sequence file as each click event",
+    )
+    _add_engine_arguments(run_parser)
+    run_parser.set_defaults(run=_run_clicks)
+
+    jobs_parser = commands.add_parser(
+        "jobs", help="run several click configurations at once on one engine thread"
+    )
+    jobs_parser.add_argument(
+        "configs",
+        nargs="+",
+        type=Path,
+        metavar="CONFIG",
+        help=(
+            "a JSON object of run options for each job, apart from --sequence, "
+            "--backend and --timing-policy, which are shared by every job"
+        ),
+    )
+    _add_engine_arguments(jobs_parser)
+    jobs_parser.set_defaults(run=_run_jobs)
+
+    import_parser = commands.add_parser(
+        "import", help="convert a CSV or JSON Lines click script into a schedule file"
+    )
+    import_parser.add_argument(
+        "script",
+        type=Path,
+        help=(
+            "a CSV file with a header, or a .jsonl file, with columns time_ms or "
+            "time_ns, action, x, y, button and key"
+        ),
+    )
+    import_parser.add_argument("schedule", type=Path, help="the schedule file to write")
+    import_parser.set_defaults(run=_import_script)
+
+    play_parser = commands.add_parser("play", help="run a schedule file")
+    play_parser.add_argument("schedule", type=Path, help="the schedule file to run")
+    play_parser.add_argument(
+        "--speed",
+        type=float,
+        help="how many times faster than scheduled the events are sent",
+    )
+    play_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="how many times the schedule is run, or 0 to run it until stopped",
+    )
+    _add_engine_arguments(play_parser)
+    play_parser.set_defaults(run=_play_schedule)
+
+    if argv is None:
+        argv = sys.argv[1:]
+    arguments = parser.parse_args(argv)
+    if arguments.command == "run" and arguments.config is not None:
+        try:
+            config_arguments = _config_arguments(arguments.config)
+        except ValueError as error:
+            parser.error(str(error))
+        arguments = parser.parse_args(["run", *config_arguments, *argv[1:]])
+
+    match arguments.command:
+        case "run":
+            click_argument_error = _click_argument_error(arguments)
+            if click_argument_error is not None:
+                parser.error(click_argument_error)
+        case "jobs":
+            arguments.jobs = [
+                _job_arguments(parser, config) for config in arguments.configs
+            ]
+        case "play":
+            if arguments.speed is not None and arguments.speed <= 0:
+                parser.error("--speed must be greater than 0")
+            if arguments.repeat < 0:
+                parser.error("--repeat must be 0 or more")
+    return arguments
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Initializes logging and runs the command in the provided arguments,
+    or on the command line if there are none.
+    """
+    setup_logging()
+    arguments = _parse_arguments(argv)
+    sys.exit(arguments.run(arguments))
+
+
+if __name__ == "__main__":
+    main()
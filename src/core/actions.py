@@ -0,0 +1,100 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the bindable hotkey actions and their dispatcher for Clikr."""
+
+import logging
+import time
+from enum import IntEnum
+from typing import Callable, NamedTuple, Optional, override
+
+
+class HotkeyAction(IntEnum):
+    """Enum for the actions that can be bound to a hotkey."""
+
+    TOGGLE = 0
+    START = 1
+    STOP = 2
+    PAUSE_RESUME = 3
+    BURST_ONCE = 4
+    SWITCH_PROFILE = 5
+
+
+class ActionLatency(NamedTuple):
+    """How long an action's handler took from the hotkey press until it returned."""
+
+    dispatches: int
+    last_ns: int
+    mean_ns: float
+    max_ns: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the action latency."""
+        return (
+            f"(dispatches={self.dispatches}, "
+            f"last={self.last_ns / 1e3:.1f}us, "
+            f"mean={self.mean_ns / 1e3:.1f}us, "
+            f"max={self.max_ns / 1e3:.1f}us)"
+        )
+
+
+ActionHandler = Callable[[int], None]
+
+
+class ActionDispatcher:
+    """
+    Runs the handler of a hotkey action directly on the thread that detected
+    the hotkey and measures how long each action took to dispatch.
+    Handlers are stored in a list indexed by action, so each dispatch is a
+    single lookup, and receive the press time to measure latency further on.
+    """
+
+    def __init__(self, handlers: dict[HotkeyAction, ActionHandler]) -> None:
+        self.__handlers: list[Optional[ActionHandler]] = [
+            handlers.get(action) for action in HotkeyAction
+        ]
+        self.__dispatches: list[int] = [0] * len(HotkeyAction)
+        self.__last_ns: list[int] = [0] * len(HotkeyAction)
+        self.__total_ns: list[int] = [0] * len(HotkeyAction)
+        self.__max_ns: list[int] = [0] * len(HotkeyAction)
+
+    def latency(self, action: HotkeyAction) -> ActionLatency:
+        """Returns the dispatch latency of the provided action so far."""
+        dispatches = self.__dispatches[action]
+        mean_ns = self.__total_ns[action] / dispatches if dispatches else 0.0
+        return ActionLatency(
+            dispatches, self.__last_ns[action], mean_ns, self.__max_ns[action]
+        )
+
+    def dispatch(self, action: HotkeyAction) -> None:
+        """Runs the handler of the provided action and records its latency."""
+        press_time_ns = time.perf_counter_ns()
+        handler = self.__handlers[action]
+        if handler is None:
+            logging.debug("No handler for %s action", action.name)
+            return
+
+        try:
+            handler(press_time_ns)
+        except Exception:
+            logging.exception("Handler for %s action failed", action.name)
+
+        latency_ns = time.perf_counter_ns() - press_time_ns
+        self.__dispatches[action] += 1
+        self.__last_ns[action] = latency_ns
+        self.__total_ns[action] += latency_ns
+        self.__max_ns[action] = max(self.__max_ns[action], latency_ns)
+        logging.debug("Dispatched %s action in %.1fus", action.name, latency_ns / 1e3)
@@ -0,0 +1,559 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the input injection backends used by the Clikr click worker."""
+
+import logging
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from typing import Any, NamedTuple, Optional, override
+
+from pynput.keyboard import Controller as KeyboardController, KeyCode
+from pynput.mouse import Button as MouseButton, Controller as MouseController
+
+
+class InputBackendError(Exception):
+    """Raised when an input backend is unavailable on the current system."""
+
+
+class InputBackendType(IntEnum):
+    """Enum for the supported input injection backends."""
+
+    PYNPUT = 0
+    XTEST = 1
+    NULL = 2
+    UINPUT = 3
+
+
+class InputBackend(ABC):
+    """
+    Injects mouse input for the click worker, and keyboard input for
+    backends that support it.
+    Backends may queue requests until flush is called, which the click worker
+    does once per click event and before any wait that follows a press.
+    """
+
+    BACKEND_TYPE: InputBackendType
+
+    @property
+    @abstractmethod
+    def position(self) -> tuple[int, int]:
+        """Returns the current position of the mouse."""
+
+    @abstractmethod
+    def move(self, x: int, y: int) -> None:
+        """Moves the mouse to the provided position."""
+
+    @abstractmethod
+    def press(self, button: MouseButton) -> None:
+        """Presses the provided mouse button."""
+
+    @abstractmethod
+    def release(self, button: MouseButton) -> None:
+        """Releases the provided mouse button."""
+
+    def click(self, button: MouseButton) -> None:
+        """Presses and releases the provided mouse button."""
+        self.press(button)
+        self.release(button)
+
+    def click_burst(self, button: MouseButton, count: int) -> None:
+        """Presses and releases the provided mouse button the provided number of times."""
+        for _ in range(count):
+            self.click(button)
+
+    def press_key(self, key_code: int) -> None:
+        """
+        Presses the key with the provided platform virtual key code.
+        Raises InputBackendError if the backend cannot send key events.
+        """
+        raise InputBackendError(
+            f"The {self.BACKEND_TYPE.name.lower()} backend cannot send key events"
+        )
+
+    def release_key(self, key_code: int) -> None:
+        """
+        Releases the key with the provided platform virtual key code.
+        Raises InputBackendError if the backend cannot send key events.
+        """
+        raise InputBackendError(
+            f"The {self.BACKEND_TYPE.name.lower()} backend cannot send key events"
+        )
+
+    def flush(self) -> None:
+        """Sends any queued input requests."""
+
+    def close(self) -> None:
+        """Releases any resources held by the backend."""
+
+
+class PynputBackend(InputBackend):
+    """
+    Injects mouse input through a pynput mouse controller, and keyboard input
+    through a keyboard controller created on the first key event.
+    """
+
+    BACKEND_TYPE: InputBackendType = InputBackendType.PYNPUT
+
+    def __init__(self, mouse_controller: Optional[MouseController] = None) -> None:
+        self.__mouse_controller: MouseController = (
+            mouse_controller if mouse_controller is not None else MouseController()
+        )
+        self.__keyboard_controller: Optional[KeyboardController] = None
+
+    @property
+    @override
+    def position(self) -> tuple[int, int]:
+        """Returns the current position of the mouse from the controller."""
+        x, y = self.__mouse_controller.position
+        return int(x), int(y)
+
+    @override
+    def move(self, x: int, y: int) -> None:
+        """Moves the mouse to the provided position with the controller."""
+        self.__mouse_controller.position = (x, y)
+
+    @override
+    def press(self, button: MouseButton) -> None:
+        """Presses the provided mouse button with the controller."""
+        self.__mouse_controller.press(button)
+
+    @override
+    def release(self, button: MouseButton) -> None:
+        """Releases the provided mouse button with the controller."""
+        self.__mouse_controller.release(button)
+
+    @override
+    def click(self, button: MouseButton) -> None:
+        """Clicks the provided mouse button with the controller."""
+        self.__mouse_controller.click(button)
+
+    @override
+    def click_burst(self, button: MouseButton, count: int) -> None:
+        """Clicks the provided mouse button repeatedly with the controller."""
+        self.__mouse_controller.click(button, count)
+
+    @override
+    def press_key(self, key_code: int) -> None:
+        """Presses the provided key with the keyboard controller."""
+        self._keyboard_controller().press(KeyCode.from_vk(key_code))
+
+    @override
+    def release_key(self, key_code: int) -> None:
+        """Releases the provided key with the keyboard controller."""
+        self._keyboard_controller().release(KeyCode.from_vk(key_code))
+
+    def _keyboard_controller(self) -> KeyboardController:
+        """Returns the keyboard controller, creating it on first use."""
+        if self.__keyboard_controller is None:
+            self.__keyboard_controller = KeyboardController()
+        return self.__keyboard_controller
+
+
+class XTestBackend(InputBackend):
+    """
+    Injects mouse input directly through the X11 XTest extension.
+    Requests are queued on the display connection and only sent on flush,
+    so a whole click event costs a single write to the X server.
+    """
+
+    BACKEND_TYPE: InputBackendType = InputBackendType.XTEST
+    X_BUTTON_CODES: dict[str, int] = {"left": 1, "middle": 2, "right": 3}
+
+    def __init__(self, display_name: Optional[str] = None) -> None:
+        try:
+            from Xlib import X
+            from Xlib.display import Display
+            from Xlib.error import DisplayError
+            from Xlib.ext import xtest
+        except ImportError as error:
+            raise InputBackendError(
+                "The XTest backend requires python-xlib to be installed"
+            ) from error
+
+        try:
+            self.__display: Any = Display(display_name)
+        except DisplayError as error:
+            raise InputBackendError(
+                f"The XTest backend could not connect to the X server: {error}"
+            ) from error
+
+        if not self.__display.has_extension("XTEST"):
+            self.__display.close()
+            raise InputBackendError("The X server does not support the XTest extension")
+
+        self.__root: Any = self.__display.screen().root
+        self.__fake_input = xtest.fake_input
+        self.__button_press: int = X.ButtonPress
+        self.__button_release: int = X.ButtonRelease
+        self.__motion_notify: int = X.MotionNotify
+        self.__key_press: int = X.KeyPress
+        self.__key_release: int = X.KeyRelease
+
+    @classmethod
+    def _button_code(cls, button: MouseButton) -> int:
+        """Returns the X button code for the provided mouse button."""
+        return cls.X_BUTTON_CODES[button.name]
+
+    @property
+    @override
+    def position(self) -> tuple[int, int]:
+        """Returns the current position of the mouse from the root window."""
+        pointer = self.__root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    @override
+    def move(self, x: int, y: int) -> None:
+        """Queues a motion request to the provided position."""
+        self.__fake_input(self.__display, self.__motion_notify, x=x, y=y)
+
+    @override
+    def press(self, button: MouseButton) -> None:
+        """Queues a press request for the provided mouse button."""
+        self.__fake_input(
+            self.__display, self.__button_press, self._button_code(button)
+        )
+
+    @override
+    def release(self, button: MouseButton) -> None:
+        """Queues a release request for the provided mouse button."""
+        self.__fake_input(
+            self.__display, self.__button_release, self._button_code(button)
+        )
+
+    @override
+    def press_key(self, key_code: int) -> None:
+        """Queues a press request for the key with the provided keysym."""
+        self.__fake_input(self.__display, self.__key_press, self._keycode(key_code))
+
+    @override
+    def release_key(self, key_code: int) -> None:
+        """Queues a release request for the key with the provided keysym."""
+        self.__fake_input(self.__display, self.__key_release, self._keycode(key_code))
+
+    def _keycode(self, keysym: int) -> int:
+        """
+        Returns the X keycode that produces the provided keysym.
+        Raises InputBackendError if no key on the keyboard produces it.
+        """
+        keycode = self.__display.keysym_to_keycode(keysym)
+        if not keycode:
+            raise InputBackendError(
+                f"No key on the X keyboard produces keysym {keysym}"
+            )
+        return keycode
+
+    @override
+    def flush(self) -> None:
+        """Sends the queued requests to the X server."""
+        self.__display.flush()
+
+    @override
+    def close(self) -> None:
+        """Closes the connection to the X server."""
+        self.__display.close()
+
+
+class UInputBackend(InputBackend):
+    """
+    Injects mouse input through a Linux uinput virtual absolute pointer.
+    Raw input events are queued and written to the device in bulk on flush,
+    which works independently of the X server or Wayland compositor.
+    Only injection bypasses the display server: uinput cannot report the
+    pointer position, so it is still read through pynput, and the screen size
+    is detected through python-xlib unless provided.
+    """
+
+    BACKEND_TYPE: InputBackendType = InputBackendType.UINPUT
+    UINPUT_PATH: str = "/dev/uinput"
+    DEVICE_NAME: bytes = b"Clikr Virtual Pointer"
+    DEVICE_SETTLE_SECONDS: float = 0.1
+
+    EV_SYN: int = 0x00
+    EV_KEY: int = 0x01
+    EV_ABS: int = 0x03
+    SYN_REPORT: int = 0x00
+    ABS_X: int = 0x00
+    ABS_Y: int = 0x01
+    BUS_USB: int = 0x03
+    BUTTON_CODES: dict[str, int] = {"left": 0x110, "right": 0x111, "middle": 0x112}
+
+    UI_DEV_CREATE: int = 0x5501
+    UI_DEV_DESTROY: int = 0x5502
+    UI_DEV_SETUP: int = 0x405C5503
+    UI_ABS_SETUP: int = 0x401C5504
+    UI_SET_EVBIT: int = 0x40045564
+    UI_SET_KEYBIT: int = 0x40045565
+    UI_SET_ABSBIT: int = 0x40045567
+
+    INPUT_EVENT_FORMAT: struct.Struct = struct.Struct("llHHi")
+    DEVICE_SETUP_FORMAT: struct.Struct = struct.Struct("HHHH80sI")
+    ABS_SETUP_FORMAT: struct.Struct = struct.Struct("Hxxiiiiii")
+
+    def __init__(self, screen_size: Optional[tuple[int, int]] = None) -> None:
+        try:
+            import fcntl
+        except ImportError as error:
+            raise InputBackendError(
+                "The uinput backend is only available on Linux"
+            ) from error
+
+        self.__ioctl = fcntl.ioctl
+        self.__screen_size: tuple[int, int] = (
+            screen_size if screen_size is not None else self._detect_screen_size()
+        )
+
+        try:
+            self.__file_descriptor: int = os.open(
+                self.UINPUT_PATH, os.O_WRONLY | os.O_NONBLOCK
+            )
+        except OSError as error:
+            raise InputBackendError(
+                f"The uinput backend could not open {self.UINPUT_PATH} for writing "
+                f"({error.strerror}). Make sure the uinput module is loaded and your "
+                "user has write access to it, e.g. through a udev rule."
+            ) from error
+
+        try:
+            self._create_device()
+        except OSError as error:
+            os.close(self.__file_descriptor)
+            raise InputBackendError(
+                f"The uinput backend could not create a virtual device: {error}"
+            ) from error
+
+        self.__queue: bytearray = bytearray()
+        self.__position_controller: Optional[MouseController] = None
+        time.sleep(self.DEVICE_SETTLE_SECONDS)
+
+    @classmethod
+    def _detect_screen_size(cls) -> tuple[int, int]:
+        """Returns the size of the default X screen to scale absolute positions."""
+        try:
+            from Xlib.display import Display
+            from Xlib.error import DisplayError
+        except ImportError as error:
+            raise InputBackendError(
+                "The uinput backend needs a screen size or python-xlib to detect it"
+            ) from error
+
+        try:
+            display = Display()
+        except DisplayError as error:
+            raise InputBackendError(
+                f"The uinput backend could not detect the screen size: {error}"
+            ) from error
+
+        screen = display.screen()
+        screen_size = screen.width_in_pixels, screen.height_in_pixels
+        display.close()
+        return screen_size
+
+    def _create_device(self) -> None:
+        """Registers the supported events and creates the virtual pointer device."""
+        self.__ioctl(self.__file_descriptor, self.UI_SET_EVBIT, self.EV_KEY)
+        for button_code in self.BUTTON_CODES.values():
+            self.__ioctl(self.__file_descriptor, self.UI_SET_KEYBIT, button_code)
+
+        self.__ioctl(self.__file_descriptor, self.UI_SET_EVBIT, self.EV_ABS)
+        for axis, axis_size in zip((self.ABS_X, self.ABS_Y), self.__screen_size):
+            self.__ioctl(self.__file_descriptor, self.UI_SET_ABSBIT, axis)
+            self.__ioctl(
+                self.__file_descriptor,
+                self.UI_ABS_SETUP,
+                self.ABS_SETUP_FORMAT.pack(axis, 0, 0, axis_size - 1, 0, 0, 0),
+            )
+
+        self.__ioctl(
+            self.__file_descriptor,
+            self.UI_DEV_SETUP,
+            self.DEVICE_SETUP_FORMAT.pack(
+                self.BUS_USB, 0x1209, 0xC11C, 1, self.DEVICE_NAME, 0
+            ),
+        )
+        self.__ioctl(self.__file_descriptor, self.UI_DEV_CREATE)
+
+    def _queue_event(self, event_type: int, code: int, value: int) -> None:
+        """Queues a raw input event to be written on the next flush."""
+        self.__queue += self.INPUT_EVENT_FORMAT.pack(0, 0, event_type, code, value)
+
+    def _queue_report(self) -> None:
+        """Queues a synchronization event that ends the current report."""
+        self._queue_event(self.EV_SYN, self.SYN_REPORT, 0)
+
+    @property
+    @override
+    def position(self) -> tuple[int, int]:
+        """
+        Returns the current position of the mouse.
+        Since uinput cannot be queried, the position is read through pynput.
+        """
+        if self.__position_controller is None:
+            self.__position_controller = MouseController()
+        x, y = self.__position_controller.position
+        return int(x), int(y)
+
+    @override
+    def move(self, x: int, y: int) -> None:
+        """Queues an absolute motion to the provided position."""
+        self._queue_event(self.EV_ABS, self.ABS_X, x)
+        self._queue_event(self.EV_ABS, self.ABS_Y, y)
+        self._queue_report()
+
+    @override
+    def press(self, button: MouseButton) -> None:
+        """Queues a press of the provided mouse button."""
+        self._queue_event(self.EV_KEY, self.BUTTON_CODES[button.name], 1)
+        self._queue_report()
+
+    @override
+    def release(self, button: MouseButton) -> None:
+        """Queues a release of the provided mouse button."""
+        self._queue_event(self.EV_KEY, self.BUTTON_CODES[button.name], 0)
+        self._queue_report()
+
+    @override
+    def flush(self) -> None:
+        """Writes every queued input event to the device at once."""
+        if self.__queue:
+            os.write(self.__file_descriptor, self.__queue)
+            self.__queue.clear()
+
+    @override
+    def close(self) -> None:
+        """Destroys the virtual pointer device."""
+        self.flush()
+        self.__ioctl(self.__file_descriptor, self.UI_DEV_DESTROY)
+        os.close(self.__file_descriptor)
+
+
+class RecordedInput(NamedTuple):
+    """A single input request captured by the recording backend."""
+
+    time_ns: int
+    action: str
+    button: Optional[MouseButton]
+    x: Optional[int]
+    y: Optional[int]
+    key_code: Optional[int] = None
+
+
+class RecordingBackend(InputBackend):
+    """
+    Captures input requests instead of injecting them, for tests and benchmarks.
+    When recording is disabled it only counts requests, acting as a null backend.
+    """
+
+    BACKEND_TYPE: InputBackendType = InputBackendType.NULL
+
+    def __init__(
+        self, record: bool = True, initial_position: tuple[int, int] = (0, 0)
+    ) -> None:
+        self.__record: bool = record
+        self.__position: tuple[int, int] = initial_position
+        self.__records: list[RecordedInput] = []
+        self.__request_count: int = 0
+        self.__flush_count: int = 0
+
+    @property
+    def records(self) -> list[RecordedInput]:
+        """Returns the input requests captured so far."""
+        return self.__records
+
+    @property
+    def request_count(self) -> int:
+        """Returns the number of input requests received so far."""
+        return self.__request_count
+
+    @property
+    def flush_count(self) -> int:
+        """Returns the number of times the backend has been flushed."""
+        return self.__flush_count
+
+    def clear(self) -> None:
+        """Discards the captured requests and resets the counters."""
+        self.__records.clear()
+        self.__request_count = 0
+        self.__flush_count = 0
+
+    def _capture(
+        self,
+        action: str,
+        button: Optional[MouseButton] = None,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        key_code: Optional[int] = None,
+    ) -> None:
+        """Counts an input request and records it if recording is enabled."""
+        self.__request_count += 1
+        if self.__record:
+            self.__records.append(
+                RecordedInput(time.perf_counter_ns(), action, button, x, y, key_code)
+            )
+
+    @property
+    @override
+    def position(self) -> tuple[int, int]:
+        """Returns the position of the most recent move."""
+        return self.__position
+
+    @override
+    def move(self, x: int, y: int) -> None:
+        """Captures a move request to the provided position."""
+        self.__position = x, y
+        self._capture("move", x=x, y=y)
+
+    @override
+    def press(self, button: MouseButton) -> None:
+        """Captures a press request for the provided mouse button."""
+        self._capture("press", button)
+
+    @override
+    def release(self, button: MouseButton) -> None:
+        """Captures a release request for the provided mouse button."""
+        self._capture("release", button)
+
+    @override
+    def press_key(self, key_code: int) -> None:
+        """Captures a press request for the provided key."""
+        self._capture("key_press", key_code=key_code)
+
+    @override
+    def release_key(self, key_code: int) -> None:
+        """Captures a release request for the provided key."""
+        self._capture("key_release", key_code=key_code)
+
+    @override
+    def flush(self) -> None:
+        """Counts a flush of the backend."""
+        self.__flush_count += 1
+
+
+def create_input_backend(backend_type: InputBackendType) -> InputBackend:
+    """Returns a new input backend of the provided type."""
+    match backend_type:
+        case InputBackendType.PYNPUT:
+            backend: InputBackend = PynputBackend()
+        case InputBackendType.XTEST:
+            backend = XTestBackend()
+        case InputBackendType.NULL:
+            backend = RecordingBackend(record=False)
+        case InputBackendType.UINPUT:
+            backend = UInputBackend()
+    logging.debug("Created %s input backend", backend_type.name)
+    return backend
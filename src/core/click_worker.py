@@ -16,19 +16,42 @@
 """Provides the click worker to process click operations for Clikr"""
 
 import logging
+import threading
 import time
-from functools import lru_cache
-from typing import NamedTuple, Optional, Callable, override
-
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
-from pynput.mouse import Button as MouseButton, Controller as MouseController
-
-
-class MousePosition(NamedTuple):
-    """Coordinate pair for a mouse's position on the screen."""
-
-    x: int
-    y: int
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Callable, override
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import InputBackend
+from src.core.errors import MacroError, ScreenCaptureError
+from src.core.holds import HoldController, HoldOverrunPolicy, HoldStats
+from src.core.pointer import PointerStats, PointerTracker
+from src.core.rate import RateController, RateStats
+from src.core.realtime import RealtimeOutcome, RealtimeSettings, RealtimeTuner
+from src.core.schedule import EventSchedule, OverrunPolicy, ScheduleStats
+from src.core.telemetry import TimingTelemetry
+from src.core.timerfd import WakeableEvent
+from src.core.timing import TimingEngine, TimingPolicy, seconds_to_ns
+
+if TYPE_CHECKING:
+    from src.core.locator import LocatorStats, TemplateLocator, TemplateLocatorSettings
+    from src.core.macro import MacroPlayer, MacroSettings, MacroStats
+    from src.core.sequence import ClickSequence, SequencePlayer, SequenceStats
+    from src.core.trigger import PixelTrigger, PixelTriggerSettings, TriggerStats
+
+LIVE_FIELDS: tuple[str, ...] = (
+    "interval",
+    "hold_length",
+    "clicks_per_event",
+    "mouse_button",
+    "location",
+    "is_using_location_x",
+    "is_using_location_y",
+    "is_using_held_clicks",
+    "burst_spacing",
+    "target_cps",
+    "pointer_revalidation_period",
+)
 
 
 class WorkerInputs(NamedTuple):
@@ -44,7 +67,100 @@ class WorkerInputs(NamedTuple):
     is_using_location_y: bool
     is_using_held_clicks: bool
     is_continuous: bool
-    mouse_controller: MouseController
+    input_backend: InputBackend
+    timing_policy: TimingPolicy = TimingEngine.DEFAULT_POLICY
+    overrun_policy: OverrunPolicy = EventSchedule.DEFAULT_OVERRUN_POLICY
+    burst_spacing: float = 0.0
+    target_cps: Optional[float] = None
+    pointer_revalidation_period: float = (
+        PointerTracker.DEFAULT_REVALIDATION_PERIOD_SECONDS
+    )
+    hold_overrun_policy: HoldOverrunPolicy = HoldController.DEFAULT_POLICY
+    pixel_trigger: Optional["PixelTriggerSettings"] = None
+    template_locator: Optional["TemplateLocatorSettings"] = None
+    macro: Optional["MacroSettings"] = None
+    sequence: Optional["ClickSequence"] = None
+
+    @property
+    def interval_ns(self) -> int:
+        """Returns the interval in nanoseconds."""
+        return seconds_to_ns(self.interval)
+
+    @property
+    def hold_length_ns(self) -> int:
+        """Returns the hold length in nanoseconds."""
+        return seconds_to_ns(self.hold_length)
+
+    @property
+    def target_location(self) -> tuple[Optional[int], Optional[int]]:
+        """Returns the location with any unused coordinate left as None."""
+        return (
+            self.location[0] if self.is_using_location_x else None,
+            self.location[1] if self.is_using_location_y else None,
+        )
+
+    @property
+    def pointer_revalidation_period_ns(self) -> int:
+        """Returns how often a fixed target location is re-validated in nanoseconds."""
+        return seconds_to_ns(self.pointer_revalidation_period)
+
+    @property
+    def burst_spacing_ns(self) -> int:
+        """Returns the spacing between the clicks of an event in nanoseconds."""
+        return seconds_to_ns(self.burst_spacing)
+
+    @property
+    def event_period_ns(self) -> int:
+        """Returns the nominal time between the starts of two events in nanoseconds."""
+        if self.target_cps:
+            return seconds_to_ns(self.clicks_per_event / self.target_cps)
+        return self.interval_ns
+
+    @property
+    def worst_case_event_duration_ns(self) -> int:
+        """
+        Returns the longest time an event's clicks can take in nanoseconds,
+        where each click starts a burst spacing after the previous one
+        but never before the previous hold has been released.
+        """
+        spacing_duration_ns = (self.clicks_per_event - 1) * self.burst_spacing_ns
+        if not self.is_using_held_clicks:
+            return spacing_duration_ns
+        return max(
+            spacing_duration_ns + self.hold_length_ns,
+            self.clicks_per_event * self.hold_length_ns,
+        )
+
+    @property
+    def is_overrunning(self) -> bool:
+        """Returns whether an event's held clicks can take longer than its period."""
+        period_ns = self.event_period_ns
+        return (
+            self.is_using_held_clicks
+            and 0 < period_ns < self.worst_case_event_duration_ns
+        )
+
+    @property
+    def is_batched_burst(self) -> bool:
+        """Returns whether each event's clicks can be handed to the backend at once."""
+        return (
+            self.clicks_per_event > 1
+            and not self.is_using_held_clicks
+            and self.burst_spacing_ns == 0
+        )
+
+    @property
+    def live_fields(self) -> dict[str, Any]:
+        """
+        Returns the fields a running click worker can change by name, which is
+        all a retune needs to send. The event count, backend, policies and
+        any trigger, locator, macro or sequence stay as the run started.
+        """
+        return {field: getattr(self, field) for field in LIVE_FIELDS}
+
+    def with_live_fields(self, live_fields: dict[str, Any]) -> "WorkerInputs":
+        """Returns these inputs with the provided live fields swapped in."""
+        return self._replace(**live_fields)
 
     @override
     def __str__(self) -> str:
@@ -55,121 +171,749 @@ class WorkerInputs(NamedTuple):
             f"clicks_per_event={self.clicks_per_event}, "
             f"event_count={self.event_count}, "
             f"mouse_button={self.mouse_button.name}, "
-            f"location={self.location})"
+            f"location={self.location}, "
+            f"timing_policy={self.timing_policy.name}, "
+            f"overrun_policy={self.overrun_policy.name}, "
+            f"burst_spacing={self.burst_spacing}, "
+            f"target_cps={self.target_cps}, "
+            f"hold_overrun_policy={self.hold_overrun_policy.name}, "
+            f"pixel_trigger={self.pixel_trigger}, "
+            f"template_locator={self.template_locator}, "
+            f"macro={self.macro}, "
+            f"sequence={self.sequence})"
         )
 
 
-class ClickWorkerManager(QObject):
-    """Manages the click worker thread and coordinates click operations."""
-
-    worker_request: pyqtSignal = pyqtSignal(WorkerInputs)
+class ClickWorkerManager:
+    """
+    Manages the click worker and coordinates click operations.
+    The click worker runs on a persistent engine thread that stays armed
+    between runs, so starting only needs to wake it rather than create it.
+    Control methods may be called from any thread, such as a hotkey hook.
+    Any real-time tuning is applied to the engine thread once it starts,
+    before the timing engine is calibrated on it.
+    """
 
-    def __init__(self, finished_callback: Callable[[], None]) -> None:
-        super().__init__()
-        self.__click_worker: ClickWorker = ClickWorker()
-        self.__worker_thread = QThread()
+    STOP_TIMEOUT_SECONDS: float = 1.0
 
-        self.__click_worker.finished.connect(finished_callback)
-        self.worker_request.connect(self.__click_worker.start)
-        self.__click_worker.moveToThread(self.__worker_thread)
+    def __init__(
+        self,
+        finished_callback: Callable[[], None],
+        realtime_settings: RealtimeSettings = RealtimeSettings(),
+    ) -> None:
+        self.__realtime_settings: RealtimeSettings = realtime_settings
+        self.__realtime_outcomes: list[RealtimeOutcome] = []
+        self.__start_event: threading.Event = threading.Event()
+        self.__stop_event: WakeableEvent = WakeableEvent()
+        self.__idle_event: threading.Event = threading.Event()
+        self.__idle_event.set()
+        self.__resume_event: threading.Event = threading.Event()
+        self.__resume_event.set()
+        self.__control_lock: threading.RLock = threading.RLock()
+        self.__shutdown_requested: bool = False
+        self.__pending_request: Optional[tuple[WorkerInputs, int]] = None
+        self.__last_stop_latency_ns: Optional[int] = None
+        self.__click_worker: ClickWorker = ClickWorker(
+            self.__stop_event,
+            self.__idle_event,
+            self.__resume_event,
+            finished_callback=finished_callback,
+        )
 
-    def start(self, worker_inputs: WorkerInputs) -> None:
-        """Initializes and starts the click worker thread."""
-        self.__worker_thread.start()
-        self.worker_request.emit(worker_inputs)
+        self.__engine_thread: threading.Thread = threading.Thread(
+            target=self._run_engine, name="ClickEngine", daemon=True
+        )
+        self.__engine_thread.start()
+
+    @property
+    def telemetry(self) -> TimingTelemetry:
+        """Returns the timing telemetry of the current or most recent run."""
+        return self.__click_worker.telemetry
+
+    @property
+    def last_stop_latency_ns(self) -> Optional[int]:
+        """Returns how long the most recent stop took for the click worker to finish."""
+        return self.__last_stop_latency_ns
+
+    @property
+    def realtime_outcomes(self) -> list[RealtimeOutcome]:
+        """Returns whether each real-time tuning option was applied to the engine thread."""
+        return self.__realtime_outcomes
+
+    @property
+    def is_running(self) -> bool:
+        """Returns whether the click worker is currently running."""
+        return not self.__idle_event.is_set()
+
+    @property
+    def is_paused(self) -> bool:
+        """Returns whether the click worker is running but paused."""
+        return self.is_running and not self.__resume_event.is_set()
+
+    def _run_engine(self) -> None:
+        """Waits on the engine thread for start requests and runs the click worker."""
+        if self.__realtime_settings.is_enabled:
+            self.__realtime_outcomes = RealtimeTuner(self.__realtime_settings).apply()
+        TimingEngine.calibrate()
+
+        while True:
+            self.__start_event.wait()
+            self.__start_event.clear()
+
+            if self.__shutdown_requested:
+                return
+
+            assert self.__pending_request is not None
+            worker_inputs, trigger_time_ns = self.__pending_request
+            try:
+                self.__click_worker.start(worker_inputs, trigger_time_ns)
+            except Exception:
+                logging.exception("Click worker failed")
+
+    def start(
+        self, worker_inputs: WorkerInputs, trigger_time_ns: Optional[int] = None
+    ) -> None:
+        """
+        Wakes the engine thread to start the click worker with the provided inputs.
+        The trigger time is used to measure the latency until the first click.
+        """
+        if trigger_time_ns is None:
+            trigger_time_ns = time.perf_counter_ns()
+
+        with self.__control_lock:
+            if self.is_running:
+                self.stop()
+                if self.is_running:
+                    logging.error(
+                        "Click worker is still running, ignoring start request"
+                    )
+                    return
+
+            self.__pending_request = worker_inputs, trigger_time_ns
+            self.__stop_event.clear()
+            self.__resume_event.set()
+            self.__idle_event.clear()
+            self.__start_event.set()
 
     def stop(self) -> None:
-        """Terminates the click worker thread if it is running."""
-        if self.__worker_thread.isRunning():
-            logging.debug("Terminating worker thread")
-            self.__worker_thread.terminate()
-            self.__worker_thread.wait()
-
-
-class ClickWorker(QObject):
-    """Executes click operations based on worker inputs."""
-
-    finished = pyqtSignal()
-
-    def __init__(self) -> None:
-        super().__init__()
-        self.__last_position: Optional[MousePosition] = None
-
-    @pyqtSlot(WorkerInputs)
-    def start(self, worker_inputs: WorkerInputs) -> None:
-        """Starts the click worker with the provided worker inputs."""
+        """
+        Requests the click worker to stop and waits for it to finish, which
+        interrupts any wait and releases any held button.
+        """
+        with self.__control_lock:
+            if not self.is_running:
+                return
+
+            stop_time = time.perf_counter_ns()
+            self.__stop_event.set()
+            self.__resume_event.set()
+
+            if self.__idle_event.wait(self.STOP_TIMEOUT_SECONDS):
+                self.__last_stop_latency_ns = time.perf_counter_ns() - stop_time
+                logging.debug(
+                    "Stopped click worker in %.3fms",
+                    self.__last_stop_latency_ns / 1e6,
+                )
+                return
+
+            logging.warning(
+                "Click worker did not stop within %.1fs", self.STOP_TIMEOUT_SECONDS
+            )
+
+    def update(self, worker_inputs: WorkerInputs) -> None:
+        """
+        Hands the running click worker new inputs, which it picks up before
+        its next click event without restarting or losing its schedule.
+        """
+        with self.__control_lock:
+            if self.is_running:
+                self.__click_worker.retune(worker_inputs.live_fields)
+
+    def pause(self) -> None:
+        """Holds the click worker before its next click event until resumed."""
+        with self.__control_lock:
+            if not self.is_running:
+                return
+            self.__resume_event.clear()
+            logging.debug("Paused click worker")
+
+    def resume(self) -> None:
+        """Lets a paused click worker continue from where it was paused."""
+        with self.__control_lock:
+            self.__resume_event.set()
+            logging.debug("Resumed click worker")
+
+    def toggle_pause(self) -> None:
+        """Pauses the click worker if it is running, otherwise resumes it."""
+        with self.__control_lock:
+            if self.is_paused:
+                self.resume()
+                return
+            self.pause()
+
+    def shutdown(self) -> None:
+        """Stops the click worker and ends the engine thread."""
+        self.stop()
+        self.__shutdown_requested = True
+        self.__start_event.set()
+        self.__engine_thread.join(self.STOP_TIMEOUT_SECONDS)
+        if not self.__engine_thread.is_alive():
+            self.__stop_event.close()
+
+
+class ClickWorker:
+    """
+    Executes click operations based on worker inputs.
+    The finished callback is called on the worker's thread once a run that
+    completed without being stopped is idle, so a UI must forward it to its
+    own thread.
+    """
+
+    def __init__(
+        self,
+        stop_event: threading.Event,
+        idle_event: threading.Event,
+        resume_event: Optional[threading.Event] = None,
+        telemetry: Optional[TimingTelemetry] = None,
+        finished_callback: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.__finished_callback: Optional[Callable[[], None]] = finished_callback
+        self.__stop_event: threading.Event = stop_event
+        self.__idle_event: threading.Event = idle_event
+        self.__resume_event: Optional[threading.Event] = resume_event
+        self.__live_inputs: Optional[WorkerInputs] = None
+        self.__last_deadline_ns: Optional[int] = None
+        self.__timing_engine: TimingEngine = TimingEngine(stop_event=stop_event)
+        self.__schedule: EventSchedule = EventSchedule(0)
+        self.__trigger_time_ns: Optional[int] = None
+        self.__first_click_latency_ns: Optional[int] = None
+        self.__first_burst_duration_ns: Optional[int] = None
+        self.__last_burst_duration_ns: Optional[int] = None
+        self.__max_burst_duration_ns: Optional[int] = None
+        self.__telemetry: TimingTelemetry = (
+            telemetry if telemetry is not None else TimingTelemetry()
+        )
+        self.__rate_controller: Optional[RateController] = None
+        self.__pointer_tracker: Optional[PointerTracker] = None
+        self.__hold_controller: HoldController = HoldController()
+        self.__pixel_trigger: Optional["PixelTrigger"] = None
+        self.__trigger_capture_time_ns: Optional[int] = None
+        self.__template_locator: Optional["TemplateLocator"] = None
+        self.__located_target: Optional[tuple[int, int]] = None
+        self.__macro_player: Optional["MacroPlayer"] = None
+        self.__sequence_player: Optional["SequencePlayer"] = None
+
+    @property
+    def schedule_stats(self) -> ScheduleStats:
+        """Returns the schedule counters of the current or most recent run."""
+        return self.__schedule.stats
+
+    @property
+    def telemetry(self) -> TimingTelemetry:
+        """Returns the timing telemetry of the current or most recent run."""
+        return self.__telemetry
+
+    @property
+    def rate_stats(self) -> Optional[RateStats]:
+        """Returns the rate stats of the current or most recent target rate run."""
+        if self.__rate_controller is None:
+            return None
+        return self.__rate_controller.stats
+
+    @property
+    def pointer_stats(self) -> Optional[PointerStats]:
+        """Returns the pointer counters of the current or most recent run."""
+        if self.__pointer_tracker is None:
+            return None
+        return self.__pointer_tracker.stats
+
+    @property
+    def hold_stats(self) -> HoldStats:
+        """Returns the hold overrun counters of the current or most recent run."""
+        return self.__hold_controller.stats
+
+    @property
+    def trigger_stats(self) -> Optional["TriggerStats"]:
+        """Returns the trigger counters of the current or most recent triggered run."""
+        if self.__pixel_trigger is None:
+            return None
+        return self.__pixel_trigger.stats
+
+    @property
+    def locator_stats(self) -> Optional["LocatorStats"]:
+        """Returns the locator counters of the current or most recent located run."""
+        if self.__template_locator is None:
+            return None
+        return self.__template_locator.stats
+
+    @property
+    def macro_stats(self) -> Optional["MacroStats"]:
+        """Returns the replay counters of the current or most recent macro run."""
+        if self.__macro_player is None:
+            return None
+        return self.__macro_player.stats
+
+    @property
+    def sequence_stats(self) -> Optional["SequenceStats"]:
+        """Returns the pass counters of the current or most recent sequence run."""
+        if self.__sequence_player is None:
+            return None
+        return self.__sequence_player.stats
+
+    @property
+    def first_click_latency_ns(self) -> Optional[int]:
+        """Returns the time from the trigger until the first click of the most recent run."""
+        return self.__first_click_latency_ns
+
+    @property
+    def last_burst_duration_ns(self) -> Optional[int]:
+        """Returns how long the clicks of the most recent event took to emit."""
+        return self.__last_burst_duration_ns
+
+    @property
+    def max_burst_duration_ns(self) -> Optional[int]:
+        """Returns the longest time the clicks of an event took to emit this run."""
+        return self.__max_burst_duration_ns
+
+    def retune(self, live_fields: dict[str, Any]) -> None:
+        """
+        Swaps the provided live fields into the inputs of the current run.
+        The inputs are replaced as a whole, so the click worker either sees
+        all of the changes or none of them when it next reads them.
+        """
+        live_inputs = self.__live_inputs
+        if live_inputs is None:
+            return
+        self.__live_inputs = live_inputs.with_live_fields(live_fields)
+        logging.debug("Retuned click worker with inputs %s", self.__live_inputs)
+
+    def start(
+        self, worker_inputs: WorkerInputs, trigger_time_ns: Optional[int] = None
+    ) -> None:
+        """
+        Starts the click worker with the provided worker inputs.
+        Runs until the event count is reached or the stop event is set.
+        """
+        self.__live_inputs = worker_inputs
+        self.__last_deadline_ns = None
+        self.__trigger_time_ns = trigger_time_ns
+        self.__first_click_latency_ns = None
+        self.__first_burst_duration_ns = None
+        self.__last_burst_duration_ns = None
+        self.__max_burst_duration_ns = None
+        self.__telemetry.reset()
+        self.__pixel_trigger = None
+        self.__trigger_capture_time_ns = None
+        self.__template_locator = None
+        self.__located_target = None
+        self.__macro_player = None
+        self.__sequence_player = None
+        is_started = False
+        is_completed = False
         try:
             logging.debug("Starting click worker with inputs %s", worker_inputs)
-
+            self.__timing_engine = TimingEngine(
+                worker_inputs.timing_policy, stop_event=self.__stop_event
+            )
+            self.__schedule = EventSchedule(
+                worker_inputs.interval_ns, worker_inputs.overrun_policy
+            )
+            self.__pointer_tracker = PointerTracker(
+                worker_inputs.input_backend,
+                worker_inputs.target_location,
+                worker_inputs.pointer_revalidation_period_ns,
+            )
+            self.__hold_controller = HoldController(worker_inputs.hold_overrun_policy)
+            self._log_hold_overrun(worker_inputs)
+            self.__rate_controller = None
+            if worker_inputs.target_cps:
+                self.__rate_controller = RateController(
+                    worker_inputs.target_cps, worker_inputs.clicks_per_event
+                )
+            if worker_inputs.pixel_trigger is not None:
+                from src.core.trigger import PixelTrigger
+
+                self.__pixel_trigger = PixelTrigger(worker_inputs.pixel_trigger)
+            if worker_inputs.template_locator is not None:
+                from src.core.locator import TemplateLocator
+
+                self.__template_locator = TemplateLocator(
+                    worker_inputs.template_locator
+                )
+            if worker_inputs.macro is not None:
+                from src.core.macro import MacroPlayer
+
+                self.__macro_player = MacroPlayer(worker_inputs.macro)
+            if worker_inputs.sequence is not None:
+                from src.core.sequence import SequencePlayer
+
+                self.__sequence_player = SequencePlayer(worker_inputs.sequence)
+
+            is_started = True
             if worker_inputs.is_continuous:
                 clicking: bool = True
                 while clicking:
+                    worker_inputs = self._apply_live_inputs(worker_inputs)
                     self._execute_click_event(worker_inputs)
             else:
                 assert isinstance(worker_inputs.event_count, int)
                 for _ in range(worker_inputs.event_count):
+                    worker_inputs = self._apply_live_inputs(worker_inputs)
                     self._execute_click_event(worker_inputs)
 
-            self.finished.emit()
+            is_completed = True
 
         except InterruptedError as error:
-            logging.error("Click worker was interrupted: %s", error)
-            self.finished.emit()
+            logging.debug("Click worker was interrupted: %s", error)
+
+        except ScreenCaptureError as error:
+            logging.error("Could not capture the screen: %s", error)
+
+        except MacroError as error:
+            logging.error("Could not replay the macro: %s", error)
+
+        finally:
+            if is_started:
+                self._log_run_summary(worker_inputs)
+            if self.__pixel_trigger is not None:
+                self.__pixel_trigger.close()
+            if self.__template_locator is not None:
+                self.__template_locator.close()
+            self.__hold_controller.release()
+            self.__timing_engine.close()
+            self.__live_inputs = None
+            self.__idle_event.set()
+            if is_completed and self.__finished_callback is not None:
+                self.__finished_callback()
+
+    def _apply_live_inputs(self, worker_inputs: WorkerInputs) -> WorkerInputs:
+        """
+        Returns the latest inputs handed to the running click worker and
+        carries the schedule, rate and pointer target over to them.
+        """
+        live_inputs = self.__live_inputs
+        if live_inputs is None or live_inputs is worker_inputs:
+            return worker_inputs
+
+        if live_inputs.interval_ns != worker_inputs.interval_ns:
+            self.__schedule.retime(live_inputs.interval_ns, self.__last_deadline_ns)
+
+        if (
+            live_inputs.target_cps != worker_inputs.target_cps
+            or live_inputs.clicks_per_event != worker_inputs.clicks_per_event
+        ):
+            self._retarget_rate(live_inputs)
+
+        if (
+            self.__template_locator is None
+            and live_inputs.target_location != worker_inputs.target_location
+        ):
+            assert self.__pointer_tracker is not None
+            self.__pointer_tracker.retarget(live_inputs.target_location)
+
+        logging.debug("Click worker applied live inputs")
+        return live_inputs
+
+    def _retarget_rate(self, worker_inputs: WorkerInputs) -> None:
+        """Moves the target rate run to the rate of the provided inputs."""
+        if not worker_inputs.target_cps:
+            if self.__rate_controller is not None:
+                self.__schedule.retime(
+                    worker_inputs.interval_ns, self.__last_deadline_ns
+                )
+            self.__rate_controller = None
+            return
 
-    def _execute_click_event(self, worker_inputs: WorkerInputs) -> None:
-        """Executes a click event based on the provided worker inputs."""
-        start_time = time.perf_counter()
+        if self.__rate_controller is None:
+            self.__rate_controller = RateController(
+                worker_inputs.target_cps, worker_inputs.clicks_per_event
+            )
+            return
 
-        self._move_to_target(worker_inputs)
+        self.__rate_controller.retarget(
+            worker_inputs.target_cps, worker_inputs.clicks_per_event
+        )
 
-        for _ in range(worker_inputs.clicks_per_event):
-            self._execute_click(worker_inputs)
+    def _execute_click_event(self, worker_inputs: WorkerInputs) -> None:
+        """
+        Executes a click event based on the provided worker inputs, which
+        replays the whole macro or walks the whole sequence instead of
+        clicking if one is set.
+        A located target is found before waiting for the event, so the search
+        does not delay the click, and the event is skipped if it is not found.
+        """
+        is_target_found = self._locate_target()
+        if self.__rate_controller is not None:
+            deadline = self.__rate_controller.next_deadline(time.perf_counter_ns())
+            self.__hold_controller.settle(self.__timing_engine, deadline)
+            self.__timing_engine.wait_until(deadline)
+        else:
+            deadline = self.__schedule.next_deadline(time.perf_counter_ns())
+            self.__hold_controller.settle(self.__timing_engine, deadline)
+            missed_expirations = self.__timing_engine.wait_until(
+                deadline, self.__schedule.interval_ns
+            )
+            if missed_expirations:
+                self.__schedule.record_missed_expirations(missed_expirations)
+        deadline += self._wait_while_paused()
+        deadline += self._wait_for_trigger()
+        self.__last_deadline_ns = deadline
+        if not is_target_found:
+            return
 
-        next_click_time = start_time + worker_inputs.interval
-        remaining_time = next_click_time - time.perf_counter()
-        if remaining_time > 0:
-            time.sleep(remaining_time)
+        event_start_time = time.perf_counter_ns()
+        self.__telemetry.record(
+            deadline, event_start_time, worker_inputs.clicks_per_event
+        )
 
-    @classmethod
-    def _execute_click(cls, worker_inputs: WorkerInputs) -> None:
-        """Executes a click or held click based on the provided worker inputs."""
-        if worker_inputs.is_using_held_clicks:
-            worker_inputs.mouse_controller.press(worker_inputs.mouse_button)
-            time.sleep(worker_inputs.hold_length)
-            worker_inputs.mouse_controller.release(worker_inputs.mouse_button)
+        if self.__macro_player is not None:
+            self.__macro_player.play(
+                worker_inputs.input_backend,
+                self.__timing_engine,
+                event_start_time,
+                self._wait_while_paused,
+            )
+        elif self.__sequence_player is not None:
+            self.__sequence_player.play(
+                worker_inputs.input_backend,
+                self.__timing_engine,
+                event_start_time,
+                self._wait_while_paused,
+            )
         else:
-            worker_inputs.mouse_controller.click(worker_inputs.mouse_button)
+            self._execute_clicks(worker_inputs, deadline, event_start_time)
 
-    @lru_cache(maxsize=30)
-    def _calculate_next_position(
-        self,
-        current_x: int,
-        current_y: int,
-        target_x: Optional[int],
-        target_y: Optional[int],
-    ) -> MousePosition:
-        """Calculates the next mouse position for a click event."""
-        new_x = target_x if target_x is not None else current_x
-        new_y = target_y if target_y is not None else current_y
-        return MousePosition(new_x, new_y)
-
-    def _move_to_target(self, worker_inputs: WorkerInputs) -> None:
-        """Moves the mouse to the target location if it is not already there."""
-        if not (worker_inputs.is_using_location_x or worker_inputs.is_using_location_y):
-            return
+        if self.__trigger_capture_time_ns is not None:
+            assert self.__pixel_trigger is not None
+            self.__pixel_trigger.record_click(self.__trigger_capture_time_ns)
+            self.__trigger_capture_time_ns = None
 
-        controller_position = worker_inputs.mouse_controller.position
-        current_position = MousePosition(*controller_position)
+        if self.__trigger_time_ns is not None:
+            self._record_first_click_latency(self.__trigger_time_ns)
 
-        if current_position == self.__last_position:
-            return
+    def _execute_clicks(
+        self, worker_inputs: WorkerInputs, deadline: int, event_start_time: int
+    ) -> None:
+        """Moves to the target and executes the clicks of an event that is due."""
+        assert self.__pointer_tracker is not None
+        self.__pointer_tracker.move_to_target(event_start_time)
 
-        next_position = self._calculate_next_position(
-            current_position.x,
-            current_position.y,
-            worker_inputs.location[0],
-            worker_inputs.location[1],
-        )
+        burst_start_time = time.perf_counter_ns()
 
-        worker_inputs.mouse_controller.position = (next_position.x, next_position.y)
-        self.__last_position = next_position
+        if worker_inputs.is_batched_burst:
+            worker_inputs.input_backend.click_burst(
+                worker_inputs.mouse_button, worker_inputs.clicks_per_event
+            )
+        else:
+            for click_index in range(worker_inputs.clicks_per_event):
+                if click_index > 0 and worker_inputs.burst_spacing_ns > 0:
+                    worker_inputs.input_backend.flush()
+                    press_time = (
+                        burst_start_time + click_index * worker_inputs.burst_spacing_ns
+                    )
+                    self.__hold_controller.settle(self.__timing_engine, press_time)
+                    self.__timing_engine.wait_until(press_time)
+                else:
+                    self.__hold_controller.settle(self.__timing_engine)
+                self.__timing_engine.raise_if_stopped()
+                self._execute_click(
+                    worker_inputs,
+                    deadline + worker_inputs.event_period_ns,
+                    worker_inputs.clicks_per_event - click_index,
+                )
+
+        worker_inputs.input_backend.flush()
+        if worker_inputs.is_using_held_clicks:
+            self.__hold_controller.record_event(
+                time.perf_counter_ns() - event_start_time, worker_inputs.event_period_ns
+            )
+
+        if self.__rate_controller is not None:
+            self.__rate_controller.record_event(
+                event_start_time, time.perf_counter_ns()
+            )
+
+        if worker_inputs.clicks_per_event > 1:
+            self._record_burst_duration(time.perf_counter_ns() - burst_start_time)
+
+    def _wait_while_paused(self) -> int:
+        """
+        Blocks while the click worker is paused, then shifts the rest of the run
+        by the paused time so resuming does not fire the missed events.
+        Returns the paused time in nanoseconds.
+        """
+        if self.__resume_event is None or self.__resume_event.is_set():
+            return 0
+
+        pause_start_time = time.perf_counter_ns()
+        self.__resume_event.wait()
+        self.__timing_engine.raise_if_stopped()
+        paused_ns = time.perf_counter_ns() - pause_start_time
+
+        self._shift_run(paused_ns)
+        logging.debug("Click worker resumed after %.3fms", paused_ns / 1e6)
+        return paused_ns
+
+    def _wait_for_trigger(self) -> int:
+        """
+        Blocks until the pixel trigger matches, then shifts the rest of the run
+        by the time spent waiting so the interval acts as the minimum gap
+        between triggered events. Returns the waited time in nanoseconds.
+        """
+        if self.__pixel_trigger is None:
+            return 0
+
+        wait_start_time = time.perf_counter_ns()
+        self.__trigger_capture_time_ns = self.__pixel_trigger.wait_for_match(
+            self.__timing_engine
+        )
+        waited_ns = time.perf_counter_ns() - wait_start_time
+
+        self._shift_run(waited_ns)
+        return waited_ns
+
+    def _locate_target(self) -> bool:
+        """
+        Points the pointer tracker at the template locator's latest hit.
+        Returns False if the template could not be found on screen.
+        """
+        if self.__template_locator is None:
+            return True
+
+        located_target = self.__template_locator.locate()
+        if located_target is None:
+            logging.debug("Skipping click event, the template was not found")
+            return False
+
+        if located_target != self.__located_target:
+            assert self.__pointer_tracker is not None
+            self.__pointer_tracker.retarget(located_target)
+            self.__located_target = located_target
+        return True
+
+    def _shift_run(self, delta_ns: int) -> None:
+        """Moves the schedule or target rate run later by the provided time."""
+        self.__schedule.shift(delta_ns)
+        if self.__rate_controller is not None:
+            self.__rate_controller.shift(delta_ns)
+
+    def _record_burst_duration(self, burst_duration_ns: int) -> None:
+        """
+        Records how long the clicks of an event took to emit, keeping the first
+        burst of a run to report when it ends rather than between events.
+        """
+        self.__last_burst_duration_ns = burst_duration_ns
+        if self.__first_burst_duration_ns is None:
+            self.__first_burst_duration_ns = burst_duration_ns
+        if (
+            self.__max_burst_duration_ns is None
+            or burst_duration_ns > self.__max_burst_duration_ns
+        ):
+            self.__max_burst_duration_ns = burst_duration_ns
+
+    def _log_hold_overrun(self, worker_inputs: WorkerInputs) -> None:
+        """Warns before the first event if the held clicks cannot fit the period."""
+        if worker_inputs.is_overrunning:
+            logging.warning(
+                "Held clicks take up to %.3fms per event, exceeding the period "
+                "of %.3fms, so each overrun is handled with %s",
+                worker_inputs.worst_case_event_duration_ns / 1e6,
+                worker_inputs.event_period_ns / 1e6,
+                worker_inputs.hold_overrun_policy.name,
+            )
+
+    def _log_run_summary(self, worker_inputs: WorkerInputs) -> None:
+        """
+        Reports the counters of a completed or interrupted run, including the
+        stats of each optional component the run used.
+        """
+        logging.debug("Click worker finished with schedule %s", self.schedule_stats)
+        logging.debug("Click worker finished with timing %s", self.telemetry.stats)
+        logging.debug("Click worker finished with pointer %s", self.pointer_stats)
+        hold_stats = self.hold_stats if any(self.hold_stats) else None
+        for description, stats in (
+            ("Target rate run", self.rate_stats),
+            ("Held clicks", hold_stats),
+            ("Pixel trigger run", self.trigger_stats),
+            ("Located run", self.locator_stats),
+            ("Macro run", self.macro_stats),
+            ("Sequence run", self.sequence_stats),
+        ):
+            if stats is not None:
+                logging.info("%s finished with %s", description, stats)
+        self._log_first_click_latency()
+        self._log_burst_durations(worker_inputs)
+
+    def _log_burst_durations(self, worker_inputs: WorkerInputs) -> None:
+        """
+        Reports how long the first burst of the run took, and warns if any burst
+        took longer than the interval.
+        """
+        if self.__first_burst_duration_ns is not None:
+            logging.info(
+                "Burst of %d clicks took %.3fms with an interval of %.3fms",
+                worker_inputs.clicks_per_event,
+                self.__first_burst_duration_ns / 1e6,
+                worker_inputs.interval_ns / 1e6,
+            )
+        if (
+            self.__max_burst_duration_ns is not None
+            and self.__max_burst_duration_ns > worker_inputs.interval_ns
+        ):
+            logging.warning(
+                "Longest burst took %.3fms, exceeding the interval of %.3fms",
+                self.__max_burst_duration_ns / 1e6,
+                worker_inputs.interval_ns / 1e6,
+            )
+
+    def _record_first_click_latency(self, trigger_time_ns: int) -> None:
+        """Records the time from the trigger until the first click."""
+        self.__first_click_latency_ns = time.perf_counter_ns() - trigger_time_ns
+        self.__trigger_time_ns = None
+
+    def _log_first_click_latency(self) -> None:
+        """Reports the time from the trigger until the first click of the run."""
+        if self.__first_click_latency_ns is not None:
+            logging.info(
+                "Hotkey-to-first-click latency: %.3fms",
+                self.__first_click_latency_ns / 1e6,
+            )
+
+    def _execute_click(
+        self, worker_inputs: WorkerInputs, event_end_ns: int, remaining_clicks: int
+    ) -> None:
+        """
+        Executes a click or held click based on the provided worker inputs.
+        The end of the event and the clicks left in it bound a truncated hold.
+        """
+        input_backend = worker_inputs.input_backend
+        if worker_inputs.is_using_held_clicks:
+            hold_length_ns = self.__hold_controller.hold_length_ns(
+                worker_inputs.hold_length_ns,
+                event_end_ns - time.perf_counter_ns(),
+                remaining_clicks,
+                worker_inputs.burst_spacing_ns,
+                self.__timing_engine.spin_threshold_ns,
+            )
+            press_start_time = time.perf_counter_ns()
+            input_backend.press(worker_inputs.mouse_button)
+            input_backend.flush()
+            press_cost_ns = time.perf_counter_ns() - press_start_time
+            if self.__hold_controller.policy == HoldOverrunPolicy.OVERLAP:
+                self.__hold_controller.defer_release(
+                    input_backend,
+                    worker_inputs.mouse_button,
+                    time.perf_counter_ns() + hold_length_ns,
+                )
+                return
+            try:
+                self.__timing_engine.wait(hold_length_ns)
+            finally:
+                release_start_time = time.perf_counter_ns()
+                input_backend.release(worker_inputs.mouse_button)
+                input_backend.flush()
+                self.__hold_controller.record_send_cost(
+                    press_cost_ns + time.perf_counter_ns() - release_start_time
+                )
+        else:
+            input_backend.click(worker_inputs.mouse_button)
@@ -0,0 +1,171 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the handling of held click events that outlast their period."""
+
+from enum import IntEnum
+from typing import NamedTuple, Optional, override
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import InputBackend
+from src.core.timing import TimingEngine
+
+
+class HoldOverrunPolicy(IntEnum):
+    """Enum for the supported ways of handling held click events that overrun."""
+
+    STRETCH = 0
+    TRUNCATE = 1
+    OVERLAP = 2
+
+
+class HoldStats(NamedTuple):
+    """Counters for the held click events that overran and how they were handled."""
+
+    overrun_events: int
+    truncated_holds: int
+    overlapped_releases: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the hold counters."""
+        return (
+            f"(overrun_events={self.overrun_events}, "
+            f"truncated_holds={self.truncated_holds}, "
+            f"overlapped_releases={self.overlapped_releases})"
+        )
+
+
+class HoldController:
+    """
+    Applies the hold overrun policy to the held clicks of a run, where an event
+    overruns when its clicks take longer than the period until the next event:
+        - STRETCH lets the event run long, leaving the missed slots
+          to the schedule's overrun policy.
+        - TRUNCATE shortens each hold so the event's clicks fit the period,
+          leaving room for sending each press and release and for waking up
+          for the next event.
+        - OVERLAP hands each release to a release timer rather than waiting
+          out the hold, so the next event starts on time. A release that is
+          still pending at the next press is sent just before that press.
+    The release timer is a deadline the click worker waits on alongside its
+    own, so releases are sent from the same thread as every other input.
+    """
+
+    DEFAULT_POLICY: HoldOverrunPolicy = HoldOverrunPolicy.STRETCH
+
+    def __init__(self, policy: HoldOverrunPolicy = DEFAULT_POLICY) -> None:
+        self.__policy: HoldOverrunPolicy = policy
+        self.__pending_release: Optional[tuple[InputBackend, MouseButton]] = None
+        self.__release_deadline_ns: int = 0
+        self.__send_cost_ns: int = 0
+        self.__overrun_events: int = 0
+        self.__truncated_holds: int = 0
+        self.__overlapped_releases: int = 0
+
+    @property
+    def policy(self) -> HoldOverrunPolicy:
+        """Returns the hold overrun policy of the run."""
+        return self.__policy
+
+    @property
+    def stats(self) -> HoldStats:
+        """Returns the overrun counters so far."""
+        return HoldStats(
+            self.__overrun_events, self.__truncated_holds, self.__overlapped_releases
+        )
+
+    @property
+    def send_cost_ns(self) -> int:
+        """Returns the longest time sending the press and release of a click took."""
+        return self.__send_cost_ns
+
+    def record_send_cost(self, send_cost_ns: int) -> None:
+        """Records how long sending the press and release of a held click took."""
+        self.__send_cost_ns = max(self.__send_cost_ns, send_cost_ns)
+
+    def hold_length_ns(
+        self,
+        hold_length_ns: int,
+        remaining_ns: int,
+        remaining_clicks: int,
+        burst_spacing_ns: int,
+        wake_margin_ns: int = 0,
+    ) -> int:
+        """
+        Returns how long to hold the next click, truncating it if the policy allows.
+        A truncated hold splits the time remaining in the event evenly between
+        the remaining clicks, so time lost to one click is made up by the rest.
+        The wake margin and the longest send cost of every remaining click are
+        taken off first, so the event ends in time to wake up for the next one.
+        """
+        available_ns = (
+            remaining_ns - wake_margin_ns - remaining_clicks * self.__send_cost_ns
+        )
+        fitted_hold_length_ns = max(
+            0,
+            min(
+                available_ns - (remaining_clicks - 1) * burst_spacing_ns,
+                available_ns // max(1, remaining_clicks),
+            ),
+        )
+        if (
+            self.__policy != HoldOverrunPolicy.TRUNCATE
+            or hold_length_ns <= fitted_hold_length_ns
+        ):
+            return hold_length_ns
+        self.__truncated_holds += 1
+        return fitted_hold_length_ns
+
+    def record_event(self, event_duration_ns: int, period_ns: int) -> None:
+        """Counts the event as overrun if it took longer than the period."""
+        if 0 < period_ns < event_duration_ns:
+            self.__overrun_events += 1
+
+    def defer_release(
+        self, input_backend: InputBackend, mouse_button: MouseButton, deadline_ns: int
+    ) -> None:
+        """Arms the release timer to release the held button at the deadline."""
+        self.__pending_release = (input_backend, mouse_button)
+        self.__release_deadline_ns = deadline_ns
+
+    def settle(
+        self, timing_engine: TimingEngine, press_time_ns: Optional[int] = None
+    ) -> None:
+        """
+        Sends the pending release before the next press at the provided time.
+        The release waits for its own deadline if that comes first, otherwise
+        it is sent at the press time and counted as overlapped.
+        Without a press time, the release always waits for its own deadline.
+        """
+        if self.__pending_release is None:
+            return
+
+        if press_time_ns is None or self.__release_deadline_ns <= press_time_ns:
+            timing_engine.wait_until(self.__release_deadline_ns)
+        else:
+            timing_engine.wait_until(press_time_ns)
+            self.__overlapped_releases += 1
+        self.release()
+
+    def release(self) -> None:
+        """Sends the pending release immediately, if there is one."""
+        if self.__pending_release is None:
+            return
+        input_backend, mouse_button = self.__pending_release
+        self.__pending_release = None
+        input_backend.release(mouse_button)
+        input_backend.flush()
@@ -0,0 +1,249 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the shared global input hook service for Clikr."""
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+from pynput.keyboard import Key, KeyCode, HotKey, Listener as KeyboardListener
+from pynput.mouse import Button as MouseButton, Listener as MouseListener
+
+if TYPE_CHECKING:
+    from src.core.macro import MacroRecorder
+
+HotkeyKeys = frozenset[Key | KeyCode]
+
+
+class InputHookService:
+    """
+    Owns the only OS-level keyboard and mouse hooks and multiplexes them:
+        - Hotkeys are matched against a binding table of pressed key sets,
+          which is swapped as a whole so rebinding never restarts a hook.
+        - Location capture reports the next mouse press, or is cancelled
+          by the cancel key, without starting any additional hooks.
+        - Macro recording hands every mouse and key event to a recorder
+          until the cancel key is pressed, which is not recorded.
+    The keyboard hook lives for the lifetime of the service, while the mouse
+    hook only runs during a location capture or recording, so mouse moves and
+    injected clicks never run a callback competing with the click engine.
+    """
+
+    CANCEL_KEY: Key = Key.esc
+
+    def __init__(self) -> None:
+        self.__lock: threading.Lock = threading.Lock()
+        self.__keyboard_listener: Optional[KeyboardListener] = None
+        self.__mouse_listener: Optional[MouseListener] = None
+        self.__bindings: dict[HotkeyKeys, Callable[[], None]] = {}
+        self.__keys_by_name: dict[str, HotkeyKeys] = {}
+        self.__pressed_keys: set[Key | KeyCode] = set()
+        self.__location_callback: Optional[Callable[[int, int], None]] = None
+        self.__cancel_callback: Optional[Callable[[], None]] = None
+        self.__macro_recorder: Optional["MacroRecorder"] = None
+        self.__recording_callback: Optional[Callable[[], None]] = None
+
+    @classmethod
+    def parse_hotkey(cls, hotkey: str) -> HotkeyKeys:
+        """Returns the set of keys in the provided pynput hotkey string."""
+        return frozenset(HotKey.parse(hotkey))
+
+    def start(self) -> None:
+        """Starts the keyboard hook if it is not already running."""
+        if self.__keyboard_listener is not None:
+            return
+        self.__keyboard_listener = KeyboardListener(
+            on_press=self._on_key_press, on_release=self._on_key_release
+        )
+        self.__keyboard_listener.start()
+        logging.debug("Started keyboard hook")
+
+    def stop(self) -> None:
+        """Stops every hook owned by the service."""
+        if self.__keyboard_listener is not None:
+            self.__keyboard_listener.stop()
+            self.__keyboard_listener = None
+            logging.debug("Stopped keyboard hook")
+
+        if self.__mouse_listener is not None:
+            self.__mouse_listener.stop()
+            self.__mouse_listener = None
+            logging.debug("Stopped mouse hook")
+
+    def bind(
+        self, name: str, hotkey: Optional[str], callback: Callable[[], None]
+    ) -> None:
+        """
+        Binds the provided hotkey to the callback under the provided name,
+        replacing any hotkey previously bound under that name and taking over
+        the hotkey if it was bound under another name.
+        A hotkey of None only removes the previous binding.
+        """
+        keys: Optional[HotkeyKeys] = None
+        if hotkey is not None:
+            try:
+                keys = self.parse_hotkey(hotkey)
+            except ValueError as error:
+                logging.error("Could not parse hotkey %s: %s", hotkey, error)
+
+        with self.__lock:
+            bindings = dict(self.__bindings)
+            keys_by_name = dict(self.__keys_by_name)
+
+            previous_keys = keys_by_name.pop(name, None)
+            if previous_keys is not None:
+                bindings.pop(previous_keys, None)
+
+            if keys is not None:
+                for other_name, other_keys in list(keys_by_name.items()):
+                    if other_keys == keys:
+                        logging.warning(
+                            "Hotkey %s moved from %s to %s", hotkey, other_name, name
+                        )
+                        del keys_by_name[other_name]
+                bindings[keys] = callback
+                keys_by_name[name] = keys
+
+            self.__bindings = bindings
+            self.__keys_by_name = keys_by_name
+
+        logging.debug("Bound %s hotkey to %s", name, hotkey)
+
+    def capture_location(
+        self,
+        location_callback: Callable[[int, int], None],
+        cancel_callback: Callable[[], None],
+    ) -> None:
+        """
+        Reports the position of the next mouse press to the location callback,
+        or calls the cancel callback if the cancel key is pressed first.
+        """
+        self.__location_callback = location_callback
+        self.__cancel_callback = cancel_callback
+
+        self._start_mouse_hook()
+        logging.debug("Started location capture")
+
+    def end_capture(self) -> None:
+        """Ends the current location capture without reporting anything."""
+        self.__location_callback = None
+        self.__cancel_callback = None
+        self._stop_idle_mouse_hook()
+
+    def record(
+        self, macro_recorder: "MacroRecorder", recording_callback: Callable[[], None]
+    ) -> None:
+        """
+        Hands every mouse and key event to the macro recorder until the
+        cancel key is pressed, then calls the recording callback.
+        """
+        self.__recording_callback = recording_callback
+        self.__macro_recorder = macro_recorder
+        self._start_mouse_hook()
+        logging.debug("Started macro recording")
+
+    def end_recording(self) -> None:
+        """Stops handing events to the macro recorder."""
+        self.__macro_recorder = None
+        self.__recording_callback = None
+        self._stop_idle_mouse_hook()
+
+    def _start_mouse_hook(self) -> None:
+        """Starts the mouse hook if it is not already running."""
+        with self.__lock:
+            if self.__mouse_listener is not None:
+                return
+            self.__mouse_listener = MouseListener(
+                on_move=self._on_move, on_click=self._on_click
+            )
+            self.__mouse_listener.start()
+        logging.debug("Started mouse hook")
+
+    def _stop_idle_mouse_hook(self) -> None:
+        """Stops the mouse hook once neither a capture nor a recording needs it."""
+        with self.__lock:
+            if (
+                self.__mouse_listener is None
+                or self.__location_callback is not None
+                or self.__macro_recorder is not None
+            ):
+                return
+            self.__mouse_listener.stop()
+            self.__mouse_listener = None
+        logging.debug("Stopped mouse hook")
+
+    def _canonical(self, key: Optional[Key | KeyCode]) -> Optional[Key | KeyCode]:
+        """Returns the canonical form of a key so it matches the binding table."""
+        if key is None or self.__keyboard_listener is None:
+            return key
+        return self.__keyboard_listener.canonical(key)
+
+    def _on_key_press(self, key: Optional[Key | KeyCode]) -> None:
+        """
+        Handles the cancel key, records the key if a recording is in progress
+        and triggers any hotkey matching the pressed keys.
+        """
+        if key == self.CANCEL_KEY and self.__cancel_callback is not None:
+            cancel_callback = self.__cancel_callback
+            self.end_capture()
+            cancel_callback()
+
+        macro_recorder = self.__macro_recorder
+        if macro_recorder is not None:
+            if key == self.CANCEL_KEY:
+                recording_callback = self.__recording_callback
+                self.end_recording()
+                if recording_callback is not None:
+                    recording_callback()
+            else:
+                macro_recorder.record_key(key, True)
+
+        canonical_key = self._canonical(key)
+        if canonical_key is None or canonical_key in self.__pressed_keys:
+            return
+
+        self.__pressed_keys.add(canonical_key)
+        callback = self.__bindings.get(frozenset(self.__pressed_keys))
+        if callback is not None:
+            callback()
+
+    def _on_key_release(self, key: Optional[Key | KeyCode]) -> None:
+        """Removes the released key from the pressed keys and records it if needed."""
+        self.__pressed_keys.discard(self._canonical(key))
+        macro_recorder = self.__macro_recorder
+        if macro_recorder is not None:
+            macro_recorder.record_key(key, False)
+
+    def _on_move(self, x: int, y: int) -> None:
+        """Records the mouse position if a recording is in progress."""
+        macro_recorder = self.__macro_recorder
+        if macro_recorder is not None:
+            macro_recorder.record_move(int(x), int(y))
+
+    def _on_click(self, x: int, y: int, button: MouseButton, pressed: bool) -> None:
+        """
+        Records the click if a recording is in progress, and reports
+        the press position if a location capture is in progress.
+        """
+        macro_recorder = self.__macro_recorder
+        if macro_recorder is not None:
+            macro_recorder.record_click(int(x), int(y), button, pressed)
+
+        location_callback = self.__location_callback
+        if not pressed or location_callback is None:
+            return
+        self.end_capture()
+        location_callback(int(x), int(y))
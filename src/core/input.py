@@ -17,22 +17,31 @@
 
 import logging
 from enum import IntEnum
-from typing import Optional, Callable, Any
+from functools import partial
+from typing import TYPE_CHECKING, Optional, Callable
 
 from PyQt6.QtWidgets import QLineEdit, QComboBox, QKeySequenceEdit, QPushButton
-from pynput.keyboard import (
-    Key,
-    Listener as KeyboardListener,
-    HotKey,
-    KeyCode,
+from pynput.mouse import Button as MouseButton
+
+from src.core.actions import HotkeyAction
+from src.core.backends import (
+    InputBackend,
+    InputBackendError,
+    InputBackendType,
+    create_input_backend,
 )
-from pynput.mouse import (
-    Button as MouseButton,
-    Controller as MouseController,
-    Listener as MouseListener,
-)
-
 from src.core.click_worker import WorkerInputs
+from src.core.hooks import InputHookService
+from src.core.holds import HoldController, HoldOverrunPolicy
+from src.core.pointer import PointerTracker
+from src.core.schedule import EventSchedule, OverrunPolicy
+from src.core.timing import TimingEngine, TimingPolicy
+
+if TYPE_CHECKING:
+    from src.core.locator import TemplateLocatorSettings
+    from src.core.macro import MacroSettings
+    from src.core.sequence import ClickSequence, SequenceStep
+    from src.core.trigger import PixelTriggerSettings
 
 
 class InputTimescale(IntEnum):
@@ -42,6 +51,7 @@ class InputTimescale(IntEnum):
     SECONDS = 1
     MINUTES = 2
     HOURS = 3
+    CLICKS_PER_SECOND = 4
 
 
 class ChangeLocationListener:
@@ -49,98 +59,66 @@ class ChangeLocationListener:
 
     def __init__(
         self,
+        input_hook_service: InputHookService,
         change_location_callback: Callable[[int, int], None],
         change_location_button: Callable[[], QPushButton],
     ) -> None:
+        self.__input_hook_service: InputHookService = input_hook_service
         self.__change_location_callback: Callable[[int, int], None] = (
             change_location_callback
         )
         self.__change_location_button: Callable[[], QPushButton] = (
             change_location_button
         )
-        self.__change_location_listener: Optional[MouseListener] = None
-        self.__cancel_key_listener: Optional[KeyboardListener] = None
-        self.__cancel_key: Key = Key.esc
 
     def start(self) -> None:
         """Starts listening for a new location click or the cancellation key."""
         self.__change_location_button().setEnabled(False)
 
-        def change_location(x: int, y: int, _: MouseButton, pressed: bool) -> None:
+        def change_location(x: int, y: int) -> None:
             """Stops listening and changes the location setting if the mouse clicks."""
-            if pressed:
-                self.__change_location_callback(x, y)
-                self.stop()
-
-        def cancel_change(key: Key | KeyCode | None) -> None:
-            """Stops listening if the cancel key is pressed."""
-            if key == self.__cancel_key:
-                self.stop()
+            self.__change_location_callback(x, y)
+            self.stop()
 
-        self.__cancel_key_listener = KeyboardListener(on_press=cancel_change)
-        self.__cancel_key_listener.start()
-        logging.debug("Started cancellation key listener")
-
-        self.__change_location_listener = MouseListener(on_click=change_location)
-        self.__change_location_listener.start()
-        logging.debug("Started change location click listener")
+        self.__input_hook_service.capture_location(change_location, self.stop)
 
     def stop(self) -> None:
         """Stops listening for a new location click and the cancellation key."""
-        if self.__change_location_listener:
-            self.__change_location_listener.stop()
-            self.__change_location_listener = None
-            logging.debug("Stopped change location click listener")
-
-        if self.__cancel_key_listener:
-            self.__cancel_key_listener.stop()
-            self.__cancel_key_listener = None
-            logging.debug("Stopped cancellation key listener")
-
+        self.__input_hook_service.end_capture()
+        logging.debug("Stopped location capture")
         self.__change_location_button().setEnabled(True)
 
 
 class HotkeyListener:
-    """Handles hotkey detection and execution."""
+    """Handles hotkey detection and execution for a single hotkey action."""
 
     def __init__(
-        self, hotkey_callback: Callable[[], None], hotkey: Callable[[], Optional[str]]
+        self,
+        input_hook_service: InputHookService,
+        hotkey_callback: Callable[[], None],
+        hotkey: Callable[[], Optional[str]],
+        action: HotkeyAction = HotkeyAction.TOGGLE,
     ) -> None:
+        self.__input_hook_service: InputHookService = input_hook_service
         self.__hotkey_callback = hotkey_callback
         self.__hotkey = hotkey
-        self.__hotkey_listener: Optional[KeyboardListener] = None
+        self.__binding_name: str = action.name.lower()
 
     def reset(self) -> None:
-        """Restarts the hotkey listener to update to the current hotkey."""
-        self.stop()
-        self.start()
+        """Rebinds the hotkey in the shared hook service to the current hotkey."""
+        self.__input_hook_service.bind(
+            self.__binding_name, self.__hotkey(), self.__hotkey_callback
+        )
 
     def start(self) -> None:
         """Starts listening for current hotkey."""
-        hotkey = self.__hotkey()
-        if hotkey is not None:
-
-            def for_canonical(
-                function: Callable[[Key | KeyCode | Any], None]
-            ) -> Callable[[Key | KeyCode | Any], None]:
-                return lambda key_event: function(
-                    self.__hotkey_listener.canonical(key_event)
-                )
-
-            pynput_hotkey = HotKey(HotKey.parse(hotkey), self.__hotkey_callback)
-            self.__hotkey_listener = KeyboardListener(
-                on_press=for_canonical(pynput_hotkey.press),
-                on_release=for_canonical(pynput_hotkey.release),
-            )
-            self.__hotkey_listener.start()
-            logging.debug("Started hotkey listener for %s", hotkey)
+        self.reset()
 
     def stop(self) -> None:
         """Stops listening for current hotkey."""
-        if self.__hotkey_listener:
-            self.__hotkey_listener.stop()
-            self.__hotkey_listener = None
-            logging.debug("Stopped hotkey listener")
+        self.__input_hook_service.bind(
+            self.__binding_name, None, self.__hotkey_callback
+        )
 
 
 class InputManager:
@@ -155,6 +133,14 @@ class InputManager:
     DEFAULT_LOCATION: tuple[Optional[int], Optional[int]] = None, None
     DEFAULT_MOUSE_BUTTON: MouseButton = MouseButton.left
     DEFAULT_HOTKEY: Optional[str] = None
+    DEFAULT_TIMING_POLICY: TimingPolicy = TimingEngine.DEFAULT_POLICY
+    DEFAULT_OVERRUN_POLICY: OverrunPolicy = EventSchedule.DEFAULT_OVERRUN_POLICY
+    DEFAULT_INPUT_BACKEND: InputBackendType = InputBackendType.PYNPUT
+    DEFAULT_BURST_SPACING_SECONDS: float = 0.0
+    DEFAULT_POINTER_REVALIDATION_PERIOD_SECONDS: float = (
+        PointerTracker.DEFAULT_REVALIDATION_PERIOD_SECONDS
+    )
+    DEFAULT_HOLD_OVERRUN_POLICY: HoldOverrunPolicy = HoldController.DEFAULT_POLICY
 
     @classmethod
     def _scale_seconds(cls, timescale: InputTimescale, unscaled_value: int) -> float:
@@ -168,12 +154,14 @@ class InputManager:
                 return 60.0 * unscaled_value
             case InputTimescale.HOURS:
                 return 3600.0 * unscaled_value
+            case InputTimescale.CLICKS_PER_SECOND:
+                return 1.0 / unscaled_value if unscaled_value > 0 else 0.0
 
     def __init__(
         self,
         change_location_callback: Callable[[int, int], None],
         change_location_button: Callable[[], QPushButton],
-        hotkey_callback: Callable[[], None],
+        hotkey_callback: Callable[[HotkeyAction], None],
     ):
         self.__unscaled_interval: int = self.DEFAULT_INTERVAL_SECONDS
         self.__interval_timescale: InputTimescale = self.DEFAULT_INTERVAL_TIMESCALE
@@ -185,20 +173,66 @@ class InputManager:
         self.__event_count: Optional[int] = self.DEFAULT_EVENT_COUNT
         self.__location: tuple[Optional[int], Optional[int]] = self.DEFAULT_LOCATION
         self.__mouse_button: MouseButton = self.DEFAULT_MOUSE_BUTTON
-        self.__hotkey: Optional[str] = self.DEFAULT_HOTKEY
-
-        self.__mouse_controller: MouseController = MouseController()
-        self.__change_location_listener: ChangeLocationListener = (
-            ChangeLocationListener(change_location_callback, change_location_button)
+        self.__hotkeys: dict[HotkeyAction, Optional[str]] = {
+            action: self.DEFAULT_HOTKEY for action in HotkeyAction
+        }
+        self.__timing_policy: TimingPolicy = self.DEFAULT_TIMING_POLICY
+        self.__overrun_policy: OverrunPolicy = self.DEFAULT_OVERRUN_POLICY
+        self.__burst_spacing: float = self.DEFAULT_BURST_SPACING_SECONDS
+        self.__pointer_revalidation_period: float = (
+            self.DEFAULT_POINTER_REVALIDATION_PERIOD_SECONDS
         )
-        self.__hotkey_listener: HotkeyListener = HotkeyListener(
-            hotkey_callback, self.hotkey_callable
+        self.__hold_overrun_policy: HoldOverrunPolicy = self.DEFAULT_HOLD_OVERRUN_POLICY
+        self.__pixel_trigger: Optional["PixelTriggerSettings"] = None
+        self.__template_locator: Optional["TemplateLocatorSettings"] = None
+        self.__macro: Optional["MacroSettings"] = None
+        self.__sequence: Optional["ClickSequence"] = None
+
+        self.__input_backend_type: InputBackendType = self.DEFAULT_INPUT_BACKEND
+        self.__input_backend: InputBackend = create_input_backend(
+            self.DEFAULT_INPUT_BACKEND
         )
+        self.__input_hook_service: InputHookService = InputHookService()
+        self.__input_hook_service.start()
+        self.__change_location_listener: ChangeLocationListener = (
+            ChangeLocationListener(
+                self.__input_hook_service,
+                change_location_callback,
+                change_location_button,
+            )
+        )
+        self.__hotkey_listeners: dict[HotkeyAction, HotkeyListener] = {
+            action: HotkeyListener(
+                self.__input_hook_service,
+                partial(hotkey_callback, action),
+                partial(self.action_hotkey, action),
+                action,
+            )
+            for action in HotkeyAction
+        }
 
     @property
     def interval(self) -> float:
-        """Returns the current interval scaled to seconds."""
-        return self._scale_seconds(self.__interval_timescale, self.__unscaled_interval)
+        """
+        Returns the current interval scaled to seconds.
+        With a clicks per second timescale, this is the interval between events.
+        """
+        interval = self._scale_seconds(
+            self.__interval_timescale, self.__unscaled_interval
+        )
+        if self.__interval_timescale == InputTimescale.CLICKS_PER_SECOND:
+            return interval * self.__clicks_per_event
+        return interval
+
+    @property
+    def target_cps(self) -> Optional[float]:
+        """Returns the target clicks per second if the interval is set as a rate."""
+        if (
+            self.__interval_timescale == InputTimescale.CLICKS_PER_SECOND
+            and self.__unscaled_interval > 0
+        ):
+            return float(self.__unscaled_interval)
+        return None
 
     def update_unscaled_interval(self, line_edit: QLineEdit) -> None:
         """Sets the unscaled interval based on the provided input field."""
@@ -296,8 +330,14 @@ class InputManager:
         logging.debug("Set mouse button to %s", mouse_button.name)
 
     def update_hotkey(self, key_sequence_edit: QKeySequenceEdit) -> None:
+        """Sets the current start/stop toggle hotkey based on the provided input field."""
+        self.update_action_hotkey(HotkeyAction.TOGGLE, key_sequence_edit)
+
+    def update_action_hotkey(
+        self, action: HotkeyAction, key_sequence_edit: QKeySequenceEdit
+    ) -> None:
         """
-        Sets the current hotkey based on the provided input field.
+        Sets the hotkey of the provided action based on the provided input field.
         Converts from a PyQt key sequence format to a pynput hotkey format.
         """
         hotkey: Optional[str] = self.DEFAULT_HOTKEY
@@ -307,13 +347,102 @@ class InputManager:
                 f"<{key}>" for key in key_sequence.split("+") if len(key) > 1
             ]
             hotkey = "+".join(keys)
-        self.__hotkey = hotkey
-        logging.debug("Set hotkey to %s", hotkey)
-        self.__hotkey_listener.reset()
+        self.__hotkeys[action] = hotkey
+        logging.debug("Set %s hotkey to %s", action.name, hotkey)
+        self.__hotkey_listeners[action].reset()
+
+    def update_timing_policy(self, timing_policy: TimingPolicy) -> None:
+        """Sets the policy the click worker uses to wait between clicks."""
+        self.__timing_policy = timing_policy
+        logging.debug("Set timing policy to %s", timing_policy.name)
+
+    def update_overrun_policy(self, overrun_policy: OverrunPolicy) -> None:
+        """Sets how the click worker handles click events that fall behind schedule."""
+        self.__overrun_policy = overrun_policy
+        logging.debug("Set overrun policy to %s", overrun_policy.name)
+
+    def update_hold_overrun_policy(
+        self, hold_overrun_policy: HoldOverrunPolicy
+    ) -> None:
+        """Sets how the click worker handles held click events that outlast their period."""
+        self.__hold_overrun_policy = hold_overrun_policy
+        logging.debug("Set hold overrun policy to %s", hold_overrun_policy.name)
+
+    def update_pixel_trigger(
+        self, pixel_trigger: Optional["PixelTriggerSettings"]
+    ) -> None:
+        """Sets the pixel trigger that gates each click event, or None to click freely."""
+        self.__pixel_trigger = pixel_trigger
+        logging.debug("Set pixel trigger to %s", pixel_trigger)
+
+    def update_template_locator(
+        self, template_locator: Optional["TemplateLocatorSettings"]
+    ) -> None:
+        """
+        Sets the template locator that finds the location on screen before
+        each click event, or None to use the fixed location.
+        """
+        self.__template_locator = template_locator
+        logging.debug("Set template locator to %s", template_locator)
+
+    def update_macro(self, macro: Optional["MacroSettings"]) -> None:
+        """
+        Sets the macro that each click event replays instead of clicking,
+        or None to click.
+        """
+        self.__macro = macro
+        logging.debug("Set macro to %s", macro)
+
+    def update_sequence(self, steps: Optional[list["SequenceStep"]]) -> None:
+        """
+        Compiles the steps into the sequence that each click event walks
+        instead of clicking the location, or clears it if there are none.
+        """
+        from src.core.sequence import ClickSequence
+
+        self.__sequence = ClickSequence(steps) if steps else None
+        logging.debug("Set sequence to %s", self.__sequence)
+
+    def update_burst_spacing(self, burst_spacing: float) -> None:
+        """Sets the spacing in seconds between the clicks of each event."""
+        self.__burst_spacing = max(0.0, burst_spacing)
+        logging.debug("Set burst spacing to %f", self.__burst_spacing)
+
+    def update_pointer_revalidation_period(self, revalidation_period: float) -> None:
+        """Sets how often in seconds a fixed location is checked against the real pointer."""
+        self.__pointer_revalidation_period = max(0.0, revalidation_period)
+        logging.debug(
+            "Set pointer revalidation period to %f", self.__pointer_revalidation_period
+        )
+
+    def update_input_backend(self, backend_type: InputBackendType) -> None:
+        """
+        Sets the backend used to inject clicks.
+        Keeps the current backend if the requested one is unavailable.
+        """
+        if backend_type == self.__input_backend_type:
+            return
+
+        try:
+            input_backend = create_input_backend(backend_type)
+        except InputBackendError as error:
+            logging.error(
+                "Could not switch to %s backend: %s", backend_type.name, error
+            )
+            return
+
+        self.__input_backend.close()
+        self.__input_backend = input_backend
+        self.__input_backend_type = backend_type
+        logging.debug("Set input backend to %s", backend_type.name)
 
     def hotkey_callable(self) -> Optional[str]:
         """Returns the current hotkey in pynput format as a non-property to act as a callable."""
-        return self.__hotkey
+        return self.__hotkeys[HotkeyAction.TOGGLE]
+
+    def action_hotkey(self, action: HotkeyAction) -> Optional[str]:
+        """Returns the hotkey of the provided action in pynput format."""
+        return self.__hotkeys[action]
 
     @property
     def worker_inputs(self) -> WorkerInputs:
@@ -329,15 +458,26 @@ class InputManager:
             self.location_y is not None,
             self.hold_length > 0,
             self.__event_count is None,
-            self.__mouse_controller,
+            self.__input_backend,
+            self.__timing_policy,
+            self.__overrun_policy,
+            self.__burst_spacing,
+            self.target_cps,
+            self.__pointer_revalidation_period,
+            self.__hold_overrun_policy,
+            self.__pixel_trigger,
+            self.__template_locator,
+            self.__macro,
+            self.__sequence,
         )
 
     @property
     def can_softlock(self) -> bool:
         """Returns whether to show the softlock prevention pop-up."""
-        return (
-            self.location_x is not None or self.location_y is not None
-        ) and self.__hotkey is None
+        return (self.location_x is not None or self.location_y is not None) and (
+            self.__hotkeys[HotkeyAction.TOGGLE] is None
+            and self.__hotkeys[HotkeyAction.STOP] is None
+        )
 
     def listen_for_location(self) -> None:
         """Starts the change location listener."""
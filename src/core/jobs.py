@@ -0,0 +1,407 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the engine that runs many concurrent click jobs on one thread."""
+
+import heapq
+import logging
+import threading
+import time
+from enum import IntEnum
+from typing import NamedTuple, Optional, override
+
+from src.core.backends import InputBackendType
+from src.core.click_worker import WorkerInputs
+from src.core.schedule import EventSchedule, ScheduleStats
+from src.core.telemetry import TelemetryStats, TimingTelemetry
+from src.core.timerfd import WakeableEvent
+from src.core.timing import TimingEngine, TimingPolicy
+
+JOB_TELEMETRY_CAPACITY: int = 1024
+
+
+def _breaks_hold(held_inputs: WorkerInputs, other_inputs: WorkerInputs) -> bool:
+    """
+    Returns whether a click event with the other inputs would break a held
+    click with the held inputs, by moving the pointer mid-hold or by clicking,
+    and so releasing, the same button. Holds on the null backend send nothing,
+    so nothing can break them.
+    """
+    if held_inputs.input_backend.BACKEND_TYPE == InputBackendType.NULL:
+        return False
+    return (
+        other_inputs.target_location != (None, None)
+        or other_inputs.mouse_button == held_inputs.mouse_button
+    )
+
+
+class JobAction(IntEnum):
+    """Enum for the steps of a click job that are scheduled on the engine thread."""
+
+    EVENT = 0
+    CLICK = 1
+    RELEASE = 2
+
+
+class JobStats(NamedTuple):
+    """Counters and timing accuracy of a single click job."""
+
+    job_id: int
+    events: int
+    is_finished: bool
+    timing: TelemetryStats
+    schedule: ScheduleStats
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the job counters."""
+        return (
+            f"(job_id={self.job_id}, "
+            f"events={self.events}, "
+            f"is_finished={self.is_finished}, "
+            f"timing={self.timing}, "
+            f"schedule={self.schedule})"
+        )
+
+
+class ClickJob:
+    """
+    A single click job driven by the click job engine. Each click event is
+    split into steps that are scheduled separately, so a held click or
+    a spaced burst never blocks the other jobs while it waits:
+        - EVENT starts a click event at its schedule slot and moves the
+          pointer to the job's location.
+        - CLICK sends the next click of the event, or presses it if held.
+        - RELEASE ends a held click once its hold length has passed.
+    """
+
+    def __init__(self, job_id: int, worker_inputs: WorkerInputs) -> None:
+        self.__job_id: int = job_id
+        self.__worker_inputs: WorkerInputs = worker_inputs
+        self.__schedule: EventSchedule = EventSchedule(
+            worker_inputs.interval_ns, worker_inputs.overrun_policy
+        )
+        self.__telemetry: TimingTelemetry = TimingTelemetry(JOB_TELEMETRY_CAPACITY)
+        self.__events: int = 0
+        self.__click_index: int = 0
+        self.__event_start_ns: int = 0
+        self.__is_pressed: bool = False
+        self.__is_finished: bool = False
+
+    @property
+    def job_id(self) -> int:
+        """Returns the identifier of the job."""
+        return self.__job_id
+
+    @property
+    def worker_inputs(self) -> WorkerInputs:
+        """Returns the inputs the job clicks with."""
+        return self.__worker_inputs
+
+    @property
+    def is_pressed(self) -> bool:
+        """Returns whether the job is holding its button down."""
+        return self.__is_pressed
+
+    @property
+    def is_finished(self) -> bool:
+        """Returns whether the job has run all of its click events."""
+        return self.__is_finished
+
+    @property
+    def stats(self) -> JobStats:
+        """Returns the counters and timing accuracy of the job so far."""
+        return JobStats(
+            self.__job_id,
+            self.__events,
+            self.__is_finished,
+            self.__telemetry.stats,
+            self.__schedule.stats,
+        )
+
+    def first_step(self, now_ns: int) -> tuple[int, JobAction]:
+        """Returns when and what the first step of the job is."""
+        return self.__schedule.next_deadline(now_ns), JobAction.EVENT
+
+    def run_step(
+        self, action: JobAction, deadline_ns: int
+    ) -> Optional[tuple[int, JobAction]]:
+        """
+        Runs a step that is due and returns when and what the next step is,
+        or None once the job has run all of its click events.
+        """
+        worker_inputs = self.__worker_inputs
+        input_backend = worker_inputs.input_backend
+        now_ns = time.perf_counter_ns()
+
+        match action:
+            case JobAction.EVENT:
+                self.__telemetry.record(
+                    deadline_ns, now_ns, worker_inputs.clicks_per_event
+                )
+                self.__event_start_ns = now_ns
+                self.__click_index = 0
+                self._move_to_target()
+                if worker_inputs.is_batched_burst:
+                    input_backend.click_burst(
+                        worker_inputs.mouse_button, worker_inputs.clicks_per_event
+                    )
+                    input_backend.flush()
+                    return self._end_event(now_ns)
+                return self._click(now_ns)
+            case JobAction.CLICK:
+                return self._click(now_ns)
+            case JobAction.RELEASE:
+                input_backend.release(worker_inputs.mouse_button)
+                input_backend.flush()
+                self.__is_pressed = False
+                return self._next_click(now_ns)
+
+    def release(self) -> None:
+        """Releases the held button of a job that is removed mid-click."""
+        if self.__is_pressed:
+            input_backend = self.__worker_inputs.input_backend
+            input_backend.release(self.__worker_inputs.mouse_button)
+            input_backend.flush()
+            self.__is_pressed = False
+
+    def _move_to_target(self) -> None:
+        """Moves the pointer to the job's location, keeping any unused coordinate."""
+        target_x, target_y = self.__worker_inputs.target_location
+        if target_x is None and target_y is None:
+            return
+        input_backend = self.__worker_inputs.input_backend
+        if target_x is None or target_y is None:
+            x, y = input_backend.position
+            target_x = x if target_x is None else target_x
+            target_y = y if target_y is None else target_y
+        input_backend.move(target_x, target_y)
+
+    def _click(self, now_ns: int) -> Optional[tuple[int, JobAction]]:
+        """Sends or presses the next click of the event."""
+        worker_inputs = self.__worker_inputs
+        input_backend = worker_inputs.input_backend
+        self.__click_index += 1
+        if worker_inputs.is_using_held_clicks:
+            input_backend.press(worker_inputs.mouse_button)
+            input_backend.flush()
+            self.__is_pressed = True
+            return now_ns + worker_inputs.hold_length_ns, JobAction.RELEASE
+
+        input_backend.click(worker_inputs.mouse_button)
+        input_backend.flush()
+        return self._next_click(now_ns)
+
+    def _next_click(self, now_ns: int) -> Optional[tuple[int, JobAction]]:
+        """Returns the next click of the event, or the next event if it is done."""
+        worker_inputs = self.__worker_inputs
+        if self.__click_index >= worker_inputs.clicks_per_event:
+            return self._end_event(now_ns)
+        click_time_ns = (
+            self.__event_start_ns + self.__click_index * worker_inputs.burst_spacing_ns
+        )
+        return max(now_ns, click_time_ns), JobAction.CLICK
+
+    def _end_event(self, now_ns: int) -> Optional[tuple[int, JobAction]]:
+        """Counts the finished event and returns the start of the next one, if any."""
+        self.__events += 1
+        event_count = self.__worker_inputs.event_count
+        if not self.__worker_inputs.is_continuous and (
+            event_count is None or self.__events >= event_count
+        ):
+            self.__is_finished = True
+            return None
+        return self.__schedule.next_deadline(now_ns), JobAction.EVENT
+
+
+class ClickJobEngine:
+    """
+    Runs many independent click jobs on a single engine thread.
+    Every pending job step sits in one heap ordered by deadline, so the
+    thread only ever waits for the earliest step, runs it and pushes the
+    step that follows it, whatever the number of jobs.
+    Adding or removing a job wakes the thread through the timing engine's
+    stop event, so a new job's first event is never held behind a long wait.
+    The timing engine is calibrated before the thread starts, so the first
+    jobs added are not held up by it.
+    Steps of removed jobs are dropped when they reach the top of the heap.
+    Holds are serialized across jobs: while a job holds its button, the steps
+    of other jobs that would move the pointer or click the same button are
+    deferred until it is released, and then run in deadline order. Only those
+    jobs are delayed by a hold, and their lateness shows in their timing stats.
+    """
+
+    STOP_TIMEOUT_SECONDS: float = 1.0
+
+    def __init__(
+        self, timing_policy: TimingPolicy = TimingEngine.DEFAULT_POLICY
+    ) -> None:
+        self.__lock: threading.Lock = threading.Lock()
+        self.__wake_event: WakeableEvent = WakeableEvent()
+        self.__idle_event: threading.Event = threading.Event()
+        self.__idle_event.set()
+        self.__timing_engine: TimingEngine = TimingEngine(
+            timing_policy, stop_event=self.__wake_event
+        )
+        self.__steps: list[tuple[int, int, int, JobAction]] = []
+        self.__jobs: dict[int, ClickJob] = {}
+        self.__finished_jobs: dict[int, ClickJob] = {}
+        self.__holding_job_ids: set[int] = set()
+        self.__deferred_steps: list[tuple[int, int, JobAction]] = []
+        self.__next_job_id: int = 0
+        self.__next_step_order: int = 0
+        self.__shutdown_requested: bool = False
+        self.__engine_thread: threading.Thread = threading.Thread(
+            target=self._run_engine, name="ClickJobEngine", daemon=True
+        )
+        self.__engine_thread.start()
+
+    @property
+    def job_ids(self) -> list[int]:
+        """Returns the identifiers of the jobs that are still running."""
+        with self.__lock:
+            return list(self.__jobs)
+
+    @property
+    def job_stats(self) -> dict[int, JobStats]:
+        """Returns the stats of every running and finished job by identifier."""
+        with self.__lock:
+            jobs = {**self.__finished_jobs, **self.__jobs}
+            return {job_id: job.stats for job_id, job in sorted(jobs.items())}
+
+    def add(self, worker_inputs: WorkerInputs) -> int:
+        """Starts a click job with the provided inputs and returns its identifier."""
+        with self.__lock:
+            job_id = self.__next_job_id
+            self.__next_job_id += 1
+            job = ClickJob(job_id, worker_inputs)
+            self.__jobs[job_id] = job
+            self._push(job_id, *job.first_step(time.perf_counter_ns()))
+            self.__idle_event.clear()
+        self.__wake_event.set()
+        logging.debug("Added click job %d with inputs %s", job_id, worker_inputs)
+        return job_id
+
+    def remove(self, job_id: int) -> None:
+        """Stops the click job with the provided identifier, releasing any held button."""
+        with self.__lock:
+            job = self.__jobs.pop(job_id, None)
+            if job is None:
+                return
+            job.release()
+            self._track_hold(job)
+            self.__finished_jobs[job_id] = job
+            if not self.__jobs:
+                self.__idle_event.set()
+        self.__wake_event.set()
+        logging.debug("Removed click job %d with %s", job_id, job.stats)
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every job has finished or been removed."""
+        return self.__idle_event.wait(timeout)
+
+    def shutdown(self) -> None:
+        """Removes every job and ends the engine thread."""
+        for job_id in self.job_ids:
+            self.remove(job_id)
+        self.__shutdown_requested = True
+        self.__wake_event.set()
+        self.__engine_thread.join(self.STOP_TIMEOUT_SECONDS)
+        if not self.__engine_thread.is_alive():
+            self.__wake_event.close()
+
+    def _push(self, job_id: int, deadline_ns: int, action: JobAction) -> None:
+        """Adds a job step to the heap, keeping steps with equal deadlines in order."""
+        heapq.heappush(
+            self.__steps, (deadline_ns, self.__next_step_order, job_id, action)
+        )
+        self.__next_step_order += 1
+
+    def _run_engine(self) -> None:
+        """Waits for the earliest job step and runs it until shut down."""
+        timing_engine = self.__timing_engine
+        try:
+            while not self.__shutdown_requested:
+                with self.__lock:
+                    next_deadline = self.__steps[0][0] if self.__steps else None
+
+                try:
+                    if next_deadline is None:
+                        self.__wake_event.wait()
+                        raise InterruptedError("Woken for a new job")
+                    timing_engine.wait_until(next_deadline)
+                except InterruptedError:
+                    self.__wake_event.clear()
+                    continue
+
+                with self.__lock:
+                    self._run_due_step()
+        finally:
+            timing_engine.close()
+
+    def _run_due_step(self) -> None:
+        """Runs the earliest job step if it is due and schedules the step after it."""
+        deadline_ns, _, job_id, action = self.__steps[0]
+        if deadline_ns > time.perf_counter_ns():
+            return
+        heapq.heappop(self.__steps)
+
+        job = self.__jobs.get(job_id)
+        if job is None:
+            return
+        if action != JobAction.RELEASE and self._is_breaking_hold(job):
+            self.__deferred_steps.append((deadline_ns, job_id, action))
+            return
+
+        try:
+            next_step = job.run_step(action, deadline_ns)
+        except Exception:
+            logging.exception("Click job %d failed", job_id)
+            job.release()
+            next_step = None
+        self._track_hold(job)
+
+        if next_step is not None:
+            self._push(job_id, *next_step)
+            return
+
+        del self.__jobs[job_id]
+        self.__finished_jobs[job_id] = job
+        logging.debug("Click job %d finished with %s", job_id, job.stats)
+        if not self.__jobs:
+            self.__idle_event.set()
+
+    def _is_breaking_hold(self, job: ClickJob) -> bool:
+        """Returns whether a step of the job would break another job's held click."""
+        return any(
+            _breaks_hold(self.__jobs[holding_job_id].worker_inputs, job.worker_inputs)
+            for holding_job_id in self.__holding_job_ids
+            if holding_job_id != job.job_id
+        )
+
+    def _track_hold(self, job: ClickJob) -> None:
+        """
+        Records whether the job holds its button, and once it lets go, pushes
+        back the steps that were deferred behind its hold.
+        """
+        if job.is_pressed:
+            self.__holding_job_ids.add(job.job_id)
+            return
+        if job.job_id not in self.__holding_job_ids:
+            return
+        self.__holding_job_ids.remove(job.job_id)
+        for deadline_ns, job_id, action in self.__deferred_steps:
+            self._push(job_id, deadline_ns, action)
+        self.__deferred_steps.clear()
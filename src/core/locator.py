@@ -0,0 +1,257 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the image template locator that finds click targets on screen."""
+
+import re
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, override
+
+import numpy as np
+
+from src.core.screen import ScreenCapture, ScreenRegion, create_screen_capture
+
+DEFAULT_MAX_ERROR: float = 16.0
+DEFAULT_SEARCH_MARGIN: int = 48
+DEFAULT_CACHE_SIZE: int = 8
+LUMA_WEIGHTS_BGR: np.ndarray = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+PPM_HEADER: re.Pattern[bytes] = re.compile(
+    rb"P6(?:\s+|#[^\n]*\n)+(\d+)(?:\s+|#[^\n]*\n)+(\d+)(?:\s+|#[^\n]*\n)+(\d+)\s"
+)
+
+
+def load_template(path: Path) -> np.ndarray:
+    """
+    Returns the RGB image of shape (height, width, 3) stored in the provided
+    NumPy array file or binary PPM file.
+    Raises ValueError if the file does not hold an 8-bit RGB image.
+    """
+    if path.suffix == ".npy":
+        template = np.load(path)
+        if template.ndim != 3 or template.shape[2] != 3 or template.dtype != np.uint8:
+            raise ValueError(f"{path} does not hold an 8-bit RGB image array")
+        return template
+
+    data = path.read_bytes()
+    header = PPM_HEADER.match(data)
+    if header is None or int(header.group(3)) != 255:
+        raise ValueError(f"{path} is not an 8-bit binary PPM image")
+    width, height = int(header.group(1)), int(header.group(2))
+    return np.frombuffer(
+        data, dtype=np.uint8, count=width * height * 3, offset=header.end()
+    ).reshape(height, width, 3)
+
+
+class TemplateLocatorSettings(NamedTuple):
+    """
+    Collection of inputs for a template locator. The template is an RGB image
+    array, and a match may differ from it by the maximum root mean square
+    error in grey levels.
+    """
+
+    template: np.ndarray
+    max_error: float = DEFAULT_MAX_ERROR
+    search_margin: int = DEFAULT_SEARCH_MARGIN
+    cache_size: int = DEFAULT_CACHE_SIZE
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the locator inputs."""
+        return (
+            f"(template={self.template.shape[1]}x{self.template.shape[0]}, "
+            f"max_error={self.max_error}, "
+            f"search_margin={self.search_margin}, "
+            f"cache_size={self.cache_size})"
+        )
+
+
+class LocatorStats(NamedTuple):
+    """Counters for how each of a run's targets was found."""
+
+    locates: int
+    verified_hits: int
+    region_hits: int
+    full_scans: int
+    misses: int
+    mean_locate_ns: float
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the locator counters."""
+        return (
+            f"(locates={self.locates}, "
+            f"verified_hits={self.verified_hits}, "
+            f"region_hits={self.region_hits}, "
+            f"full_scans={self.full_scans}, "
+            f"misses={self.misses}, "
+            f"mean_locate={self.mean_locate_ns / 1e6:.3f}ms)"
+        )
+
+
+class TemplateLocator:
+    """
+    Finds a template image on screen, trying the cheapest search first:
+        - Each recently found position is checked in place, which only
+          compares the template against the pixels already there.
+        - The region around each recent position is searched, which finds
+          a target that moved by up to the search margin.
+        - The whole screen is searched only when every recent region misses.
+    Searches compare grey levels by their sum of squared differences,
+    computed for every position at once through an FFT cross-correlation
+    and an integral image of the squared pixels.
+    """
+
+    def __init__(
+        self,
+        settings: TemplateLocatorSettings,
+        capture_factory: Callable[[ScreenRegion], ScreenCapture] = (
+            create_screen_capture
+        ),
+    ) -> None:
+        self.__settings: TemplateLocatorSettings = settings
+        self.__capture_factory: Callable[[ScreenRegion], ScreenCapture] = (
+            capture_factory
+        )
+        self.__template: np.ndarray = self._to_grey(settings.template[..., ::-1])
+        self.__template_height, self.__template_width = self.__template.shape
+        self.__template_energy: float = float(np.sum(self.__template**2))
+        self.__max_squared_error: float = settings.max_error**2 * self.__template.size
+        self.__spectra: dict[tuple[int, int], np.ndarray] = {}
+        self.__region_capture: ScreenCapture = capture_factory(
+            ScreenRegion(
+                0,
+                0,
+                self.__template_width + 2 * settings.search_margin,
+                self.__template_height + 2 * settings.search_margin,
+            )
+        )
+        self.__screen_capture: Optional[ScreenCapture] = None
+        self.__recent_hits: list[tuple[int, int]] = []
+        self.__locates: int = 0
+        self.__verified_hits: int = 0
+        self.__region_hits: int = 0
+        self.__full_scans: int = 0
+        self.__misses: int = 0
+        self.__locate_total_ns: int = 0
+
+    @classmethod
+    def _to_grey(cls, image: np.ndarray) -> np.ndarray:
+        """Returns the grey levels of a BGR or BGRX image as 64-bit floats."""
+        return (image[..., :3] @ LUMA_WEIGHTS_BGR).astype(np.float64)
+
+    @property
+    def stats(self) -> LocatorStats:
+        """Returns the search counters so far."""
+        return LocatorStats(
+            self.__locates,
+            self.__verified_hits,
+            self.__region_hits,
+            self.__full_scans,
+            self.__misses,
+            self.__locate_total_ns / self.__locates if self.__locates else 0.0,
+        )
+
+    def locate(self) -> Optional[tuple[int, int]]:
+        """Returns the centre of the template on screen, or None if it is not found."""
+        start_time = time.perf_counter_ns()
+        hit = self._search()
+        self.__locates += 1
+        self.__locate_total_ns += time.perf_counter_ns() - start_time
+
+        if hit is None:
+            self.__misses += 1
+            return None
+
+        if hit in self.__recent_hits:
+            self.__recent_hits.remove(hit)
+        self.__recent_hits.insert(0, hit)
+        del self.__recent_hits[self.__settings.cache_size :]
+        return (
+            hit[0] + self.__template_width // 2,
+            hit[1] + self.__template_height // 2,
+        )
+
+    def close(self) -> None:
+        """Releases the screen captures."""
+        self.__region_capture.close()
+        if self.__screen_capture is not None:
+            self.__screen_capture.close()
+
+    def _search(self) -> Optional[tuple[int, int]]:
+        """Returns the top-left position of the template on screen, if found."""
+        margin = self.__settings.search_margin
+        for x, y in self.__recent_hits:
+            region = self.__region_capture.move(x - margin, y - margin)
+            grey = self._to_grey(self.__region_capture.capture())
+            if self._is_match_at(grey, x - region.x, y - region.y):
+                self.__verified_hits += 1
+                return x, y
+
+            match = self._best_match(grey)
+            if match is not None:
+                self.__region_hits += 1
+                return region.x + match[0], region.y + match[1]
+
+        if self.__screen_capture is None:
+            width, height = self.__region_capture.screen_size
+            self.__screen_capture = self.__capture_factory(
+                ScreenRegion(0, 0, width, height)
+            )
+        self.__full_scans += 1
+        return self._best_match(self._to_grey(self.__screen_capture.capture()))
+
+    def _is_match_at(self, grey: np.ndarray, x: int, y: int) -> bool:
+        """Returns whether the template matches the grey image at the provided position."""
+        window = grey[y : y + self.__template_height, x : x + self.__template_width]
+        if window.shape != self.__template.shape:
+            return False
+        return float(np.sum((window - self.__template) ** 2)) <= (
+            self.__max_squared_error
+        )
+
+    def _best_match(self, grey: np.ndarray) -> Optional[tuple[int, int]]:
+        """Returns the position where the template best matches the grey image, if close enough."""
+        height, width = grey.shape
+        if height < self.__template_height or width < self.__template_width:
+            return None
+
+        integral = np.zeros((height + 1, width + 1))
+        np.cumsum(np.cumsum(grey**2, axis=0), axis=1, out=integral[1:, 1:])
+        window_energy = (
+            integral[self.__template_height :, self.__template_width :]
+            - integral[: -self.__template_height, self.__template_width :]
+            - integral[self.__template_height :, : -self.__template_width]
+            + integral[: -self.__template_height, : -self.__template_width]
+        )
+
+        correlation = np.fft.irfft2(
+            np.fft.rfft2(grey) * self._spectrum(grey.shape), s=grey.shape
+        )[self.__template_height - 1 :, self.__template_width - 1 :]
+
+        squared_errors = window_energy - 2 * correlation + self.__template_energy
+        best_index = int(np.argmin(squared_errors))
+        best_y, best_x = divmod(best_index, squared_errors.shape[1])
+        if squared_errors[best_y, best_x] > self.__max_squared_error:
+            return None
+        return best_x, best_y
+
+    def _spectrum(self, shape: tuple[int, int]) -> np.ndarray:
+        """Returns the flipped template's spectrum for an image shape, computing it once."""
+        spectrum = self.__spectra.get(shape)
+        if spectrum is None:
+            spectrum = np.fft.rfft2(self.__template[::-1, ::-1], s=shape)
+            self.__spectra[shape] = spectrum
+        return spectrum
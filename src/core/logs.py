@@ -0,0 +1,26 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the logging setup shared by every Clikr entry point."""
+
+import logging
+
+LOG_FORMAT: str = "%(asctime)s %(levelname)s %(message)s"
+DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Configures the logging with the provided level and the shared formats."""
+    logging.basicConfig(level=level, format=LOG_FORMAT, datefmt=DATETIME_FORMAT)
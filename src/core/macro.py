@@ -0,0 +1,553 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the recording and replay of mouse and keyboard macros."""
+
+import csv
+import json
+import logging
+import queue
+import struct
+import threading
+import time
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, NamedTuple, Optional, override
+
+import numpy as np
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import InputBackend, InputBackendError
+from src.core.errors import MacroError
+from src.core.timing import TimingEngine
+
+DEFAULT_SPEED: float = 1.0
+CHUNK_EVENTS: int = 65536
+PREFETCH_CHUNKS: int = 3
+MACRO_MAGIC: bytes = b"CLIKRMAC"
+MACRO_VERSION: int = 1
+MACRO_HEADER: struct.Struct = struct.Struct("<8sHH")
+MACRO_EVENT_DTYPE: np.dtype = np.dtype(
+    [
+        ("time_ns", "<i8"),
+        ("event_type", "u1"),
+        ("x", "<i4"),
+        ("y", "<i4"),
+        ("code", "<i4"),
+    ]
+)
+BUTTON_CODES: dict[str, int] = {"left": 1, "middle": 2, "right": 3}
+BUTTONS_BY_CODE: dict[int, MouseButton] = {
+    code: MouseButton[name] for name, code in BUTTON_CODES.items()
+}
+
+
+class MacroEventType(IntEnum):
+    """Enum for the recorded input event types."""
+
+    MOVE = 0
+    PRESS = 1
+    RELEASE = 2
+    KEY_PRESS = 3
+    KEY_RELEASE = 4
+    CLICK = 5
+
+
+class MacroSettings(NamedTuple):
+    """Collection of inputs for replaying a macro file at a multiple of its speed."""
+
+    path: Path
+    speed: float = DEFAULT_SPEED
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the macro inputs."""
+        return f"(path={self.path}, speed={self.speed})"
+
+
+class MacroStats(NamedTuple):
+    """Counters for a run's replayed events and how late they were sent."""
+
+    replays: int
+    events: int
+    dropped_moves: int
+    skipped_keys: int
+    mean_lateness_ns: float
+    max_lateness_ns: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the replay counters."""
+        return (
+            f"(replays={self.replays}, "
+            f"events={self.events}, "
+            f"dropped_moves={self.dropped_moves}, "
+            f"skipped_keys={self.skipped_keys}, "
+            f"mean_lateness={self.mean_lateness_ns / 1e6:.3f}ms, "
+            f"max_lateness={self.max_lateness_ns / 1e6:.3f}ms)"
+        )
+
+
+def _key_code(key: Optional[Key | KeyCode]) -> Optional[int]:
+    """Returns the platform virtual key code of a key, the keysym on X11."""
+    if isinstance(key, Key):
+        key = key.value
+    if key is None:
+        return None
+    return key.vk
+
+
+class MacroWriter:
+    """
+    Writes events to a macro file in order.
+    Events are packed into a fixed-size chunk of typed records and the chunk
+    is appended to the file whenever it fills, so memory stays constant
+    however many events are written.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.__file: BinaryIO = path.open("wb")
+        self.__file.write(
+            MACRO_HEADER.pack(MACRO_MAGIC, MACRO_VERSION, MACRO_EVENT_DTYPE.itemsize)
+        )
+        self.__chunk: np.ndarray = np.zeros(CHUNK_EVENTS, dtype=MACRO_EVENT_DTYPE)
+        self.__chunk_length: int = 0
+        self.__event_count: int = 0
+        self.__last_time_ns: int = 0
+
+    @property
+    def is_closed(self) -> bool:
+        """Returns whether the file has been closed."""
+        return self.__file.closed
+
+    @property
+    def event_count(self) -> int:
+        """Returns the number of events written so far."""
+        return self.__event_count
+
+    @property
+    def duration_ns(self) -> int:
+        """Returns the time of the most recent event in nanoseconds."""
+        return self.__last_time_ns
+
+    def append(
+        self, time_ns: int, event_type: MacroEventType, x: int, y: int, code: int
+    ) -> None:
+        """Packs an event into the chunk, writing the chunk out if it is full."""
+        self.__chunk[self.__chunk_length] = (time_ns, event_type, x, y, code)
+        self.__chunk_length += 1
+        self.__event_count += 1
+        self.__last_time_ns = time_ns
+        if self.__chunk_length == CHUNK_EVENTS:
+            self._write_chunk()
+
+    def close(self) -> None:
+        """Writes the events still in the chunk and closes the file."""
+        self._write_chunk()
+        self.__file.close()
+
+    def _write_chunk(self) -> None:
+        """Appends the filled part of the chunk to the file."""
+        if self.__chunk_length:
+            self.__file.write(self.__chunk[: self.__chunk_length].view(np.uint8).data)
+            self.__chunk_length = 0
+
+
+class MacroRecorder:
+    """
+    Records mouse and keyboard events into a macro file as they happen.
+    Event times are in nanoseconds since the recorder was created, and the
+    recording methods may be called from any hook thread.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.__writer: MacroWriter = MacroWriter(path)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__start_time_ns: int = time.perf_counter_ns()
+
+    @property
+    def event_count(self) -> int:
+        """Returns the number of events recorded so far."""
+        return self.__writer.event_count
+
+    @property
+    def duration_ns(self) -> int:
+        """Returns the time of the most recent event in nanoseconds."""
+        return self.__writer.duration_ns
+
+    def record_move(self, x: int, y: int) -> None:
+        """Records the mouse moving to the provided position."""
+        self._append(MacroEventType.MOVE, x, y, 0)
+
+    def record_click(self, x: int, y: int, button: MouseButton, pressed: bool) -> None:
+        """Records a mouse button press or release at the provided position."""
+        button_code = BUTTON_CODES.get(button.name)
+        if button_code is None:
+            return
+        self._append(
+            MacroEventType.PRESS if pressed else MacroEventType.RELEASE,
+            x,
+            y,
+            button_code,
+        )
+
+    def record_key(self, key: Optional[Key | KeyCode], pressed: bool) -> None:
+        """Records a key press or release, skipping keys without a key code."""
+        key_code = _key_code(key)
+        if key_code is None:
+            return
+        self._append(
+            MacroEventType.KEY_PRESS if pressed else MacroEventType.KEY_RELEASE,
+            0,
+            0,
+            key_code,
+        )
+
+    def close(self) -> None:
+        """Writes the events still in memory and closes the file."""
+        with self.__lock:
+            self.__writer.close()
+        logging.debug(
+            "Recorded %d macro events over %.3fs",
+            self.event_count,
+            self.duration_ns / 1e9,
+        )
+
+    def _append(self, event_type: MacroEventType, x: int, y: int, code: int) -> None:
+        """Writes an event stamped with the time since the recorder was created."""
+        time_ns = time.perf_counter_ns() - self.__start_time_ns
+        with self.__lock:
+            if not self.__writer.is_closed:
+                self.__writer.append(time_ns, event_type, x, y, code)
+
+
+def _script_rows(source: Path) -> Iterator[dict[str, Any]]:
+    """Yields the rows of a CSV file with a header, or of a JSON Lines file."""
+    with source.open(newline="") as file:
+        if source.suffix == ".jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def convert_script(source: Path, destination: Path) -> int:
+    """
+    Converts a click script into a macro file and returns its event count.
+    The script is a CSV file with a header, or a JSON Lines file of objects,
+    whose rows have a time_ms or time_ns, an action of click, press, release,
+    move, key_press or key_release (click by default), and an x, y and
+    button (left by default) for mouse actions or a key code for key actions.
+    Rows are streamed through a macro writer, so scripts of any size convert
+    in constant memory.
+    Raises ValueError if a row is invalid or earlier than the row before it.
+    """
+    macro_writer = MacroWriter(destination)
+    try:
+        for row_number, row in enumerate(_script_rows(source), start=1):
+            try:
+                time_ns = (
+                    int(row["time_ns"])
+                    if row.get("time_ns") not in (None, "")
+                    else round(float(row["time_ms"]) * 1e6)
+                )
+                event_type = MacroEventType[str(row.get("action") or "click").upper()]
+                if event_type in (MacroEventType.KEY_PRESS, MacroEventType.KEY_RELEASE):
+                    x, y, code = 0, 0, int(row["key"])
+                else:
+                    x, y = int(row["x"]), int(row["y"])
+                    code = BUTTON_CODES[str(row.get("button") or "left")]
+            except (KeyError, ValueError, TypeError) as error:
+                raise ValueError(
+                    f"{source} row {row_number} is not a valid event: {error}"
+                ) from error
+
+            if time_ns < macro_writer.duration_ns:
+                raise ValueError(
+                    f"{source} row {row_number} is earlier than the row before it"
+                )
+            macro_writer.append(time_ns, event_type, x, y, code)
+    finally:
+        macro_writer.close()
+    return macro_writer.event_count
+
+
+class MacroFile:
+    """
+    Reads the events of a macro file one fixed-size chunk at a time,
+    optionally prefetching the next chunks on a background thread.
+    The file starts with a magic string, a format version and the record size,
+    followed by packed little-endian records of the event time, type,
+    position and button or key code.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.__path: Path = path
+        try:
+            with path.open("rb") as file:
+                header = file.read(MACRO_HEADER.size)
+            file_size = path.stat().st_size
+        except OSError as error:
+            raise MacroError(f"could not read {path}: {error}") from error
+
+        if len(header) < MACRO_HEADER.size:
+            raise MacroError(f"{path} is not a Clikr macro file")
+        magic, version, record_size = MACRO_HEADER.unpack(header)
+        if magic != MACRO_MAGIC:
+            raise MacroError(f"{path} is not a Clikr macro file")
+        if version != MACRO_VERSION or record_size != MACRO_EVENT_DTYPE.itemsize:
+            raise MacroError(f"{path} uses unsupported macro format {version}")
+
+        self.__event_count: int = (file_size - MACRO_HEADER.size) // record_size
+
+    @property
+    def path(self) -> Path:
+        """Returns the path of the macro file."""
+        return self.__path
+
+    @property
+    def event_count(self) -> int:
+        """Returns the number of events in the file."""
+        return self.__event_count
+
+    def prefetched_chunks(self, buffers: list[np.ndarray]) -> Iterator[np.ndarray]:
+        """
+        Yields the same chunks as chunks, while a background thread reads
+        the chunks that follow into the provided record arrays.
+        Each chunk is only valid until the next one is requested, and at most
+        one chunk per array is ever read ahead, so memory stays bounded.
+        """
+        free_buffers: queue.Queue[int] = queue.Queue()
+        for index in range(len(buffers)):
+            free_buffers.put(index)
+        filled_buffers: queue.Queue[Optional[tuple[int, int] | MacroError]] = (
+            queue.Queue()
+        )
+        stop_event = threading.Event()
+        reader_thread = threading.Thread(
+            target=self._prefetch,
+            args=(buffers, free_buffers, filled_buffers, stop_event),
+            name="MacroPrefetch",
+            daemon=True,
+        )
+        reader_thread.start()
+
+        try:
+            while True:
+                filled_buffer = filled_buffers.get()
+                if filled_buffer is None:
+                    return
+                if isinstance(filled_buffer, MacroError):
+                    raise filled_buffer
+                index, length = filled_buffer
+                yield buffers[index][:length]
+                free_buffers.put(index)
+        finally:
+            stop_event.set()
+            free_buffers.put(-1)
+            reader_thread.join()
+
+    def _prefetch(
+        self,
+        buffers: list[np.ndarray],
+        free_buffers: queue.Queue[int],
+        filled_buffers: queue.Queue[Optional[tuple[int, int] | MacroError]],
+        stop_event: threading.Event,
+    ) -> None:
+        """Reads each chunk into the next free array until stopped or done."""
+        staging_buffer = np.zeros(len(buffers[0]), dtype=MACRO_EVENT_DTYPE)
+        try:
+            for chunk in self.chunks(staging_buffer):
+                index = free_buffers.get()
+                if stop_event.is_set():
+                    return
+                buffers[index][: len(chunk)] = chunk
+                filled_buffers.put((index, len(chunk)))
+        except OSError as error:
+            filled_buffers.put(MacroError(f"could not read {self.__path}: {error}"))
+            return
+        except MacroError as error:
+            filled_buffers.put(error)
+            return
+        filled_buffers.put(None)
+
+    def chunks(self, chunk: np.ndarray) -> Iterator[np.ndarray]:
+        """
+        Yields the events of the file in order, read into the provided record
+        array and returned as views of it, so a chunk is only valid until
+        the next one is read.
+        """
+        with self.__path.open("rb") as file:
+            file.seek(MACRO_HEADER.size)
+            remaining = self.__event_count
+            while remaining > 0:
+                length = min(remaining, len(chunk))
+                buffer = chunk[:length].view(np.uint8)
+                if file.readinto(buffer) != buffer.nbytes:
+                    raise MacroError(f"{self.__path} ended unexpectedly")
+                remaining -= length
+                yield chunk[:length]
+
+
+class MacroPlayer:
+    """
+    Replays a macro file through an input backend with its original timing.
+    Each event is sent at its absolute deadline from the start of the replay
+    divided by the speed, so lateness never accumulates across events.
+    The file is read ahead on a background thread into a few fixed chunks,
+    so a replay of any length runs in constant memory without stalling on
+    disk reads, and each chunk's deadlines are computed in one vectorised
+    pass before its events are sent.
+    A move that is already late is dropped if the next move is late too,
+    so a replay that falls behind catches up without sending stale positions.
+    Any button or key still held when a replay ends or is stopped is released.
+    """
+
+    def __init__(self, settings: MacroSettings) -> None:
+        self.__settings: MacroSettings = settings
+        self.__macro_file: MacroFile = MacroFile(settings.path)
+        self.__buffers: list[np.ndarray] = [
+            np.zeros(CHUNK_EVENTS, dtype=MACRO_EVENT_DTYPE)
+            for _ in range(PREFETCH_CHUNKS)
+        ]
+        self.__held_buttons: set[MouseButton] = set()
+        self.__held_keys: set[int] = set()
+        self.__is_key_supported: bool = True
+        self.__replays: int = 0
+        self.__events: int = 0
+        self.__dropped_moves: int = 0
+        self.__skipped_keys: int = 0
+        self.__lateness_total_ns: int = 0
+        self.__max_lateness_ns: int = 0
+
+    @property
+    def settings(self) -> MacroSettings:
+        """Returns the inputs of the player."""
+        return self.__settings
+
+    @property
+    def stats(self) -> MacroStats:
+        """Returns the replay counters so far."""
+        return MacroStats(
+            self.__replays,
+            self.__events,
+            self.__dropped_moves,
+            self.__skipped_keys,
+            self.__lateness_total_ns / self.__events if self.__events else 0.0,
+            self.__max_lateness_ns,
+        )
+
+    def play(
+        self,
+        input_backend: InputBackend,
+        timing_engine: TimingEngine,
+        start_time_ns: int,
+        wait_while_paused: Callable[[], int],
+    ) -> None:
+        """
+        Replays the macro once from the provided start time.
+        The pause callback is checked before each event and returns how long
+        it held the replay, which moves the rest of the replay later.
+        Raises InterruptedError if the timing engine is stopped first.
+        """
+        speed = self.__settings.speed
+        try:
+            for chunk in self.__macro_file.prefetched_chunks(self.__buffers):
+                deadlines = (chunk["time_ns"] / speed).astype(np.int64).tolist()
+                event_types = chunk["event_type"].tolist()
+                xs = chunk["x"].tolist()
+                ys = chunk["y"].tolist()
+                codes = chunk["code"].tolist()
+                last_index = len(deadlines) - 1
+
+                for index, event_type in enumerate(event_types):
+                    if (
+                        event_type == MacroEventType.MOVE
+                        and index < last_index
+                        and event_types[index + 1] == MacroEventType.MOVE
+                        and start_time_ns + deadlines[index + 1]
+                        <= time.perf_counter_ns()
+                    ):
+                        self.__dropped_moves += 1
+                        continue
+
+                    timing_engine.wait_until(start_time_ns + deadlines[index])
+                    start_time_ns += wait_while_paused()
+                    send_time = time.perf_counter_ns()
+                    self._send(
+                        input_backend, event_type, xs[index], ys[index], codes[index]
+                    )
+                    input_backend.flush()
+                    lateness_ns = max(0, send_time - start_time_ns - deadlines[index])
+                    self.__events += 1
+                    self.__lateness_total_ns += lateness_ns
+                    self.__max_lateness_ns = max(self.__max_lateness_ns, lateness_ns)
+        finally:
+            self.release(input_backend)
+        self.__replays += 1
+
+    def release(self, input_backend: InputBackend) -> None:
+        """Releases every button and key the replay is still holding."""
+        for button in self.__held_buttons:
+            input_backend.release(button)
+        for key_code in self.__held_keys:
+            input_backend.release_key(key_code)
+        if self.__held_buttons or self.__held_keys:
+            input_backend.flush()
+        self.__held_buttons.clear()
+        self.__held_keys.clear()
+
+    def _send(
+        self, input_backend: InputBackend, event_type: int, x: int, y: int, code: int
+    ) -> None:
+        """Sends a single recorded event through the input backend."""
+        match event_type:
+            case MacroEventType.MOVE:
+                input_backend.move(x, y)
+            case MacroEventType.PRESS | MacroEventType.RELEASE:
+                button = BUTTONS_BY_CODE[code]
+                input_backend.move(x, y)
+                if event_type == MacroEventType.PRESS:
+                    input_backend.press(button)
+                    self.__held_buttons.add(button)
+                else:
+                    input_backend.release(button)
+                    self.__held_buttons.discard(button)
+            case MacroEventType.CLICK:
+                input_backend.move(x, y)
+                input_backend.click(BUTTONS_BY_CODE[code])
+            case MacroEventType.KEY_PRESS | MacroEventType.KEY_RELEASE:
+                self._send_key(input_backend, event_type, code)
+
+    def _send_key(
+        self, input_backend: InputBackend, event_type: int, key_code: int
+    ) -> None:
+        """Sends a key event, skipping every key if the backend cannot send them."""
+        if not self.__is_key_supported:
+            self.__skipped_keys += 1
+            return
+        try:
+            if event_type == MacroEventType.KEY_PRESS:
+                input_backend.press_key(key_code)
+                self.__held_keys.add(key_code)
+            else:
+                input_backend.release_key(key_code)
+                self.__held_keys.discard(key_code)
+        except InputBackendError as error:
+            logging.warning("Skipping the macro's key events: %s", error)
+            self.__is_key_supported = False
+            self.__skipped_keys += 1
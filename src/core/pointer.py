@@ -0,0 +1,149 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides pointer position tracking for the Clikr click worker."""
+
+from typing import NamedTuple, Optional, override
+
+from src.core.backends import InputBackend
+
+
+class MousePosition(NamedTuple):
+    """Coordinate pair for a mouse's position on the screen."""
+
+    x: int
+    y: int
+
+
+class PointerStats(NamedTuple):
+    """Counters for the position queries and moves a run needed or skipped."""
+
+    queries: int
+    skipped_queries: int
+    moves: int
+    skipped_moves: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the pointer counters."""
+        return (
+            f"(queries={self.queries}, "
+            f"skipped_queries={self.skipped_queries}, "
+            f"moves={self.moves}, "
+            f"skipped_moves={self.skipped_moves})"
+        )
+
+
+class PointerTracker:
+    """
+    Moves the pointer to the target location before each click event while
+    avoiding position queries, which each cost a round trip to the system:
+        - Without a target location, the pointer is never queried or moved.
+        - With both coordinates fixed, the target is known ahead of time, so
+          the real position is only queried once per re-validation period.
+        - With one coordinate user-controlled, the position is queried every
+          event and the pointer is only moved if it is off target.
+    """
+
+    DEFAULT_REVALIDATION_PERIOD_SECONDS: float = 0.1
+
+    def __init__(
+        self,
+        input_backend: InputBackend,
+        location: tuple[Optional[int], Optional[int]],
+        revalidation_period_ns: int,
+    ) -> None:
+        self.__input_backend: InputBackend = input_backend
+        self.__target_x: Optional[int] = location[0]
+        self.__target_y: Optional[int] = location[1]
+        self.__revalidation_period_ns: int = revalidation_period_ns
+        self.__next_revalidation_ns: Optional[int] = None
+        self.__queries: int = 0
+        self.__skipped_queries: int = 0
+        self.__moves: int = 0
+        self.__skipped_moves: int = 0
+
+    @property
+    def stats(self) -> PointerStats:
+        """Returns the query and move counters so far."""
+        return PointerStats(
+            self.__queries, self.__skipped_queries, self.__moves, self.__skipped_moves
+        )
+
+    @property
+    def is_using_location(self) -> bool:
+        """Returns whether either coordinate of the target is fixed."""
+        return self.__target_x is not None or self.__target_y is not None
+
+    @property
+    def is_fully_fixed(self) -> bool:
+        """Returns whether both coordinates of the target are fixed."""
+        return self.__target_x is not None and self.__target_y is not None
+
+    def retarget(self, location: tuple[Optional[int], Optional[int]]) -> None:
+        """Changes the target location and re-validates it on the next event."""
+        self.__target_x, self.__target_y = location
+        self.__next_revalidation_ns = None
+
+    def move_to_target(self, now_ns: int) -> None:
+        """Moves the pointer to the target location if it may not already be there."""
+        if not self.is_using_location:
+            return
+
+        if self.is_fully_fixed:
+            self._move_to_fixed_target(now_ns)
+            return
+
+        self._move_to_partial_target()
+
+    def _move_to_fixed_target(self, now_ns: int) -> None:
+        """Re-validates the pointer position once per period and moves if needed."""
+        if (
+            self.__next_revalidation_ns is not None
+            and now_ns < self.__next_revalidation_ns
+        ):
+            self.__skipped_queries += 1
+            self.__skipped_moves += 1
+            return
+
+        self.__next_revalidation_ns = now_ns + self.__revalidation_period_ns
+        assert self.__target_x is not None and self.__target_y is not None
+        self._move_if_different(
+            self._query_position(), MousePosition(self.__target_x, self.__target_y)
+        )
+
+    def _move_to_partial_target(self) -> None:
+        """Combines the fixed coordinate with the user-controlled one and moves if needed."""
+        current_position = self._query_position()
+        next_position = MousePosition(
+            self.__target_x if self.__target_x is not None else current_position.x,
+            self.__target_y if self.__target_y is not None else current_position.y,
+        )
+        self._move_if_different(current_position, next_position)
+
+    def _query_position(self) -> MousePosition:
+        """Returns the real position of the pointer from the input backend."""
+        self.__queries += 1
+        return MousePosition(*self.__input_backend.position)
+
+    def _move_if_different(
+        self, current_position: MousePosition, next_position: MousePosition
+    ) -> None:
+        """Moves the pointer to the next position unless it is already there."""
+        if current_position == next_position:
+            self.__skipped_moves += 1
+            return
+        self.__input_backend.move(next_position.x, next_position.y)
+        self.__moves += 1
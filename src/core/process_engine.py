@@ -0,0 +1,475 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the process-isolated click engine for Clikr."""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from enum import IntEnum
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional
+
+from src.core.backends import InputBackend, InputBackendType, create_input_backend
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.logs import setup_logging
+from src.core.realtime import RealtimeOutcome, RealtimeSettings, RealtimeTuner
+from src.core.telemetry import TimingTelemetry
+from src.core.timerfd import WakeableEvent
+from src.core.timing import TimingEngine
+
+
+class EngineState(IntEnum):
+    """Enum for the states of the engine process published in the control block."""
+
+    IDLE = 0
+    RUNNING = 1
+
+
+class EngineCommand(IntEnum):
+    """Enum for the commands sent to the engine process through the command pipe."""
+
+    START = 0
+    STOP = 1
+    UPDATE = 2
+    PAUSE = 3
+    RESUME = 4
+    SHUTDOWN = 5
+
+
+class EngineEvent(IntEnum):
+    """Enum for the events sent back from the engine process."""
+
+    FINISHED = 0
+    REALTIME_OUTCOMES = 1
+
+
+class EngineControlBlock:
+    """
+    Shared memory holding the engine state, run counters and timing telemetry,
+    so either process can read them without a round trip through the pipe.
+    The first process creates the block and the engine process attaches to it,
+    sharing the creator's resource tracker so the block is removed only once.
+    """
+
+    STATE: int = 0
+    COMPLETED_RUNS: int = 1
+    INTERRUPTED_RUNS: int = 2
+    FIRST_CLICK_LATENCY_NS: int = 3
+    HEADER_FIELDS: int = 4
+    FIELD_SIZE: int = 8
+
+    def __init__(self, telemetry_capacity: int, name: Optional[str] = None) -> None:
+        header_size = self.HEADER_FIELDS * self.FIELD_SIZE
+        self.__is_owner: bool = name is None
+        if name is None:
+            self.__shared_memory: SharedMemory = SharedMemory(
+                create=True,
+                size=header_size + TimingTelemetry.buffer_size(telemetry_capacity),
+            )
+        else:
+            self.__shared_memory = SharedMemory(name)
+
+        buffer = self.__shared_memory.buf
+        assert buffer is not None
+        self.__header: memoryview = buffer[:header_size].cast("q")
+        self.__telemetry: TimingTelemetry = TimingTelemetry(
+            telemetry_capacity, buffer[header_size:]
+        )
+        if self.__is_owner:
+            self.__header[self.FIRST_CLICK_LATENCY_NS] = -1
+
+    @property
+    def name(self) -> str:
+        """Returns the name other processes use to attach to the block."""
+        return self.__shared_memory.name
+
+    @property
+    def telemetry(self) -> TimingTelemetry:
+        """Returns the timing telemetry stored in the block."""
+        return self.__telemetry
+
+    @property
+    def state(self) -> EngineState:
+        """Returns the published state of the engine process."""
+        return EngineState(self.__header[self.STATE])
+
+    @state.setter
+    def state(self, state: EngineState) -> None:
+        """Sets the published state of the engine process."""
+        self.__header[self.STATE] = state
+
+    @property
+    def completed_runs(self) -> int:
+        """Returns how many runs reached their event count."""
+        return self.__header[self.COMPLETED_RUNS]
+
+    @property
+    def interrupted_runs(self) -> int:
+        """Returns how many runs were stopped before reaching their event count."""
+        return self.__header[self.INTERRUPTED_RUNS]
+
+    @property
+    def first_click_latency_ns(self) -> Optional[int]:
+        """Returns the time from the trigger until the first click of the most recent run."""
+        latency_ns = self.__header[self.FIRST_CLICK_LATENCY_NS]
+        return None if latency_ns < 0 else latency_ns
+
+    def record_run(
+        self, is_completed: bool, first_click_latency_ns: Optional[int]
+    ) -> None:
+        """Counts a finished run and publishes its first click latency."""
+        counter = self.COMPLETED_RUNS if is_completed else self.INTERRUPTED_RUNS
+        self.__header[counter] += 1
+        self.__header[self.FIRST_CLICK_LATENCY_NS] = (
+            -1 if first_click_latency_ns is None else first_click_latency_ns
+        )
+
+    def close(self) -> None:
+        """Detaches from the block, and removes it if this process created it."""
+        self.__telemetry.release()
+        self.__header.release()
+        self.__shared_memory.close()
+        if self.__is_owner:
+            self.__shared_memory.unlink()
+
+
+class _EngineProcess:
+    """Runs the click worker in the engine process on behalf of the manager."""
+
+    def __init__(
+        self,
+        control_block: EngineControlBlock,
+        command_connection: Connection,
+        event_connection: Connection,
+    ) -> None:
+        self.__control_block: EngineControlBlock = control_block
+        self.__command_connection: Connection = command_connection
+        self.__event_connection: Connection = event_connection
+        self.__stop_event: WakeableEvent = WakeableEvent()
+        self.__idle_event: threading.Event = threading.Event()
+        self.__resume_event: threading.Event = threading.Event()
+        self.__resume_event.set()
+        self.__start_requests: queue.SimpleQueue[
+            Optional[tuple[WorkerInputs, InputBackendType, int]]
+        ] = queue.SimpleQueue()
+        self.__input_backends: dict[InputBackendType, InputBackend] = {}
+        self.__is_run_completed: bool = False
+        self.__click_worker: ClickWorker = ClickWorker(
+            self.__stop_event,
+            self.__idle_event,
+            self.__resume_event,
+            control_block.telemetry,
+            self._on_run_completed,
+        )
+
+    def run(self) -> None:
+        """Runs each start request on this thread until asked to shut down."""
+        threading.Thread(
+            target=self._receive_commands, name="EngineCommands", daemon=True
+        ).start()
+
+        while (request := self.__start_requests.get()) is not None:
+            worker_inputs, backend_type, trigger_time_ns = request
+            self.__is_run_completed = False
+            try:
+                worker_inputs = worker_inputs._replace(
+                    input_backend=self._input_backend(backend_type)
+                )
+                self.__click_worker.start(worker_inputs, trigger_time_ns)
+            except Exception:
+                logging.exception("Click worker failed")
+
+            self.__control_block.record_run(
+                self.__is_run_completed, self.__click_worker.first_click_latency_ns
+            )
+            self.__control_block.state = EngineState.IDLE
+            if self.__is_run_completed:
+                self.__event_connection.send((EngineEvent.FINISHED, None))
+
+        for input_backend in self.__input_backends.values():
+            input_backend.close()
+        self.__stop_event.close()
+
+    def _input_backend(self, backend_type: InputBackendType) -> InputBackend:
+        """Returns this process's input backend of the provided type."""
+        if backend_type not in self.__input_backends:
+            self.__input_backends[backend_type] = create_input_backend(backend_type)
+        return self.__input_backends[backend_type]
+
+    def _on_run_completed(self) -> None:
+        """Marks the current run as having reached its event count."""
+        self.__is_run_completed = True
+
+    def _receive_commands(self) -> None:
+        """Applies commands from the manager until it shuts down or goes away."""
+        while True:
+            try:
+                command, payload = self.__command_connection.recv()
+            except (EOFError, OSError):
+                command, payload = EngineCommand.SHUTDOWN, None
+
+            match command:
+                case EngineCommand.START:
+                    self.__stop_event.clear()
+                    self.__resume_event.set()
+                    self.__start_requests.put(payload)
+                case EngineCommand.STOP:
+                    self.__stop_event.set()
+                    self.__resume_event.set()
+                case EngineCommand.UPDATE:
+                    self.__click_worker.retune(payload)
+                case EngineCommand.PAUSE:
+                    self.__resume_event.clear()
+                case EngineCommand.RESUME:
+                    self.__resume_event.set()
+                case EngineCommand.SHUTDOWN:
+                    self.__stop_event.set()
+                    self.__resume_event.set()
+                    self.__start_requests.put(None)
+                    return
+
+
+def _run_engine_process(
+    control_block_name: str,
+    telemetry_capacity: int,
+    command_connection: Connection,
+    event_connection: Connection,
+    log_level: int,
+    realtime_settings: RealtimeSettings,
+) -> None:
+    """Entry point of the engine process."""
+    setup_logging(log_level)
+    if realtime_settings.is_enabled:
+        event_connection.send(
+            (
+                EngineEvent.REALTIME_OUTCOMES,
+                RealtimeTuner(realtime_settings).apply(),
+            )
+        )
+    TimingEngine.calibrate()
+    control_block = EngineControlBlock(telemetry_capacity, control_block_name)
+    try:
+        _EngineProcess(control_block, command_connection, event_connection).run()
+    finally:
+        control_block.close()
+        logging.debug("Engine process exited")
+
+
+class ProcessClickWorkerManager:
+    """
+    Manages a click worker running in a dedicated engine process, so that UI
+    repaints, logging and hook callbacks in this process cannot delay clicks
+    by holding the GIL.
+    Commands go to the engine process through a pipe, while its state, counters
+    and telemetry are read straight from a shared memory control block.
+    Offers the same interface as ClickWorkerManager, with any real-time
+    tuning applied to the thread running the click worker in the engine process.
+    """
+
+    STOP_TIMEOUT_SECONDS: float = 1.0
+    STOP_POLL_SECONDS: float = 0.0002
+
+    def __init__(
+        self,
+        finished_callback: Callable[[], None],
+        realtime_settings: RealtimeSettings = RealtimeSettings(),
+        telemetry_capacity: int = TimingTelemetry.DEFAULT_CAPACITY,
+    ) -> None:
+        context = multiprocessing.get_context("spawn")
+        self.__finished_callback: Callable[[], None] = finished_callback
+        self.__control_block: EngineControlBlock = EngineControlBlock(
+            telemetry_capacity
+        )
+        self.__control_lock: threading.RLock = threading.RLock()
+        self.__is_paused: bool = False
+        self.__last_stop_latency_ns: Optional[int] = None
+        self.__realtime_outcomes: list[RealtimeOutcome] = []
+
+        command_receiver, self.__command_sender = context.Pipe(duplex=False)
+        self.__event_receiver, event_sender = context.Pipe(duplex=False)
+        self.__engine_process = context.Process(
+            target=_run_engine_process,
+            args=(
+                self.__control_block.name,
+                telemetry_capacity,
+                command_receiver,
+                event_sender,
+                logging.getLogger().getEffectiveLevel(),
+                realtime_settings,
+            ),
+            name="ClickEngine",
+            daemon=True,
+        )
+        self.__engine_process.start()
+        command_receiver.close()
+        event_sender.close()
+
+        self.__event_thread: threading.Thread = threading.Thread(
+            target=self._receive_events, name="EngineEvents", daemon=True
+        )
+        self.__event_thread.start()
+        logging.debug("Started engine process %d", self.__engine_process.pid)
+
+    @property
+    def telemetry(self) -> TimingTelemetry:
+        """Returns the timing telemetry of the current or most recent run."""
+        return self.__control_block.telemetry
+
+    @property
+    def control_block(self) -> EngineControlBlock:
+        """Returns the control block shared with the engine process."""
+        return self.__control_block
+
+    @property
+    def last_stop_latency_ns(self) -> Optional[int]:
+        """Returns how long the most recent stop took for the click worker to finish."""
+        return self.__last_stop_latency_ns
+
+    @property
+    def realtime_outcomes(self) -> list[RealtimeOutcome]:
+        """Returns whether each real-time tuning option was applied in the engine process."""
+        return self.__realtime_outcomes
+
+    @property
+    def is_running(self) -> bool:
+        """Returns whether the click worker is currently running."""
+        return self.__control_block.state != EngineState.IDLE
+
+    @property
+    def is_paused(self) -> bool:
+        """Returns whether the click worker is running but paused."""
+        return self.is_running and self.__is_paused
+
+    def _send(self, command: EngineCommand, payload: Any = None) -> None:
+        """Sends a command to the engine process."""
+        self.__command_sender.send((command, payload))
+
+    def _receive_events(self) -> None:
+        """Reports runs that finished in the engine process to the finished callback."""
+        while True:
+            try:
+                event, payload = self.__event_receiver.recv()
+            except (EOFError, OSError):
+                return
+            match event:
+                case EngineEvent.FINISHED:
+                    self.__finished_callback()
+                case EngineEvent.REALTIME_OUTCOMES:
+                    self.__realtime_outcomes = payload
+
+    def start(
+        self, worker_inputs: WorkerInputs, trigger_time_ns: Optional[int] = None
+    ) -> None:
+        """
+        Sends the engine process a request to start the click worker with the
+        provided inputs. Its own input backend of the same type is used.
+        """
+        if trigger_time_ns is None:
+            trigger_time_ns = time.perf_counter_ns()
+
+        with self.__control_lock:
+            if self.is_running:
+                self.stop()
+                if self.is_running:
+                    logging.error(
+                        "Click worker is still running, ignoring start request"
+                    )
+                    return
+
+            self.__is_paused = False
+            self.__control_block.state = EngineState.RUNNING
+            self._send(
+                EngineCommand.START,
+                (
+                    worker_inputs._replace(input_backend=None),
+                    worker_inputs.input_backend.BACKEND_TYPE,
+                    trigger_time_ns,
+                ),
+            )
+
+    def stop(self) -> None:
+        """Requests the click worker to stop and waits for the engine to go idle."""
+        with self.__control_lock:
+            if not self.is_running:
+                return
+
+            stop_time = time.perf_counter_ns()
+            self._send(EngineCommand.STOP)
+            deadline = time.monotonic() + self.STOP_TIMEOUT_SECONDS
+            while self.is_running and time.monotonic() < deadline:
+                time.sleep(self.STOP_POLL_SECONDS)
+
+            if not self.is_running:
+                self.__last_stop_latency_ns = time.perf_counter_ns() - stop_time
+                logging.debug(
+                    "Stopped engine process click worker in %.3fms",
+                    self.__last_stop_latency_ns / 1e6,
+                )
+                return
+
+            logging.warning(
+                "Click worker did not stop within %.1fs", self.STOP_TIMEOUT_SECONDS
+            )
+
+    def update(self, worker_inputs: WorkerInputs) -> None:
+        """Sends the running click worker the live fields of new inputs to pick up before its next event."""
+        with self.__control_lock:
+            if self.is_running:
+                self._send(EngineCommand.UPDATE, worker_inputs.live_fields)
+
+    def pause(self) -> None:
+        """Holds the click worker before its next click event until resumed."""
+        with self.__control_lock:
+            if not self.is_running:
+                return
+            self.__is_paused = True
+            self._send(EngineCommand.PAUSE)
+            logging.debug("Paused click worker")
+
+    def resume(self) -> None:
+        """Lets a paused click worker continue from where it was paused."""
+        with self.__control_lock:
+            self.__is_paused = False
+            self._send(EngineCommand.RESUME)
+            logging.debug("Resumed click worker")
+
+    def toggle_pause(self) -> None:
+        """Pauses the click worker if it is running, otherwise resumes it."""
+        with self.__control_lock:
+            if self.is_paused:
+                self.resume()
+                return
+            self.pause()
+
+    def shutdown(self) -> None:
+        """Stops the click worker and ends the engine process."""
+        self.stop()
+        try:
+            self._send(EngineCommand.SHUTDOWN)
+        except OSError:
+            pass
+        self.__engine_process.join(self.STOP_TIMEOUT_SECONDS)
+        if self.__engine_process.is_alive():
+            logging.warning("Engine process did not exit, terminating it")
+            self.__engine_process.terminate()
+            self.__engine_process.join()
+        self.__command_sender.close()
+        self.__event_thread.join(self.STOP_TIMEOUT_SECONDS)
+        self.__event_receiver.close()
+        self.__control_block.close()
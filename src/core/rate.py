@@ -0,0 +1,167 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides closed-loop rate control for the target clicks per second mode."""
+
+import logging
+from typing import NamedTuple, Optional, override
+
+from src.core.timing import NANOSECONDS_PER_SECOND
+
+
+class RateStats(NamedTuple):
+    """Summary of how well a run is holding its target rate."""
+
+    target_cps: float
+    sustained_cps: float
+    click_cost_ns: float
+    max_cps: float
+    is_reachable: bool
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the rate stats."""
+        return (
+            f"(target_cps={self.target_cps:.1f}, "
+            f"sustained_cps={self.sustained_cps:.1f}, "
+            f"click_cost={self.click_cost_ns / 1e3:.1f}us, "
+            f"max_cps={self.max_cps:.1f}, "
+            f"is_reachable={self.is_reachable})"
+        )
+
+
+class RateController:
+    """
+    Holds a target number of clicks per second by measuring the cost of each
+    click event and adjusting the sleep budget before the next event.
+    The budget is the event period minus the measured event cost, corrected
+    by a proportional-integral term on how far behind or ahead the run is.
+    """
+
+    PROPORTIONAL_GAIN: float = 0.5
+    INTEGRAL_GAIN: float = 0.05
+    COST_SMOOTHING: float = 0.1
+    WARMUP_EVENTS: int = 10
+
+    def __init__(self, target_cps: float, clicks_per_event: int) -> None:
+        self.__target_cps: float = target_cps
+        self.__clicks_per_event: int = clicks_per_event
+        self.__event_period_ns: float = (
+            clicks_per_event / target_cps * NANOSECONDS_PER_SECOND
+        )
+        self.__start_ns: Optional[int] = None
+        self.__last_event_end_ns: int = 0
+        self.__event_count: int = 0
+        self.__click_count: int = 0
+        self.__event_cost_ns: float = 0.0
+        self.__integral_ns: float = 0.0
+        self.__reported_unreachable: bool = False
+
+    @property
+    def stats(self) -> RateStats:
+        """Returns the rate stats for the events recorded so far."""
+        sustained_cps = 0.0
+        if self.__start_ns is not None and self.__event_count > 1:
+            elapsed_ns = self.__last_event_end_ns - self.__start_ns
+            if elapsed_ns > 0:
+                sustained_cps = self.__click_count * NANOSECONDS_PER_SECOND / elapsed_ns
+
+        click_cost_ns = self.__event_cost_ns / self.__clicks_per_event
+        max_cps = NANOSECONDS_PER_SECOND / click_cost_ns if click_cost_ns > 0 else 0.0
+        is_reachable = click_cost_ns == 0 or max_cps >= self.__target_cps
+        return RateStats(
+            self.__target_cps, sustained_cps, click_cost_ns, max_cps, is_reachable
+        )
+
+    def next_deadline(self, now_ns: int) -> int:
+        """Returns when the next click event should start."""
+        if self.__start_ns is None:
+            self.__start_ns = now_ns
+            return now_ns
+
+        expected_clicks = (
+            (now_ns - self.__start_ns) * self.__target_cps / NANOSECONDS_PER_SECOND
+        )
+        lag_ns = (
+            (expected_clicks - self.__click_count)
+            / self.__target_cps
+            * NANOSECONDS_PER_SECOND
+        )
+        self.__integral_ns += lag_ns * self.INTEGRAL_GAIN
+        self.__integral_ns = max(
+            -self.__event_period_ns, min(self.__integral_ns, self.__event_period_ns)
+        )
+
+        sleep_budget_ns = (
+            self.__event_period_ns
+            - self.__event_cost_ns
+            - self.PROPORTIONAL_GAIN * lag_ns
+            - self.__integral_ns
+        )
+        sleep_budget_ns = max(0.0, min(sleep_budget_ns, 2 * self.__event_period_ns))
+        return self.__last_event_end_ns + round(sleep_budget_ns)
+
+    def retarget(self, target_cps: float, clicks_per_event: int) -> None:
+        """
+        Changes the target rate mid-run while keeping the measured click cost.
+        The sustained rate is measured again from the most recent event.
+        """
+        self.__target_cps = target_cps
+        self.__clicks_per_event = clicks_per_event
+        self.__event_period_ns = clicks_per_event / target_cps * NANOSECONDS_PER_SECOND
+        self.__integral_ns = 0.0
+        self.__reported_unreachable = False
+        if self.__start_ns is not None:
+            self.__start_ns = self.__last_event_end_ns
+            self.__click_count = 0
+
+    def shift(self, delta_ns: int) -> None:
+        """Moves the run later by the provided time so a pause is not counted as lag."""
+        if self.__start_ns is not None:
+            self.__start_ns += delta_ns
+            self.__last_event_end_ns += delta_ns
+
+    def record_event(self, start_ns: int, end_ns: int) -> None:
+        """Records the start and end of a click event to measure its cost."""
+        event_cost_ns = end_ns - start_ns
+        if self.__event_count == 0:
+            self.__event_cost_ns = event_cost_ns
+        else:
+            self.__event_cost_ns += self.COST_SMOOTHING * (
+                event_cost_ns - self.__event_cost_ns
+            )
+
+        self.__last_event_end_ns = end_ns
+        self.__event_count += 1
+        self.__click_count += self.__clicks_per_event
+
+        if self.__event_count >= self.WARMUP_EVENTS:
+            self._report_reachability()
+
+    def _report_reachability(self) -> None:
+        """Warns once if the measured click cost makes the target rate unreachable."""
+        if self.__reported_unreachable:
+            return
+        stats = self.stats
+        if stats.is_reachable:
+            return
+        self.__reported_unreachable = True
+        logging.warning(
+            "Target of %.1f clicks per second is unreachable, "
+            "each click takes %.1fus allowing at most %.1f clicks per second",
+            stats.target_cps,
+            stats.click_cost_ns / 1e3,
+            stats.max_cps,
+        )
@@ -0,0 +1,168 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides opt-in Linux real-time tuning for the Clikr click engine thread."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+import threading
+from typing import NamedTuple, Optional, override
+
+
+class RealtimeSettings(NamedTuple):
+    """Collection of real-time tuning options, each disabled when left unset."""
+
+    cpu: Optional[int] = None
+    fifo_priority: Optional[int] = None
+    timer_slack_ns: Optional[int] = None
+    lock_memory: bool = False
+
+    @property
+    def is_enabled(self) -> bool:
+        """Returns whether any tuning option is set."""
+        return (
+            self.cpu is not None
+            or self.fifo_priority is not None
+            or self.timer_slack_ns is not None
+            or self.lock_memory
+        )
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the tuning options."""
+        return (
+            f"(cpu={self.cpu}, "
+            f"fifo_priority={self.fifo_priority}, "
+            f"timer_slack_ns={self.timer_slack_ns}, "
+            f"lock_memory={self.lock_memory})"
+        )
+
+
+class RealtimeOutcome(NamedTuple):
+    """Whether a single tuning option was applied, and why if it was refused."""
+
+    option: str
+    is_applied: bool
+    detail: str
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the outcome."""
+        status = "applied" if self.is_applied else "refused"
+        return f"{self.option} {status}: {self.detail}"
+
+
+class RealtimeTuner:
+    """
+    Applies real-time tuning options to the calling thread on Linux:
+        - CPU affinity pins the thread to a single CPU.
+        - SCHED_FIFO lets the thread preempt normal threads when it wakes,
+          falling back to a raised nice value when refused.
+        - Timer slack shrinks how late the kernel may fire the thread's timers.
+        - Memory locking keeps the whole process out of swap.
+    Options the system refuses are reported rather than raised, so the click
+    engine always runs, just without that option.
+    """
+
+    PR_SET_TIMERSLACK: int = 29
+    MCL_CURRENT: int = 1
+    MCL_FUTURE: int = 2
+    ELEVATED_NICE: int = -10
+
+    def __init__(self, settings: RealtimeSettings) -> None:
+        self.__settings: RealtimeSettings = settings
+        self.__libc: Optional[ctypes.CDLL] = None
+        if sys.platform.startswith("linux"):
+            self.__libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+    def apply(self) -> list[RealtimeOutcome]:
+        """Applies every set option to the calling thread and returns the outcomes."""
+        outcomes: list[RealtimeOutcome] = []
+        if self.__settings.cpu is not None:
+            outcomes.append(self._pin_cpu(self.__settings.cpu))
+        if self.__settings.fifo_priority is not None:
+            outcomes.append(self._request_fifo(self.__settings.fifo_priority))
+        if self.__settings.timer_slack_ns is not None:
+            outcomes.append(self._set_timer_slack(self.__settings.timer_slack_ns))
+        if self.__settings.lock_memory:
+            outcomes.append(self._lock_memory())
+
+        for outcome in outcomes:
+            if outcome.is_applied:
+                logging.info("Real-time tuning %s", outcome)
+            else:
+                logging.warning("Real-time tuning %s", outcome)
+        return outcomes
+
+    def _pin_cpu(self, cpu: int) -> RealtimeOutcome:
+        """Pins the calling thread to the provided CPU."""
+        if not hasattr(os, "sched_setaffinity"):
+            return RealtimeOutcome("cpu affinity", False, "unsupported on this system")
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as error:
+            return RealtimeOutcome("cpu affinity", False, str(error))
+        return RealtimeOutcome("cpu affinity", True, f"pinned to CPU {cpu}")
+
+    def _request_fifo(self, priority: int) -> RealtimeOutcome:
+        """Requests SCHED_FIFO for the calling thread, or a raised nice value."""
+        if not hasattr(os, "sched_setscheduler"):
+            return RealtimeOutcome("SCHED_FIFO", False, "unsupported on this system")
+        try:
+            priority = min(
+                max(priority, os.sched_get_priority_min(os.SCHED_FIFO)),
+                os.sched_get_priority_max(os.SCHED_FIFO),
+            )
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        except OSError as fifo_error:
+            try:
+                os.setpriority(
+                    os.PRIO_PROCESS, threading.get_native_id(), self.ELEVATED_NICE
+                )
+            except OSError:
+                return RealtimeOutcome("SCHED_FIFO", False, str(fifo_error))
+            return RealtimeOutcome(
+                "SCHED_FIFO",
+                False,
+                f"{fifo_error}, using nice {self.ELEVATED_NICE} instead",
+            )
+        return RealtimeOutcome("SCHED_FIFO", True, f"priority {priority}")
+
+    def _set_timer_slack(self, timer_slack_ns: int) -> RealtimeOutcome:
+        """
+        Sets the timer slack of the calling thread through prctl.
+        A slack of 0 restores the default, so 1ns is the smallest real slack.
+        """
+        if self.__libc is None:
+            return RealtimeOutcome("timer slack", False, "unsupported on this system")
+        timer_slack_ns = max(1, timer_slack_ns)
+        if self.__libc.prctl(self.PR_SET_TIMERSLACK, timer_slack_ns, 0, 0, 0) != 0:
+            return RealtimeOutcome(
+                "timer slack", False, os.strerror(ctypes.get_errno())
+            )
+        return RealtimeOutcome("timer slack", True, f"{timer_slack_ns}ns")
+
+    def _lock_memory(self) -> RealtimeOutcome:
+        """Locks the current and future memory of the process."""
+        if self.__libc is None:
+            return RealtimeOutcome("memory lock", False, "unsupported on this system")
+        if self.__libc.mlockall(self.MCL_CURRENT | self.MCL_FUTURE) != 0:
+            return RealtimeOutcome(
+                "memory lock", False, os.strerror(ctypes.get_errno())
+            )
+        return RealtimeOutcome("memory lock", True, "current and future pages")
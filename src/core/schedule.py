@@ -0,0 +1,141 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the absolute-deadline event schedule for the Clikr click worker."""
+
+from enum import IntEnum
+from typing import NamedTuple, Optional, override
+
+
+class OverrunPolicy(IntEnum):
+    """Enum for the supported ways of handling slots that were missed."""
+
+    CATCH_UP = 0
+    SKIP = 1
+    REANCHOR = 2
+
+
+class ScheduleStats(NamedTuple):
+    """Counters describing how closely a run followed its schedule."""
+
+    slots: int
+    late_slots: int
+    dropped_slots: int
+    reanchors: int
+    missed_expirations: int = 0
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the schedule counters."""
+        return (
+            f"(slots={self.slots}, "
+            f"late_slots={self.late_slots}, "
+            f"dropped_slots={self.dropped_slots}, "
+            f"reanchors={self.reanchors}, "
+            f"missed_expirations={self.missed_expirations})"
+        )
+
+
+class EventSchedule:
+    """
+    Computes absolute deadlines where event N is due at t0 + N * interval,
+    so late wake-ups and long events never shift the rest of the timeline.
+    Without a provided anchor, t0 is the time the first deadline is requested.
+    When a deadline has already passed, the overrun policy decides what happens:
+        - CATCH_UP fires every missed slot back-to-back until on time again.
+        - SKIP fires the latest missed slot and drops any before it.
+        - REANCHOR restarts the timeline from the current time.
+    """
+
+    DEFAULT_OVERRUN_POLICY: OverrunPolicy = OverrunPolicy.CATCH_UP
+
+    def __init__(
+        self,
+        interval_ns: int,
+        overrun_policy: OverrunPolicy = DEFAULT_OVERRUN_POLICY,
+        anchor_ns: Optional[int] = None,
+    ) -> None:
+        self.__interval_ns: int = max(0, interval_ns)
+        self.__overrun_policy: OverrunPolicy = overrun_policy
+        self.__anchor_ns: Optional[int] = anchor_ns
+        self.__slot: int = 0
+        self.__slots: int = 0
+        self.__late_slots: int = 0
+        self.__dropped_slots: int = 0
+        self.__reanchors: int = 0
+        self.__missed_expirations: int = 0
+
+    @property
+    def stats(self) -> ScheduleStats:
+        """Returns the counters for the slots handed out so far."""
+        return ScheduleStats(
+            self.__slots,
+            self.__late_slots,
+            self.__dropped_slots,
+            self.__reanchors,
+            self.__missed_expirations,
+        )
+
+    @property
+    def interval_ns(self) -> int:
+        """Returns the interval between slots in nanoseconds."""
+        return self.__interval_ns
+
+    def record_missed_expirations(self, missed_expirations: int) -> None:
+        """Counts timer expirations that the kernel reported passing unobserved."""
+        self.__missed_expirations += missed_expirations
+
+    def retime(self, interval_ns: int, last_deadline_ns: Optional[int]) -> None:
+        """
+        Changes the interval mid-run by restarting the timeline from the last
+        deadline handed out, so the next slot is one new interval after it.
+        """
+        self.__interval_ns = max(0, interval_ns)
+        self.__anchor_ns = last_deadline_ns
+        self.__slot = 0 if last_deadline_ns is None else 1
+
+    def shift(self, delta_ns: int) -> None:
+        """Moves the remaining timeline later by the provided time, such as a pause."""
+        if self.__anchor_ns is not None:
+            self.__anchor_ns += delta_ns
+
+    def next_deadline(self, now_ns: int) -> int:
+        """Returns the deadline of the next slot after applying the overrun policy."""
+        if self.__anchor_ns is None:
+            self.__anchor_ns = now_ns
+
+        deadline_ns = self.__anchor_ns + self.__slot * self.__interval_ns
+        self.__slots += 1
+
+        if self.__interval_ns == 0 or now_ns <= deadline_ns:
+            self.__slot += 1
+            return deadline_ns
+
+        self.__late_slots += 1
+
+        match self.__overrun_policy:
+            case OverrunPolicy.SKIP:
+                missed_slots = (now_ns - deadline_ns) // self.__interval_ns
+                self.__slot += missed_slots
+                self.__dropped_slots += missed_slots
+                deadline_ns += missed_slots * self.__interval_ns
+            case OverrunPolicy.REANCHOR:
+                self.__anchor_ns = now_ns
+                self.__slot = 0
+                self.__reanchors += 1
+                deadline_ns = now_ns
+
+        self.__slot += 1
+        return deadline_ns
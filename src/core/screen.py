@@ -0,0 +1,459 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the screen region capture used by Clikr's screen triggers."""
+
+import ctypes
+import ctypes.util
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple, Optional, override
+
+import numpy as np
+
+from src.core.errors import ScreenCaptureError
+
+
+class ScreenRegion(NamedTuple):
+    """A rectangle of the screen in pixels."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the region."""
+        return f"({self.width}x{self.height} at {self.x},{self.y})"
+
+
+class ScreenCapture(ABC):
+    """
+    Captures a fixed region of the screen into a buffer that is reused
+    for every capture, so polling a region allocates nothing per frame.
+    Frames are arrays of shape (height, width, 4) in BGRX byte order.
+    """
+
+    def __init__(self, region: ScreenRegion) -> None:
+        self.__region: ScreenRegion = region
+
+    @property
+    def region(self) -> ScreenRegion:
+        """Returns the captured region of the screen."""
+        return self.__region
+
+    @property
+    @abstractmethod
+    def screen_size(self) -> tuple[int, int]:
+        """Returns the width and height of the whole screen."""
+
+    def move(self, x: int, y: int) -> ScreenRegion:
+        """
+        Moves the captured region to the provided origin, keeping its size
+        and clamping it to the screen. Returns the moved region.
+        """
+        width, height = self.screen_size
+        self.__region = self.__region._replace(
+            x=max(0, min(x, width - self.__region.width)),
+            y=max(0, min(y, height - self.__region.height)),
+        )
+        return self.__region
+
+    @abstractmethod
+    def capture(self) -> np.ndarray:
+        """Captures the region and returns the reused frame buffer."""
+
+    def close(self) -> None:
+        """Releases any resources held by the capture."""
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    """The XShmSegmentInfo structure from the MIT-SHM extension."""
+
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XImage(ctypes.Structure):
+    """The leading fields of the Xlib XImage structure."""
+
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class XShmCapture(ScreenCapture):
+    """
+    Captures through the X11 MIT-SHM extension, where the X server writes
+    the region straight into a shared memory segment that the frame buffer
+    is a view of, so a capture costs one round trip and no copies.
+    """
+
+    Z_PIXMAP: int = 2
+    LSB_FIRST: int = 0
+    ALL_PLANES: int = 0xFFFFFFFF
+    IPC_PRIVATE: int = 0
+    IPC_CREAT: int = 0o1000
+    IPC_RMID: int = 0
+    SHM_PERMISSIONS: int = 0o600
+
+    def __init__(
+        self, region: ScreenRegion, display_name: Optional[str] = None
+    ) -> None:
+        super().__init__(region)
+        x11_path = ctypes.util.find_library("X11")
+        xext_path = ctypes.util.find_library("Xext")
+        if x11_path is None or xext_path is None:
+            raise ScreenCaptureError("MIT-SHM capture requires libX11 and libXext")
+
+        self.__x11: ctypes.CDLL = ctypes.CDLL(x11_path)
+        self.__xext: ctypes.CDLL = ctypes.CDLL(xext_path)
+        self.__libc: ctypes.CDLL = ctypes.CDLL(
+            ctypes.util.find_library("c"), use_errno=True
+        )
+        self._declare_functions()
+
+        self.__display: int = self.__x11.XOpenDisplay(
+            display_name.encode() if display_name is not None else None
+        )
+        if not self.__display:
+            raise ScreenCaptureError(
+                "MIT-SHM capture could not connect to the X server"
+            )
+        if not self.__xext.XShmQueryExtension(self.__display):
+            self.__x11.XCloseDisplay(self.__display)
+            raise ScreenCaptureError("The X server does not support MIT-SHM")
+
+        screen = self.__x11.XDefaultScreen(self.__display)
+        self.__root: int = self.__x11.XRootWindow(self.__display, screen)
+        self.__screen_size: tuple[int, int] = (
+            self.__x11.XDisplayWidth(self.__display, screen),
+            self.__x11.XDisplayHeight(self.__display, screen),
+        )
+        self.__segment: _XShmSegmentInfo = _XShmSegmentInfo()
+        self.__image: Any = self.__xext.XShmCreateImage(
+            self.__display,
+            self.__x11.XDefaultVisual(self.__display, screen),
+            self.__x11.XDefaultDepth(self.__display, screen),
+            self.Z_PIXMAP,
+            None,
+            ctypes.byref(self.__segment),
+            region.width,
+            region.height,
+        )
+        if not self.__image:
+            self.__x11.XCloseDisplay(self.__display)
+            raise ScreenCaptureError("MIT-SHM capture could not create an image")
+
+        image = self.__image.contents
+        if image.bits_per_pixel != 32 or image.byte_order != self.LSB_FIRST:
+            self._free_image()
+            self.__x11.XCloseDisplay(self.__display)
+            raise ScreenCaptureError(
+                f"MIT-SHM capture needs 32-bit LSB pixels, "
+                f"not {image.bits_per_pixel}-bit"
+            )
+
+        try:
+            self._attach_segment(image)
+        except ScreenCaptureError:
+            self._free_image()
+            self.__x11.XCloseDisplay(self.__display)
+            raise
+
+        self.__frame: np.ndarray = np.ctypeslib.as_array(
+            (ctypes.c_uint8 * (image.bytes_per_line * region.height)).from_address(
+                self.__segment.shmaddr
+            )
+        ).reshape(region.height, image.bytes_per_line)[:, : region.width * 4]
+        self.__frame = self.__frame.reshape(region.height, region.width, 4)
+
+    def _declare_functions(self) -> None:
+        """Declares the pointer-sized argument and return types of the used functions."""
+        self.__x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.__x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.__x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.__x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.__x11.XRootWindow.restype = ctypes.c_ulong
+        self.__x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.__x11.XDefaultVisual.restype = ctypes.c_void_p
+        self.__x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.__x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.__x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.__x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.__x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.__x11.XFree.argtypes = [ctypes.c_void_p]
+        self.__xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        self.__xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        self.__xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.c_uint,
+        ]
+        self.__xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self.__xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self.__xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_ulong,
+            ctypes.POINTER(_XImage),
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_ulong,
+        ]
+        self.__libc.shmat.restype = ctypes.c_void_p
+        self.__libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self.__libc.shmdt.argtypes = [ctypes.c_void_p]
+        self.__libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def _attach_segment(self, image: _XImage) -> None:
+        """
+        Creates a shared memory segment for the image and attaches it to the
+        X server. The segment is marked for removal straight away, so the
+        system frees it once both sides detach, even after a crash.
+        """
+        shm_id = self.__libc.shmget(
+            self.IPC_PRIVATE,
+            image.bytes_per_line * image.height,
+            self.IPC_CREAT | self.SHM_PERMISSIONS,
+        )
+        if shm_id < 0:
+            raise ScreenCaptureError(
+                f"MIT-SHM capture could not create a segment: errno {ctypes.get_errno()}"
+            )
+
+        address = self.__libc.shmat(shm_id, None, 0)
+        if address is None or address == ctypes.c_void_p(-1).value:
+            self.__libc.shmctl(shm_id, self.IPC_RMID, None)
+            raise ScreenCaptureError(
+                f"MIT-SHM capture could not map a segment: errno {ctypes.get_errno()}"
+            )
+
+        self.__segment.shmid = shm_id
+        self.__segment.shmaddr = address
+        self.__segment.readOnly = 0
+        image.data = address
+        attached = self.__xext.XShmAttach(self.__display, ctypes.byref(self.__segment))
+        self.__x11.XSync(self.__display, 0)
+        self.__libc.shmctl(shm_id, self.IPC_RMID, None)
+        if not attached:
+            self.__libc.shmdt(address)
+            raise ScreenCaptureError("The X server could not attach the segment")
+
+    @property
+    @override
+    def screen_size(self) -> tuple[int, int]:
+        """Returns the size of the default X screen."""
+        return self.__screen_size
+
+    def _free_image(self) -> None:
+        """Frees the image structure without touching its shared pixel data."""
+        self.__image.contents.data = None
+        self.__x11.XFree(self.__image)
+
+    @override
+    def capture(self) -> np.ndarray:
+        """Has the X server write the region into the shared frame buffer."""
+        if not self.__xext.XShmGetImage(
+            self.__display,
+            self.__root,
+            self.__image,
+            self.region.x,
+            self.region.y,
+            self.ALL_PLANES,
+        ):
+            raise ScreenCaptureError(f"MIT-SHM capture of {self.region} failed")
+        return self.__frame
+
+    @override
+    def close(self) -> None:
+        """Detaches the shared memory segment and closes the X connection."""
+        self.__xext.XShmDetach(self.__display, ctypes.byref(self.__segment))
+        self.__x11.XSync(self.__display, 0)
+        self.__libc.shmdt(self.__segment.shmaddr)
+        self._free_image()
+        self.__x11.XCloseDisplay(self.__display)
+
+
+class XImageCapture(ScreenCapture):
+    """
+    Captures through a plain X11 GetImage request with python-xlib, copying
+    each reply into the frame buffer. Used when MIT-SHM is unavailable,
+    such as on a remote X server.
+    """
+
+    ALL_PLANES: int = 0xFFFFFFFF
+
+    def __init__(
+        self, region: ScreenRegion, display_name: Optional[str] = None
+    ) -> None:
+        super().__init__(region)
+        try:
+            from Xlib import X
+            from Xlib.display import Display
+            from Xlib.error import DisplayError
+        except ImportError as error:
+            raise ScreenCaptureError(
+                "X11 capture requires python-xlib to be installed"
+            ) from error
+
+        try:
+            self.__display: Any = Display(display_name)
+        except DisplayError as error:
+            raise ScreenCaptureError(
+                f"X11 capture could not connect to the X server: {error}"
+            ) from error
+
+        screen = self.__display.screen()
+        self.__root: Any = screen.root
+        self.__screen_size: tuple[int, int] = (
+            screen.width_in_pixels,
+            screen.height_in_pixels,
+        )
+        self.__z_pixmap: int = X.ZPixmap
+        self.__frame: np.ndarray = np.zeros(
+            (region.height, region.width, 4), dtype=np.uint8
+        )
+
+    @property
+    @override
+    def screen_size(self) -> tuple[int, int]:
+        """Returns the size of the default X screen."""
+        return self.__screen_size
+
+    @override
+    def capture(self) -> np.ndarray:
+        """Requests the region from the X server and copies it into the frame buffer."""
+        region = self.region
+        image = self.__root.get_image(
+            region.x,
+            region.y,
+            region.width,
+            region.height,
+            self.__z_pixmap,
+            self.ALL_PLANES,
+        )
+        rows = np.frombuffer(image.data, dtype=np.uint8).reshape(region.height, -1)
+        np.copyto(
+            self.__frame,
+            rows[:, : region.width * 4].reshape(region.height, region.width, 4),
+        )
+        return self.__frame
+
+    @override
+    def close(self) -> None:
+        """Closes the connection to the X server."""
+        self.__display.close()
+
+
+class ArrayCapture(ScreenCapture):
+    """
+    Captures from an array that the caller paints instead of the screen,
+    for tests and benchmarks. The painted screen starts black and only
+    covers the region unless a larger screen size is provided.
+    """
+
+    def __init__(
+        self, region: ScreenRegion, screen_size: Optional[tuple[int, int]] = None
+    ) -> None:
+        super().__init__(region)
+        width, height = (
+            screen_size
+            if screen_size is not None
+            else (region.x + region.width, region.y + region.height)
+        )
+        self.__screen: np.ndarray = np.zeros((height, width, 4), dtype=np.uint8)
+        self.__frame: np.ndarray = np.zeros(
+            (region.height, region.width, 4), dtype=np.uint8
+        )
+        self.__capture_count: int = 0
+
+    @property
+    def screen(self) -> np.ndarray:
+        """Returns the painted screen in BGRX byte order."""
+        return self.__screen
+
+    @property
+    @override
+    def screen_size(self) -> tuple[int, int]:
+        """Returns the size of the painted screen."""
+        return self.__screen.shape[1], self.__screen.shape[0]
+
+    @property
+    def capture_count(self) -> int:
+        """Returns how many captures have been taken."""
+        return self.__capture_count
+
+    def paint(
+        self, colour: tuple[int, int, int], region: Optional[ScreenRegion] = None
+    ) -> None:
+        """Fills the provided region of the screen, or all of it, with an RGB colour."""
+        if region is None:
+            self.__screen[..., :3] = colour[::-1]
+            return
+        self.__screen[
+            region.y : region.y + region.height, region.x : region.x + region.width, :3
+        ] = colour[::-1]
+
+    @override
+    def capture(self) -> np.ndarray:
+        """Copies the region of the painted screen into the frame buffer."""
+        self.__capture_count += 1
+        region = self.region
+        np.copyto(
+            self.__frame,
+            self.__screen[
+                region.y : region.y + region.height, region.x : region.x + region.width
+            ],
+        )
+        return self.__frame
+
+
+def create_screen_capture(
+    region: ScreenRegion, display_name: Optional[str] = None
+) -> ScreenCapture:
+    """
+    Returns a capture of the provided region, preferring MIT-SHM and
+    falling back to plain X11 requests when shared memory is unavailable.
+    """
+    try:
+        screen_capture: ScreenCapture = XShmCapture(region, display_name)
+    except ScreenCaptureError as error:
+        logging.debug("Falling back to X11 capture: %s", error)
+        screen_capture = XImageCapture(region, display_name)
+    logging.debug(
+        "Created %s of %s", type(screen_capture).__name__, screen_capture.region
+    )
+    return screen_capture
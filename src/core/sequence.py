@@ -0,0 +1,271 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the multi-target click sequences walked by the click worker."""
+
+import csv
+import time
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, override
+
+import numpy as np
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import InputBackend
+from src.core.macro import BUTTON_CODES, BUTTONS_BY_CODE
+from src.core.timing import TimingEngine, seconds_to_ns
+
+SEQUENCE_COLUMNS: tuple[str, ...] = (
+    "x",
+    "y",
+    "button",
+    "hold_ms",
+    "clicks",
+    "delay_ms",
+)
+
+
+class SequenceStep(NamedTuple):
+    """
+    A single target of a click sequence. The clicks are each held for the hold
+    length in seconds, and the next step starts the delay after they finish.
+    """
+
+    x: int
+    y: int
+    mouse_button: MouseButton = MouseButton.left
+    hold_length: float = 0.0
+    clicks: int = 1
+    delay: float = 0.0
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the step."""
+        return (
+            f"(location=({self.x}, {self.y}), "
+            f"mouse_button={self.mouse_button.name}, "
+            f"hold_length={self.hold_length}, "
+            f"clicks={self.clicks}, "
+            f"delay={self.delay})"
+        )
+
+
+class SequenceStats(NamedTuple):
+    """Counters for a run's sequence passes and how late their steps started."""
+
+    passes: int
+    steps: int
+    mean_lateness_ns: float
+    max_lateness_ns: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the sequence counters."""
+        return (
+            f"(passes={self.passes}, "
+            f"steps={self.steps}, "
+            f"mean_lateness={self.mean_lateness_ns / 1e6:.3f}ms, "
+            f"max_lateness={self.max_lateness_ns / 1e6:.3f}ms)"
+        )
+
+
+def load_sequence(path: Path) -> list[SequenceStep]:
+    """
+    Returns the steps of a CSV file with a header naming any of the columns
+    x, y, button, hold_ms, clicks and delay_ms, where x and y are required.
+    Raises ValueError if a row or column is invalid.
+    """
+    with path.open(newline="") as file:
+        reader = csv.DictReader(file)
+        columns = set(reader.fieldnames or ())
+        if not {"x", "y"} <= columns or not columns <= set(SEQUENCE_COLUMNS):
+            raise ValueError(
+                f"{path} must have a header with x, y and any of "
+                f"{', '.join(SEQUENCE_COLUMNS[2:])}"
+            )
+
+        steps: list[SequenceStep] = []
+        for row in reader:
+            try:
+                button_name = row.get("button") or MouseButton.left.name
+                if button_name not in BUTTON_CODES:
+                    raise ValueError(f"unknown button {button_name}")
+                steps.append(
+                    SequenceStep(
+                        int(row["x"]),
+                        int(row["y"]),
+                        MouseButton[button_name],
+                        float(row.get("hold_ms") or 0) / 1000,
+                        int(row.get("clicks") or 1),
+                        float(row.get("delay_ms") or 0) / 1000,
+                    )
+                )
+            except (KeyError, ValueError) as error:
+                raise ValueError(
+                    f"{path} line {reader.line_num} is not a valid step: {error}"
+                ) from error
+    return steps
+
+
+class ClickSequence:
+    """
+    A click sequence compiled into a flat timeline of parallel arrays:
+    the start offset of each step from the start of the pass, its position,
+    button code, hold length and click count.
+    Offsets are the running sum of each step's clicks, holds and delay,
+    so the worker only ever compares them against one start time.
+    """
+
+    def __init__(self, steps: Iterable[SequenceStep]) -> None:
+        step_list = list(steps)
+        if not step_list:
+            raise ValueError("A click sequence needs at least one step")
+        if any(step.clicks < 1 for step in step_list):
+            raise ValueError("Each step of a click sequence needs at least one click")
+        if any(step.mouse_button.name not in BUTTON_CODES for step in step_list):
+            raise ValueError(
+                f"Each step of a click sequence needs one of the buttons "
+                f"{', '.join(BUTTON_CODES)}"
+            )
+
+        self.__xs: np.ndarray = np.array([step.x for step in step_list], np.int32)
+        self.__ys: np.ndarray = np.array([step.y for step in step_list], np.int32)
+        self.__button_codes: np.ndarray = np.array(
+            [BUTTON_CODES[step.mouse_button.name] for step in step_list], np.uint8
+        )
+        self.__hold_lengths_ns: np.ndarray = np.array(
+            [seconds_to_ns(step.hold_length) for step in step_list], np.int64
+        )
+        self.__clicks: np.ndarray = np.array(
+            [step.clicks for step in step_list], np.int32
+        )
+        step_lengths_ns = self.__clicks * self.__hold_lengths_ns + np.array(
+            [seconds_to_ns(step.delay) for step in step_list], np.int64
+        )
+        self.__offsets_ns: np.ndarray = np.concatenate(
+            ([0], np.cumsum(step_lengths_ns)[:-1])
+        ).astype(np.int64)
+        self.__duration_ns: int = int(step_lengths_ns.sum())
+
+    def __len__(self) -> int:
+        """Returns the number of steps in the sequence."""
+        return len(self.__offsets_ns)
+
+    @property
+    def duration_ns(self) -> int:
+        """Returns how long a pass takes from its first step to the end of its last delay."""
+        return self.__duration_ns
+
+    def timeline(
+        self,
+    ) -> tuple[list[int], list[int], list[int], list[int], list[int], list[int]]:
+        """
+        Returns the offsets, x and y coordinates, button codes, hold lengths
+        and click counts of every step as parallel lists of plain integers.
+        """
+        return (
+            self.__offsets_ns.tolist(),
+            self.__xs.tolist(),
+            self.__ys.tolist(),
+            self.__button_codes.tolist(),
+            self.__hold_lengths_ns.tolist(),
+            self.__clicks.tolist(),
+        )
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the compiled sequence."""
+        return f"(steps={len(self)}, duration={self.__duration_ns / 1e9:.3f}s)"
+
+
+class SequencePlayer:
+    """
+    Walks a compiled click sequence through an input backend.
+    The timeline is unpacked into plain integer lists once per run, so each
+    step only indexes the lists and waits for its absolute deadline,
+    without building any objects. Lateness never accumulates across steps,
+    since each deadline is the pass start plus the step's offset.
+    """
+
+    def __init__(self, sequence: ClickSequence) -> None:
+        self.__sequence: ClickSequence = sequence
+        (
+            self.__offsets_ns,
+            self.__xs,
+            self.__ys,
+            self.__button_codes,
+            self.__hold_lengths_ns,
+            self.__clicks,
+        ) = sequence.timeline()
+        self.__passes: int = 0
+        self.__steps: int = 0
+        self.__lateness_total_ns: int = 0
+        self.__max_lateness_ns: int = 0
+
+    @property
+    def sequence(self) -> ClickSequence:
+        """Returns the compiled sequence of the player."""
+        return self.__sequence
+
+    @property
+    def stats(self) -> SequenceStats:
+        """Returns the pass counters so far."""
+        return SequenceStats(
+            self.__passes,
+            self.__steps,
+            self.__lateness_total_ns / self.__steps if self.__steps else 0.0,
+            self.__max_lateness_ns,
+        )
+
+    def play(
+        self,
+        input_backend: InputBackend,
+        timing_engine: TimingEngine,
+        start_time_ns: int,
+        wait_while_paused: Callable[[], int],
+    ) -> None:
+        """
+        Walks the sequence once from the provided start time.
+        The pause callback is checked before each step and returns how long
+        it held the pass, which moves the rest of the pass later.
+        Raises InterruptedError if the timing engine is stopped first.
+        """
+        offsets_ns = self.__offsets_ns
+        hold_lengths_ns = self.__hold_lengths_ns
+        clicks = self.__clicks
+        for index, offset_ns in enumerate(offsets_ns):
+            timing_engine.wait_until(start_time_ns + offset_ns)
+            start_time_ns += wait_while_paused()
+            lateness_ns = max(0, time.perf_counter_ns() - start_time_ns - offset_ns)
+            self.__steps += 1
+            self.__lateness_total_ns += lateness_ns
+            self.__max_lateness_ns = max(self.__max_lateness_ns, lateness_ns)
+
+            mouse_button = BUTTONS_BY_CODE[self.__button_codes[index]]
+            input_backend.move(self.__xs[index], self.__ys[index])
+            if hold_lengths_ns[index] == 0:
+                input_backend.click_burst(mouse_button, clicks[index])
+                input_backend.flush()
+                continue
+
+            for _ in range(clicks[index]):
+                input_backend.press(mouse_button)
+                input_backend.flush()
+                try:
+                    timing_engine.wait(hold_lengths_ns[index])
+                finally:
+                    input_backend.release(mouse_button)
+                    input_backend.flush()
+        self.__passes += 1
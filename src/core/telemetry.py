@@ -0,0 +1,161 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides per-event timing telemetry for the Clikr click worker."""
+
+import csv
+from pathlib import Path
+from typing import NamedTuple, Optional, override
+
+
+class TelemetryStats(NamedTuple):
+    """Summary of how accurately recent click events met their deadlines."""
+
+    event_count: int
+    mean_error_ns: float
+    p50_jitter_ns: int
+    p99_jitter_ns: int
+    max_overrun_ns: int
+    clicks_per_second: float
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the telemetry stats."""
+        return (
+            f"(event_count={self.event_count}, "
+            f"mean_error={self.mean_error_ns / 1e6:.3f}ms, "
+            f"p50_jitter={self.p50_jitter_ns / 1e6:.3f}ms, "
+            f"p99_jitter={self.p99_jitter_ns / 1e6:.3f}ms, "
+            f"max_overrun={self.max_overrun_ns / 1e6:.3f}ms, "
+            f"clicks_per_second={self.clicks_per_second:.1f})"
+        )
+
+
+class TimingTelemetry:
+    """
+    Records the scheduled and actual time of each click event into
+    fixed-size ring buffers that are allocated once and reused across runs.
+    Stats and exports cover the most recent events that fit in the buffers.
+    The buffers can live in a provided memory block, such as shared memory,
+    so another process can read the telemetry while it is being recorded.
+    """
+
+    DEFAULT_CAPACITY: int = 4096
+    FIELD_SIZE: int = 8
+    CSV_HEADER: tuple[str, ...] = (
+        "event",
+        "scheduled_ns",
+        "actual_ns",
+        "error_ns",
+        "clicks",
+    )
+
+    @classmethod
+    def buffer_size(cls, capacity: int = DEFAULT_CAPACITY) -> int:
+        """Returns the number of bytes needed to hold telemetry of the provided capacity."""
+        return cls.FIELD_SIZE * (1 + 3 * capacity)
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, buffer: Optional[memoryview] = None
+    ) -> None:
+        if buffer is None:
+            buffer = memoryview(bytearray(self.buffer_size(capacity)))
+        fields = buffer[: self.buffer_size(capacity)].cast("q")
+        self.__capacity: int = capacity
+        self.__header: memoryview = fields[:1]
+        self.__scheduled_ns: memoryview = fields[1 : 1 + capacity]
+        self.__actual_ns: memoryview = fields[1 + capacity : 1 + 2 * capacity]
+        self.__clicks: memoryview = fields[1 + 2 * capacity :]
+
+    @property
+    def event_count(self) -> int:
+        """Returns the number of events recorded since the last reset."""
+        return self.__header[0]
+
+    def reset(self) -> None:
+        """Discards the recorded events without reallocating the buffers."""
+        self.__header[0] = 0
+
+    def record(self, scheduled_ns: int, actual_ns: int, clicks: int) -> None:
+        """
+        Records the scheduled and actual time of a click event.
+        The event count is published last so readers never see a partial event.
+        """
+        event_count = self.__header[0]
+        index = event_count % self.__capacity
+        self.__scheduled_ns[index] = scheduled_ns
+        self.__actual_ns[index] = actual_ns
+        self.__clicks[index] = clicks
+        self.__header[0] = event_count + 1
+
+    def release(self) -> None:
+        """Releases the views of the memory block so it can be closed."""
+        for view in (
+            self.__header,
+            self.__scheduled_ns,
+            self.__actual_ns,
+            self.__clicks,
+        ):
+            view.release()
+
+    def _window_indices(self) -> range:
+        """Returns the event numbers of the retained events in recorded order."""
+        event_count = self.event_count
+        retained = min(event_count, self.__capacity)
+        return range(event_count - retained, event_count)
+
+    @property
+    def stats(self) -> TelemetryStats:
+        """Returns the stats for the retained events."""
+        indices = [index % self.__capacity for index in self._window_indices()]
+        if not indices:
+            return TelemetryStats(0, 0.0, 0, 0, 0, 0.0)
+
+        errors = [
+            self.__actual_ns[index] - self.__scheduled_ns[index] for index in indices
+        ]
+        jitters = sorted(abs(error) for error in errors)
+
+        elapsed_ns = self.__actual_ns[indices[-1]] - self.__actual_ns[indices[0]]
+        clicks = sum(self.__clicks[index] for index in indices[:-1])
+        clicks_per_second = clicks / (elapsed_ns / 1e9) if elapsed_ns > 0 else 0.0
+
+        return TelemetryStats(
+            self.event_count,
+            sum(errors) / len(errors),
+            jitters[len(jitters) // 2],
+            jitters[min(len(jitters) - 1, int(0.99 * len(jitters)))],
+            max(0, max(errors)),
+            clicks_per_second,
+        )
+
+    def export_csv(self, path: Path) -> None:
+        """Writes the retained events to a CSV file at the provided path."""
+        with path.open("w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(self.CSV_HEADER)
+            for event in self._window_indices():
+                index = event % self.__capacity
+                scheduled_ns = self.__scheduled_ns[index]
+                actual_ns = self.__actual_ns[index]
+                writer.writerow(
+                    (
+                        event,
+                        scheduled_ns,
+                        actual_ns,
+                        actual_ns - scheduled_ns,
+                        self.__clicks[index],
+                    )
+                )
@@ -0,0 +1,198 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the Linux timerfd absolute-deadline timer for the Clikr timing engine."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+from typing import Optional, override
+
+
+class WakeableEvent(threading.Event):
+    """
+    A threading event that also makes a file descriptor readable while set,
+    so waits on file descriptors can be interrupted by setting the event.
+    Once closed, setting or clearing the event no longer touches the pipe.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.__read_fd, self.__write_fd = os.pipe()
+        os.set_blocking(self.__read_fd, False)
+        os.set_blocking(self.__write_fd, False)
+
+    def fileno(self) -> int:
+        """Returns the file descriptor that is readable while the event is set."""
+        return self.__read_fd
+
+    @override
+    def set(self) -> None:
+        """Sets the event and wakes anything waiting on its file descriptor."""
+        super().set()
+        if self.__write_fd < 0:
+            return
+        try:
+            os.write(self.__write_fd, b"\0")
+        except BlockingIOError:
+            pass
+
+    @override
+    def clear(self) -> None:
+        """Clears the event and drains its file descriptor."""
+        super().clear()
+        if self.__read_fd < 0:
+            return
+        try:
+            while os.read(self.__read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        """Closes the event's pipe once nothing waits on its file descriptor."""
+        read_fd, write_fd = self.__read_fd, self.__write_fd
+        if read_fd < 0:
+            return
+        self.__read_fd = self.__write_fd = -1
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+class _Timespec(ctypes.Structure):
+    """The C timespec structure."""
+
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    """The C itimerspec structure."""
+
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+class TimerFd:
+    """
+    A Linux timerfd on CLOCK_MONOTONIC, the same clock as perf_counter_ns,
+    armed with absolute deadlines through TFD_TIMER_ABSTIME.
+    When armed with a period, the kernel keeps firing on the absolute timeline
+    and each wait reports how many expirations passed, so missed deadlines
+    are counted by the kernel rather than inferred.
+    """
+
+    CLOCK_MONOTONIC: int = 1
+    TFD_TIMER_ABSTIME: int = 1
+    TFD_NONBLOCK: int = 0o4000
+    TFD_CLOEXEC: int = 0o2000000
+    PLAIN_EVENT_POLL_SECONDS: float = 0.01
+    NANOSECONDS_PER_SECOND: int = 1_000_000_000
+
+    __shared_libc: Optional[ctypes.CDLL] = None
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        """Returns whether timerfd is available on this system."""
+        return sys.platform.startswith("linux")
+
+    @classmethod
+    def _load_libc(cls) -> ctypes.CDLL:
+        """Returns the C library with the timerfd functions, loading it once."""
+        if cls.__shared_libc is None:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            libc.timerfd_create.restype = ctypes.c_int
+            libc.timerfd_create.argtypes = [ctypes.c_int, ctypes.c_int]
+            libc.timerfd_settime.restype = ctypes.c_int
+            libc.timerfd_settime.argtypes = [
+                ctypes.c_int,
+                ctypes.c_int,
+                ctypes.POINTER(_Itimerspec),
+                ctypes.POINTER(_Itimerspec),
+            ]
+            cls.__shared_libc = libc
+        return cls.__shared_libc
+
+    def __init__(self) -> None:
+        if not self.is_supported():
+            raise OSError("timerfd is only available on Linux")
+        self.__libc: ctypes.CDLL = self._load_libc()
+        self.__fd: int = self.__libc.timerfd_create(
+            self.CLOCK_MONOTONIC, self.TFD_NONBLOCK | self.TFD_CLOEXEC
+        )
+        if self.__fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        self.__deadline_ns: Optional[int] = None
+        self.__period_ns: int = 0
+
+    def arm(self, deadline_ns: int, period_ns: int = 0) -> None:
+        """
+        Arms the timer to first expire at the absolute deadline, then every period
+        after it. A period of 0 makes the timer expire only once.
+        """
+        timer_spec = _Itimerspec(
+            _Timespec(*divmod(period_ns, self.NANOSECONDS_PER_SECOND)),
+            _Timespec(*divmod(max(1, deadline_ns), self.NANOSECONDS_PER_SECOND)),
+        )
+        if (
+            self.__libc.timerfd_settime(
+                self.__fd, self.TFD_TIMER_ABSTIME, ctypes.byref(timer_spec), None
+            )
+            != 0
+        ):
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        self.__deadline_ns = deadline_ns
+        self.__period_ns = period_ns
+
+    def is_armed_for(self, deadline_ns: int, period_ns: int) -> bool:
+        """Returns whether the next expiration is already the provided deadline and period."""
+        return (
+            self.__period_ns == period_ns
+            and period_ns > 0
+            and self.__deadline_ns == deadline_ns
+        )
+
+    def wait(self, stop_event: threading.Event) -> int:
+        """
+        Waits for the timer to expire and returns how many expirations passed.
+        Raises InterruptedError as soon as the stop event is set.
+        """
+        wait_fds = [self.__fd]
+        timeout: Optional[float] = None
+        if isinstance(stop_event, WakeableEvent):
+            wait_fds.append(stop_event.fileno())
+        else:
+            timeout = self.PLAIN_EVENT_POLL_SECONDS
+
+        while True:
+            readable, _, _ = select.select(wait_fds, [], [], timeout)
+            if stop_event.is_set():
+                raise InterruptedError("Stop was requested")
+            if self.__fd not in readable:
+                continue
+            try:
+                expirations = int.from_bytes(os.read(self.__fd, 8), sys.byteorder)
+            except BlockingIOError:
+                continue
+            if self.__deadline_ns is not None:
+                self.__deadline_ns += expirations * self.__period_ns
+            return expirations
+
+    def close(self) -> None:
+        """Closes the timer's file descriptor."""
+        os.close(self.__fd)
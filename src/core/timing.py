@@ -0,0 +1,197 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the timing engine used to pace click events for Clikr."""
+
+import logging
+import threading
+import time
+from enum import IntEnum
+from typing import Optional
+
+from src.core.timerfd import TimerFd
+
+NANOSECONDS_PER_SECOND: int = 1_000_000_000
+
+
+def seconds_to_ns(seconds: float) -> int:
+    """Returns the provided duration in seconds as whole nanoseconds."""
+    return round(seconds * NANOSECONDS_PER_SECOND)
+
+
+class TimingPolicy(IntEnum):
+    """Enum for the supported strategies of waiting for a deadline."""
+
+    SLEEP = 0
+    HYBRID = 1
+    SPIN = 2
+    TIMERFD = 3
+
+
+class TimingEngine:
+    """
+    Waits until deadlines on the perf_counter_ns clock using a timing policy:
+        - SLEEP relies on a single timed wait for the whole duration.
+        - HYBRID sleeps coarsely, then spin-waits for the final stretch.
+        - SPIN spin-waits for the whole duration.
+        - TIMERFD blocks on a Linux timerfd armed with the absolute deadline,
+          falling back to HYBRID on other systems.
+    Every wait raises InterruptedError as soon as the stop event is set.
+    """
+
+    DEFAULT_POLICY: TimingPolicy = TimingPolicy.HYBRID
+    CALIBRATION_SAMPLES: int = 50
+    CALIBRATION_SLEEP_NS: int = 1_000_000
+    CALIBRATION_PERCENTILE: float = 0.99
+    SPIN_THRESHOLD_MARGIN_NS: int = 50_000
+    MIN_SPIN_THRESHOLD_NS: int = 100_000
+    MAX_SPIN_THRESHOLD_NS: int = 5_000_000
+
+    __calibrated_spin_threshold_ns: Optional[int] = None
+
+    @classmethod
+    def calibrate(cls) -> int:
+        """
+        Measures how late a timed wait wakes up on this system and returns the
+        spin threshold covering nearly all of those late wake-ups.
+        The measurement only happens once and is reused afterward.
+        """
+        if cls.__calibrated_spin_threshold_ns is not None:
+            return cls.__calibrated_spin_threshold_ns
+
+        calibration_event = threading.Event()
+        oversleeps: list[int] = []
+        for _ in range(cls.CALIBRATION_SAMPLES):
+            start_time = time.perf_counter_ns()
+            calibration_event.wait(cls.CALIBRATION_SLEEP_NS / NANOSECONDS_PER_SECOND)
+            elapsed = time.perf_counter_ns() - start_time
+            oversleeps.append(max(0, elapsed - cls.CALIBRATION_SLEEP_NS))
+
+        oversleeps.sort()
+        percentile_index = int(cls.CALIBRATION_PERCENTILE * (len(oversleeps) - 1))
+        spin_threshold = oversleeps[percentile_index] + cls.SPIN_THRESHOLD_MARGIN_NS
+        spin_threshold = min(
+            max(spin_threshold, cls.MIN_SPIN_THRESHOLD_NS), cls.MAX_SPIN_THRESHOLD_NS
+        )
+
+        cls.__calibrated_spin_threshold_ns = spin_threshold
+        logging.debug("Calibrated spin threshold to %dns", spin_threshold)
+        return spin_threshold
+
+    def __init__(
+        self,
+        policy: TimingPolicy = DEFAULT_POLICY,
+        spin_threshold_ns: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        self.__policy: TimingPolicy = policy
+        self.__stop_event: threading.Event = (
+            stop_event if stop_event is not None else threading.Event()
+        )
+        self.__spin_threshold_ns: int = (
+            spin_threshold_ns if spin_threshold_ns is not None else self.calibrate()
+        )
+        self.__event_timer: Optional[TimerFd] = None
+        self.__single_timer: Optional[TimerFd] = None
+        if policy == TimingPolicy.TIMERFD:
+            try:
+                self.__event_timer = TimerFd()
+                self.__single_timer = TimerFd()
+            except OSError as error:
+                logging.warning(
+                    "Using hybrid timing, timerfd is unavailable: %s", error
+                )
+                self.__policy = TimingPolicy.HYBRID
+
+    @property
+    def policy(self) -> TimingPolicy:
+        """Returns the policy used to wait for deadlines."""
+        return self.__policy
+
+    @property
+    def spin_threshold_ns(self) -> int:
+        """Returns how long before a deadline the hybrid policy begins spinning."""
+        return self.__spin_threshold_ns
+
+    def raise_if_stopped(self) -> None:
+        """Raises InterruptedError if the stop event has been set."""
+        if self.__stop_event.is_set():
+            raise InterruptedError("Stop was requested")
+
+    def wait(self, duration_ns: int) -> None:
+        """Waits for the provided duration in nanoseconds."""
+        if duration_ns > 0:
+            self.wait_until(time.perf_counter_ns() + duration_ns)
+
+    def wait_until(self, deadline_ns: int, period_ns: int = 0) -> int:
+        """
+        Waits until the perf_counter_ns clock reaches the provided deadline.
+        A period tells the TIMERFD policy that deadlines repeat on that interval,
+        so it keeps one periodic timer armed and reports missed expirations.
+        Returns how many expirations the kernel reported as missed.
+        """
+        self.raise_if_stopped()
+
+        match self.__policy:
+            case TimingPolicy.SLEEP:
+                self._sleep_until(deadline_ns)
+            case TimingPolicy.HYBRID:
+                self._sleep_until(deadline_ns - self.__spin_threshold_ns)
+                self._spin_until(deadline_ns)
+            case TimingPolicy.SPIN:
+                self._spin_until(deadline_ns)
+            case TimingPolicy.TIMERFD:
+                return self._timer_until(deadline_ns, period_ns)
+        return 0
+
+    def close(self) -> None:
+        """Releases the timers held by the TIMERFD policy."""
+        for timer in (self.__event_timer, self.__single_timer):
+            if timer is not None:
+                timer.close()
+        self.__event_timer = None
+        self.__single_timer = None
+
+    def _timer_until(self, deadline_ns: int, period_ns: int) -> int:
+        """
+        Blocks on a timerfd until the deadline and returns the missed expirations.
+        The periodic timer is only re-armed when the deadline is off its timeline,
+        and expirations are only counted as missed when it was not re-armed.
+        """
+        timer = self.__event_timer if period_ns > 0 else self.__single_timer
+        assert timer is not None
+
+        if timer.is_armed_for(deadline_ns, period_ns):
+            return max(0, timer.wait(self.__stop_event) - 1)
+
+        timer.arm(deadline_ns, period_ns)
+        timer.wait(self.__stop_event)
+        return 0
+
+    def _sleep_until(self, deadline_ns: int) -> None:
+        """Sleeps until the deadline if it has not already passed."""
+        remaining_ns = deadline_ns - time.perf_counter_ns()
+        if remaining_ns > 0 and self.__stop_event.wait(
+            remaining_ns / NANOSECONDS_PER_SECOND
+        ):
+            raise InterruptedError("Stop was requested")
+
+    def _spin_until(self, deadline_ns: int) -> None:
+        """Busy-waits until the deadline if it has not already passed."""
+        perf_counter_ns = time.perf_counter_ns
+        is_stopping = self.__stop_event.is_set
+        while perf_counter_ns() < deadline_ns:
+            if is_stopping():
+                raise InterruptedError("Stop was requested")
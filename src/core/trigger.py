@@ -0,0 +1,176 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Provides the pixel colour trigger that gates the Clikr click worker."""
+
+import math
+import time
+from typing import NamedTuple, Optional, override
+
+import numpy as np
+
+from src.core.screen import ScreenCapture, ScreenRegion, create_screen_capture
+from src.core.timing import TimingEngine, seconds_to_ns
+
+DEFAULT_TOLERANCE: int = 0
+DEFAULT_MIN_FRACTION: float = 1.0
+DEFAULT_POLL_RATE: float = 250.0
+
+
+class PixelTriggerSettings(NamedTuple):
+    """
+    Collection of inputs for a pixel trigger. A pixel matches when each of its
+    channels is within the tolerance of the RGB colour, and the trigger fires
+    when at least the minimum fraction of the region's pixels match.
+    """
+
+    region: ScreenRegion
+    colour: tuple[int, int, int]
+    tolerance: int = DEFAULT_TOLERANCE
+    min_fraction: float = DEFAULT_MIN_FRACTION
+    poll_rate: float = DEFAULT_POLL_RATE
+
+    @property
+    def poll_period_ns(self) -> int:
+        """Returns the time between polls in nanoseconds."""
+        return seconds_to_ns(1 / self.poll_rate)
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the trigger inputs."""
+        return (
+            f"(region={self.region}, "
+            f"colour=#{self.colour[0]:02x}{self.colour[1]:02x}{self.colour[2]:02x}, "
+            f"tolerance={self.tolerance}, "
+            f"min_fraction={self.min_fraction}, "
+            f"poll_rate={self.poll_rate})"
+        )
+
+
+class TriggerStats(NamedTuple):
+    """Counters for a run's polls and the latency from matching poll to click."""
+
+    polls: int
+    matches: int
+    mean_capture_ns: float
+    mean_latency_ns: float
+    max_latency_ns: int
+
+    @override
+    def __str__(self) -> str:
+        """Returns the string representation of the trigger counters."""
+        return (
+            f"(polls={self.polls}, "
+            f"matches={self.matches}, "
+            f"mean_capture={self.mean_capture_ns / 1e6:.3f}ms, "
+            f"mean_latency={self.mean_latency_ns / 1e6:.3f}ms, "
+            f"max_latency={self.max_latency_ns / 1e6:.3f}ms)"
+        )
+
+
+class PixelTrigger:
+    """
+    Holds the click worker until a screen region turns the configured colour.
+    The region is captured into a reused buffer at the poll rate and compared
+    against the colour with whole-array operations into preallocated arrays,
+    so each poll costs one capture and a few vectorised passes, with no
+    per-pixel Python work and no allocation.
+    Polls follow absolute deadlines and skip any that a slow capture missed.
+    """
+
+    def __init__(
+        self,
+        settings: PixelTriggerSettings,
+        screen_capture: Optional[ScreenCapture] = None,
+    ) -> None:
+        self.__settings: PixelTriggerSettings = settings
+        self.__screen_capture: ScreenCapture = (
+            screen_capture
+            if screen_capture is not None
+            else create_screen_capture(settings.region)
+        )
+        shape = (settings.region.height, settings.region.width)
+        self.__bgr: np.ndarray = np.array(settings.colour[::-1], dtype=np.int16)
+        self.__difference: np.ndarray = np.empty((*shape, 3), dtype=np.int16)
+        self.__is_channel_close: np.ndarray = np.empty((*shape, 3), dtype=np.bool_)
+        self.__is_pixel_match: np.ndarray = np.empty(shape, dtype=np.bool_)
+        self.__required_matches: int = max(
+            1, math.ceil(settings.min_fraction * shape[0] * shape[1])
+        )
+        self.__polls: int = 0
+        self.__matches: int = 0
+        self.__capture_total_ns: int = 0
+        self.__latency_total_ns: int = 0
+        self.__max_latency_ns: int = 0
+
+    @property
+    def settings(self) -> PixelTriggerSettings:
+        """Returns the inputs of the trigger."""
+        return self.__settings
+
+    @property
+    def stats(self) -> TriggerStats:
+        """Returns the poll and latency counters so far."""
+        return TriggerStats(
+            self.__polls,
+            self.__matches,
+            self.__capture_total_ns / self.__polls if self.__polls else 0.0,
+            self.__latency_total_ns / self.__matches if self.__matches else 0.0,
+            self.__max_latency_ns,
+        )
+
+    def is_matching(self, frame: np.ndarray) -> bool:
+        """Returns whether enough pixels of the provided BGRX frame match the colour."""
+        np.subtract(frame[..., :3], self.__bgr, out=self.__difference, dtype=np.int16)
+        np.abs(self.__difference, out=self.__difference)
+        np.less_equal(
+            self.__difference, self.__settings.tolerance, out=self.__is_channel_close
+        )
+        np.all(self.__is_channel_close, axis=-1, out=self.__is_pixel_match)
+        return np.count_nonzero(self.__is_pixel_match) >= self.__required_matches
+
+    def wait_for_match(self, timing_engine: TimingEngine) -> int:
+        """
+        Polls the region until it matches and returns when the matching
+        capture was taken, as a perf_counter_ns time.
+        Raises InterruptedError if the timing engine is stopped first.
+        """
+        period_ns = self.__settings.poll_period_ns
+        poll_deadline = time.perf_counter_ns()
+        while True:
+            timing_engine.wait_until(poll_deadline)
+            capture_time = time.perf_counter_ns()
+            frame = self.__screen_capture.capture()
+            self.__polls += 1
+            self.__capture_total_ns += time.perf_counter_ns() - capture_time
+            if self.is_matching(frame):
+                return capture_time
+
+            poll_deadline += period_ns
+            now = time.perf_counter_ns()
+            if poll_deadline < now:
+                poll_deadline += (now - poll_deadline) // period_ns * period_ns
+
+    def record_click(self, capture_time_ns: int) -> int:
+        """Records the latency from the matching capture until now and returns it."""
+        latency_ns = time.perf_counter_ns() - capture_time_ns
+        self.__matches += 1
+        self.__latency_total_ns += latency_ns
+        self.__max_latency_ns = max(self.__max_latency_ns, latency_ns)
+        return latency_ns
+
+    def close(self) -> None:
+        """Releases the screen capture."""
+        self.__screen_capture.close()
@@ -15,28 +15,355 @@
 
 """Entry point for launching Clikr."""
 
+import argparse
 import logging
+import multiprocessing
 import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from PyQt6.QtWidgets import QApplication
 
+from src.core.backends import InputBackendType
+from src.core.hooks import InputHookService
+from src.core.input import InputManager
+from src.core.locator import (
+    DEFAULT_MAX_ERROR,
+    DEFAULT_SEARCH_MARGIN,
+    TemplateLocatorSettings,
+    load_template,
+)
+from src.core.logs import setup_logging
+from src.core.macro import (
+    DEFAULT_SPEED,
+    MacroError,
+    MacroFile,
+    MacroRecorder,
+    MacroSettings,
+)
+from src.core.realtime import RealtimeSettings
+from src.core.schedule import OverrunPolicy
+from src.core.screen import ScreenRegion
+from src.core.sequence import SequenceStep, load_sequence
+from src.core.timing import TimingEngine, TimingPolicy
+from src.core.trigger import (
+    DEFAULT_MIN_FRACTION,
+    DEFAULT_POLL_RATE,
+    DEFAULT_TOLERANCE,
+    PixelTriggerSettings,
+)
 from src.ui.window import Window
 
-LOG_FORMAT: str = "%(asctime)s %(levelname)s %(message)s"
-DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+if TYPE_CHECKING:
+    import numpy as np
 
 
-def _setup_logging() -> None:
-    """Configures the logging with the provided formats."""
-    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt=DATETIME_FORMAT)
+def _parse_colour(colour: str) -> tuple[int, int, int]:
+    """Returns the RGB channels of a hex colour such as ff8000 or #ff8000."""
+    hex_colour = colour.removeprefix("#")
+    if len(hex_colour) != 6:
+        raise argparse.ArgumentTypeError(f"{colour} is not a RRGGBB hex colour")
+    try:
+        return (
+            int(hex_colour[0:2], 16),
+            int(hex_colour[2:4], 16),
+            int(hex_colour[4:6], 16),
+        )
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(
+            f"{colour} is not a RRGGBB hex colour"
+        ) from error
+
+
+def _pixel_trigger(arguments: argparse.Namespace) -> Optional[PixelTriggerSettings]:
+    """Returns the pixel trigger described by the arguments, if any."""
+    if arguments.trigger_region is None:
+        return None
+    return PixelTriggerSettings(
+        ScreenRegion(*arguments.trigger_region),
+        arguments.trigger_colour,
+        arguments.trigger_tolerance,
+        arguments.trigger_fraction,
+        arguments.trigger_poll_rate,
+    )
+
+
+def _parse_template(path: str) -> "np.ndarray":
+    """Returns the template image stored at the provided path."""
+    try:
+        return load_template(Path(path))
+    except (OSError, ValueError) as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
+def _template_locator(
+    arguments: argparse.Namespace,
+) -> Optional[TemplateLocatorSettings]:
+    """Returns the template locator described by the arguments, if any."""
+    if arguments.template is None:
+        return None
+    return TemplateLocatorSettings(
+        arguments.template, arguments.template_max_error, arguments.template_margin
+    )
+
+
+def _parse_macro(path: str) -> Path:
+    """Returns the path of a readable macro file."""
+    try:
+        return MacroFile(Path(path)).path
+    except MacroError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
+def _macro(arguments: argparse.Namespace) -> Optional[MacroSettings]:
+    """Returns the macro replay described by the arguments, if any."""
+    if arguments.macro is None:
+        return None
+    return MacroSettings(arguments.macro, arguments.macro_speed)
+
+
+def _parse_sequence(path: str) -> list[SequenceStep]:
+    """Returns the steps of the click sequence stored at the provided path."""
+    try:
+        steps = load_sequence(Path(path))
+    except (OSError, ValueError) as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+    if not steps:
+        raise argparse.ArgumentTypeError(f"{path} has no steps")
+    return steps
+
+
+def _record_macro(path: Path) -> int:
+    """Records a macro to the provided path until the cancel key is pressed."""
+    try:
+        macro_recorder = MacroRecorder(path)
+    except OSError as error:
+        logging.error("Could not create the macro file: %s", error)
+        return 1
+
+    recording_finished = threading.Event()
+    input_hook_service = InputHookService()
+    input_hook_service.start()
+    input_hook_service.record(macro_recorder, recording_finished.set)
+    logging.info(
+        "Recording a macro to %s, press %s to finish",
+        path,
+        InputHookService.CANCEL_KEY.name,
+    )
+    try:
+        recording_finished.wait()
+    except KeyboardInterrupt:
+        logging.info("Recording interrupted")
+    finally:
+        input_hook_service.stop()
+        macro_recorder.close()
+
+    logging.info(
+        "Recorded %d events over %.3fs",
+        macro_recorder.event_count,
+        macro_recorder.duration_ns / 1e9,
+    )
+    return 0
+
+
+def _parse_arguments() -> tuple[argparse.Namespace, list[str]]:
+    """Returns the Clikr arguments and the remaining arguments for Qt."""
+    parser = argparse.ArgumentParser(description="Clikr auto clicker")
+    parser.add_argument(
+        "--engine-process",
+        action="store_true",
+        help="run the click engine in a separate process to isolate it from UI jitter",
+    )
+    parser.add_argument(
+        "--timing-policy",
+        choices=[policy.name.lower() for policy in TimingPolicy],
+        default=TimingEngine.DEFAULT_POLICY.name.lower(),
+        help="how the click engine waits for each click event (timerfd is Linux only)",
+    )
+    parser.add_argument(
+        "--overrun-policy",
+        choices=[policy.name.lower() for policy in OverrunPolicy],
+        default=InputManager.DEFAULT_OVERRUN_POLICY.name.lower(),
+        help=(
+            "how click events that were missed are handled: catch_up fires them "
+            "back-to-back, skip drops them and reanchor restarts the timeline"
+        ),
+    )
+    parser.add_argument(
+        "--burst-spacing-ms",
+        type=float,
+        default=InputManager.DEFAULT_BURST_SPACING_SECONDS * 1000,
+        help="the time between the clicks of one click event (0 sends them at once)",
+    )
+    parser.add_argument(
+        "--revalidation-period",
+        type=float,
+        default=InputManager.DEFAULT_POINTER_REVALIDATION_PERIOD_SECONDS,
+        help=(
+            "how often in seconds a fixed location is checked against the real "
+            "pointer, so a pointer moved by someone else is moved back"
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=[backend_type.name.lower() for backend_type in InputBackendType],
+        default=InputManager.DEFAULT_INPUT_BACKEND.name.lower(),
+        help=(
+            "how clicks are injected (xtest is X11 only, uinput is Linux only "
+            "and null sends nothing, for dry runs)"
+        ),
+    )
+    realtime_group = parser.add_argument_group(
+        "real-time tuning (Linux)",
+        "each option is reported as applied or refused when the click engine starts",
+    )
+    realtime_group.add_argument(
+        "--cpu", type=int, help="pin the click engine thread to this CPU"
+    )
+    realtime_group.add_argument(
+        "--fifo-priority",
+        type=int,
+        help="run the click engine thread under SCHED_FIFO at this priority",
+    )
+    realtime_group.add_argument(
+        "--timer-slack-ns",
+        type=int,
+        help="shrink the click engine thread's timer slack to this many nanoseconds",
+    )
+    realtime_group.add_argument(
+        "--lock-memory",
+        action="store_true",
+        help="lock the click engine's memory to keep it out of swap",
+    )
+    trigger_group = parser.add_argument_group(
+        "pixel trigger (X11)",
+        "hold each click event until a screen region turns the given colour",
+    )
+    trigger_group.add_argument(
+        "--trigger-region",
+        type=int,
+        nargs=4,
+        metavar=("X", "Y", "WIDTH", "HEIGHT"),
+        help="the screen region to watch",
+    )
+    trigger_group.add_argument(
+        "--trigger-colour",
+        type=_parse_colour,
+        metavar="RRGGBB",
+        help="the colour the region must turn",
+    )
+    trigger_group.add_argument(
+        "--trigger-tolerance",
+        type=int,
+        default=DEFAULT_TOLERANCE,
+        help="how far each colour channel may be from the trigger colour",
+    )
+    trigger_group.add_argument(
+        "--trigger-fraction",
+        type=float,
+        default=DEFAULT_MIN_FRACTION,
+        help="the fraction of the region's pixels that must match",
+    )
+    trigger_group.add_argument(
+        "--trigger-poll-rate",
+        type=float,
+        default=DEFAULT_POLL_RATE,
+        help="how many times per second the region is captured",
+    )
+    locator_group = parser.add_argument_group(
+        "template locator (X11)",
+        "find the location on screen by an image of the target before each click",
+    )
+    locator_group.add_argument(
+        "--template",
+        type=_parse_template,
+        metavar="PATH",
+        help="an image of the target as a binary PPM or NumPy .npy RGB array",
+    )
+    locator_group.add_argument(
+        "--template-max-error",
+        type=float,
+        default=DEFAULT_MAX_ERROR,
+        help="how many grey levels a match may differ from the image on average",
+    )
+    locator_group.add_argument(
+        "--template-margin",
+        type=int,
+        default=DEFAULT_SEARCH_MARGIN,
+        help="how far in pixels the target may move before a full-screen search",
+    )
+    macro_group = parser.add_argument_group(
+        "macros", "record mouse and keyboard input and replay it as each click event"
+    )
+    macro_group.add_argument(
+        "--record-macro",
+        type=Path,
+        metavar="PATH",
+        help="record a macro to the file until the Esc key is pressed, then exit",
+    )
+    macro_group.add_argument(
+        "--macro",
+        type=_parse_macro,
+        metavar="PATH",
+        help="replay the macro file as each click event instead of clicking",
+    )
+    macro_group.add_argument(
+        "--macro-speed",
+        type=float,
+        default=DEFAULT_SPEED,
+        help="how many times faster than recorded the macro is replayed",
+    )
+    parser.add_argument(
+        "--sequence",
+        type=_parse_sequence,
+        metavar="PATH",
+        help=(
+            "walk the steps of a CSV file with columns x, y, button, hold_ms, "
+            "clicks and delay_ms as each click event instead of clicking"
+        ),
+    )
+    arguments, qt_arguments = parser.parse_known_args()
+    if (arguments.trigger_region is None) != (arguments.trigger_colour is None):
+        parser.error("--trigger-region and --trigger-colour must be used together")
+    if arguments.trigger_poll_rate <= 0:
+        parser.error("--trigger-poll-rate must be greater than 0")
+    if arguments.burst_spacing_ms < 0:
+        parser.error("--burst-spacing-ms must be 0 or more")
+    if arguments.revalidation_period < 0:
+        parser.error("--revalidation-period must be 0 or more")
+    if arguments.macro_speed <= 0:
+        parser.error("--macro-speed must be greater than 0")
+    return arguments, sys.argv[:1] + qt_arguments
 
 
 def main() -> None:
     """Initializes logging and launches the PyQt window."""
-    _setup_logging()
+    multiprocessing.freeze_support()
+    setup_logging()
+    arguments, qt_arguments = _parse_arguments()
+    if arguments.record_macro is not None:
+        sys.exit(_record_macro(arguments.record_macro))
 
-    app: QApplication = QApplication(sys.argv)
-    _window: Window = Window()
+    app: QApplication = QApplication(qt_arguments)
+    _window: Window = Window(
+        arguments.engine_process,
+        RealtimeSettings(
+            arguments.cpu,
+            arguments.fifo_priority,
+            arguments.timer_slack_ns,
+            arguments.lock_memory,
+        ),
+        TimingPolicy[arguments.timing_policy.upper()],
+        _pixel_trigger(arguments),
+        _template_locator(arguments),
+        _macro(arguments),
+        arguments.sequence,
+        InputBackendType[arguments.backend.upper()],
+        OverrunPolicy[arguments.overrun_policy.upper()],
+        arguments.burst_spacing_ms / 1000,
+        arguments.revalidation_period,
+    )
     sys.exit(app.exec())
 
 
@@ -18,13 +18,16 @@
 import logging
 import os
 import sys
+from functools import partial
 from pathlib import Path
-from typing import Optional, override
+from typing import TYPE_CHECKING, Optional, override
 
 from PyQt6 import uic
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIcon, QIntValidator, QKeyEvent
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QCloseEvent, QIcon, QIntValidator, QKeyEvent
 from PyQt6.QtWidgets import (
+    QFileDialog,
+    QLabel,
     QMainWindow,
     QTabWidget,
     QKeySequenceEdit,
@@ -36,8 +39,22 @@ from PyQt6.QtWidgets import (
     QLayout,
 )
 
-from src.core.click_worker import ClickWorkerManager
+from src.core.actions import ActionDispatcher, HotkeyAction
+from src.core.backends import InputBackendType
+from src.core.click_worker import ClickWorkerManager, WorkerInputs
+from src.core.holds import HoldOverrunPolicy
 from src.core.input import InputManager
+from src.core.process_engine import ProcessClickWorkerManager
+from src.core.realtime import RealtimeSettings
+from src.core.schedule import OverrunPolicy
+from src.core.telemetry import TelemetryStats
+from src.core.timing import TimingEngine, TimingPolicy
+
+if TYPE_CHECKING:
+    from src.core.locator import TemplateLocatorSettings
+    from src.core.macro import MacroSettings
+    from src.core.sequence import SequenceStep
+    from src.core.trigger import PixelTriggerSettings
 
 
 class PositiveIntValidator(QIntValidator):
@@ -137,7 +154,30 @@ class HotkeyInput(QKeySequenceEdit):
 class Window(QMainWindow):
     """The PyQt window implementation for Clikr."""
 
-    def __init__(self) -> None:
+    TELEMETRY_REFRESH_MS: int = 250
+
+    engine_state_changed = pyqtSignal()
+    start_requested = pyqtSignal(int, bool)
+    stop_requested = pyqtSignal()
+    pause_resume_requested = pyqtSignal()
+    profile_switch_requested = pyqtSignal()
+
+    def __init__(
+        self,
+        use_engine_process: bool = False,
+        realtime_settings: RealtimeSettings = RealtimeSettings(),
+        timing_policy: TimingPolicy = TimingEngine.DEFAULT_POLICY,
+        pixel_trigger: Optional["PixelTriggerSettings"] = None,
+        template_locator: Optional["TemplateLocatorSettings"] = None,
+        macro: Optional["MacroSettings"] = None,
+        sequence_steps: Optional[list["SequenceStep"]] = None,
+        input_backend_type: InputBackendType = InputManager.DEFAULT_INPUT_BACKEND,
+        overrun_policy: OverrunPolicy = InputManager.DEFAULT_OVERRUN_POLICY,
+        burst_spacing: float = InputManager.DEFAULT_BURST_SPACING_SECONDS,
+        pointer_revalidation_period: float = (
+            InputManager.DEFAULT_POINTER_REVALIDATION_PERIOD_SECONDS
+        ),
+    ) -> None:
         super().__init__()
 
         self._load_ui()
@@ -148,8 +188,11 @@ class Window(QMainWindow):
         self.tab_widget = self.findChild(QTabWidget, "tab_widget")
         self.simple_tab = self.findChild(QWidget, "simple_tab")
         self.advanced_tab = self.findChild(QWidget, "advanced_tab")
+        self.hotkeys_tab = self.findChild(QWidget, "hotkeys_tab")
         self.simple_tab_index = self.tab_widget.indexOf(self.simple_tab)
         self.advanced_tab_index = self.tab_widget.indexOf(self.advanced_tab)
+        self.hotkeys_tab_index = self.tab_widget.indexOf(self.hotkeys_tab)
+        self.__profile_tab_index: int = self.tab_widget.currentIndex()
         self.simple_hotkey_input = HotkeyInput.from_key_sequence_edit(
             self.findChild(QKeySequenceEdit, "simple_hotkey_input")
         )
@@ -202,29 +245,86 @@ class Window(QMainWindow):
         self.advanced_mouse_button_input = self.findChild(
             QComboBox, "advanced_mouse_button_input"
         )
+        self.action_hotkey_inputs: dict[HotkeyAction, HotkeyInput] = {
+            action: HotkeyInput.from_key_sequence_edit(
+                self.findChild(QKeySequenceEdit, f"{action.name.lower()}_hotkey_input")
+            )
+            for action in HotkeyAction
+            if action != HotkeyAction.TOGGLE
+        }
         self.__softlock_message_box: Optional[QMessageBox] = None
+        self.__hold_overrun_message_box: Optional[QMessageBox] = None
+        self.__hold_overrun_buttons: dict[QPushButton, HoldOverrunPolicy] = {}
+        self.telemetry_label = QLabel()
+        self.export_telemetry_button = QPushButton("Export CSV")
+        self.__telemetry_timer = QTimer(self)
+        self._define_status_bar()
         self._define_softlock_message_box()
+        self._define_hold_overrun_message_box()
 
         self._set_validators()
 
         self._connect_callbacks()
 
+        self.__action_dispatcher = ActionDispatcher(
+            {
+                HotkeyAction.TOGGLE: self._on_toggle_action,
+                HotkeyAction.START: self._on_start_action,
+                HotkeyAction.STOP: self._on_stop_action,
+                HotkeyAction.PAUSE_RESUME: self._on_pause_resume_action,
+                HotkeyAction.BURST_ONCE: self._on_burst_once_action,
+                HotkeyAction.SWITCH_PROFILE: self._on_switch_profile_action,
+            }
+        )
         self.__input_manager = InputManager(
             self.change_location_fields,
             self.change_location_button,
-            self.start_stop_toggle,
-        )
-        self.__click_worker_manager = ClickWorkerManager(self.stop_button.click)
+            self.__action_dispatcher.dispatch,
+        )
+        self.__input_manager.update_timing_policy(timing_policy)
+        self.__input_manager.update_pixel_trigger(pixel_trigger)
+        self.__input_manager.update_template_locator(template_locator)
+        self.__input_manager.update_macro(macro)
+        self.__input_manager.update_sequence(sequence_steps)
+        self.__input_manager.update_input_backend(input_backend_type)
+        self.__input_manager.update_overrun_policy(overrun_policy)
+        self.__input_manager.update_burst_spacing(burst_spacing)
+        self.__input_manager.update_pointer_revalidation_period(
+            pointer_revalidation_period
+        )
+        self.__hotkey_snapshot: tuple[WorkerInputs, bool] = (
+            self.__input_manager.worker_inputs,
+            self.__input_manager.can_softlock,
+        )
+        self.__click_worker_manager: ClickWorkerManager | ProcessClickWorkerManager
+        if use_engine_process:
+            self.__click_worker_manager = ProcessClickWorkerManager(
+                self.engine_state_changed.emit, realtime_settings
+            )
+        else:
+            self.__click_worker_manager = ClickWorkerManager(
+                self.engine_state_changed.emit, realtime_settings
+            )
 
-        self.setFixedSize(370, 300)
+        self.setFixedSize(370, 300 + self.statusBar().sizeHint().height())
         self.show()
 
         logging.debug("Successfully loaded UI")
 
     @property
     def viewing_advanced_tab(self) -> bool:
-        """Returns whether the advanced tab is the tab currently being viewed."""
-        return self.tab_widget.currentIndex() == self.advanced_tab_index
+        """
+        Returns whether the advanced tab is the profile currently in use,
+        which stays the same while the hotkeys tab is being viewed.
+        """
+        return self.__profile_tab_index == self.advanced_tab_index
+
+    @override
+    def closeEvent(self, close_event: Optional[QCloseEvent]) -> None:
+        """Shuts down the click worker's engine before the window closes."""
+        self.__telemetry_timer.stop()
+        self.__click_worker_manager.shutdown()
+        super().closeEvent(close_event)
 
     def change_location_button(self) -> QPushButton:
         """Returns the current change location button."""
@@ -301,6 +401,56 @@ class Window(QMainWindow):
         )
         self.__softlock_message_box.setStandardButtons(QMessageBox.StandardButton.Ok)
 
+    def _define_hold_overrun_message_box(self) -> None:
+        """Defines the pop-up that asks how to handle held clicks that overrun."""
+        self.__hold_overrun_message_box = QMessageBox(self)
+        self.__hold_overrun_message_box.setIcon(QMessageBox.Icon.Warning)
+        self.__hold_overrun_message_box.setWindowTitle("Hold Overrun")
+        for text, policy in (
+            ("Stretch", HoldOverrunPolicy.STRETCH),
+            ("Truncate Holds", HoldOverrunPolicy.TRUNCATE),
+            ("Overlap", HoldOverrunPolicy.OVERLAP),
+        ):
+            button = self.__hold_overrun_message_box.addButton(
+                text, QMessageBox.ButtonRole.AcceptRole
+            )
+            self.__hold_overrun_buttons[button] = policy
+        self.__hold_overrun_message_box.addButton(QMessageBox.StandardButton.Cancel)
+
+    def _confirm_hold_overrun(self, worker_inputs: WorkerInputs) -> bool:
+        """
+        Asks how to handle held clicks that take longer than the interval and
+        sets the chosen policy. Returns False if starting was cancelled.
+        """
+        assert self.__hold_overrun_message_box is not None
+        self.__hold_overrun_message_box.setText(
+            f"Each click event can take up to "
+            f"{worker_inputs.worst_case_event_duration_ns / 1e6:.1f}ms, "
+            f"longer than the interval of "
+            f"{worker_inputs.event_period_ns / 1e6:.1f}ms.\n"
+            "Stretch lets events run long, Truncate Holds shortens each hold "
+            "to fit, and Overlap releases each hold in time for the next event."
+        )
+        logging.debug("Displaying hold overrun message")
+        self.__hold_overrun_message_box.exec()
+
+        policy = self.__hold_overrun_buttons.get(
+            self.__hold_overrun_message_box.clickedButton()
+        )
+        if policy is None:
+            return False
+        self.__input_manager.update_hold_overrun_policy(policy)
+        return True
+
+    def _define_status_bar(self) -> None:
+        """Defines the status bar that shows live timing telemetry."""
+        self.telemetry_label.setText("Not running")
+        self.export_telemetry_button.setEnabled(False)
+        self.statusBar().addWidget(self.telemetry_label, 1)
+        self.statusBar().addPermanentWidget(self.export_telemetry_button)
+        self.statusBar().setSizeGripEnabled(False)
+        self.__telemetry_timer.setInterval(self.TELEMETRY_REFRESH_MS)
+
     def _set_validators(self) -> None:
         """Sets the validator to the PositiveIntValidator for each QLineEdit."""
         for line_edit in self.findChildren(QLineEdit):
@@ -319,6 +469,9 @@ class Window(QMainWindow):
         self.simple_change_location_button.clicked.connect(
             self._on_change_location_button_clicked
         )
+        self.simple_mouse_button_input.currentIndexChanged.connect(
+            self._update_mouse_button
+        )
         self.simple_hotkey_input.keySequenceChanged.connect(self._update_hotkey)
 
         self.advanced_interval_input.textEdited.connect(self._update_unscaled_interval)
@@ -340,11 +493,58 @@ class Window(QMainWindow):
         self.advanced_change_location_button.clicked.connect(
             self._on_change_location_button_clicked
         )
+        self.advanced_mouse_button_input.currentIndexChanged.connect(
+            self._update_mouse_button
+        )
         self.advanced_hotkey_input.keySequenceChanged.connect(self._update_hotkey)
 
+        for live_input_signal in (
+            self.simple_interval_input.textEdited,
+            self.simple_interval_scale_input.currentIndexChanged,
+            self.simple_location_x_input.textEdited,
+            self.simple_location_y_input.textEdited,
+            self.simple_mouse_button_input.currentIndexChanged,
+            self.advanced_interval_input.textEdited,
+            self.advanced_interval_scale_input.currentIndexChanged,
+            self.advanced_hold_length_input.textEdited,
+            self.advanced_hold_length_scale_input.currentIndexChanged,
+            self.advanced_clicks_per_event_input.textEdited,
+            self.advanced_location_x_input.textEdited,
+            self.advanced_location_y_input.textEdited,
+            self.advanced_mouse_button_input.currentIndexChanged,
+        ):
+            live_input_signal.connect(self._retune_click_worker)
+
+        for action, hotkey_input in self.action_hotkey_inputs.items():
+            hotkey_input.keySequenceChanged.connect(
+                partial(self._update_action_hotkey, action)
+            )
+
+        for snapshot_signal in (
+            self.advanced_event_count_input.textEdited,
+            self.simple_hotkey_input.keySequenceChanged,
+            self.advanced_hotkey_input.keySequenceChanged,
+            *(
+                hotkey_input.keySequenceChanged
+                for hotkey_input in self.action_hotkey_inputs.values()
+            ),
+        ):
+            snapshot_signal.connect(self._snapshot_hotkey_inputs)
+
+        self.engine_state_changed.connect(self._sync_engine_state)
+        self.start_requested.connect(self._start_from_hotkey)
+        self.stop_requested.connect(self._on_stop_button_clicked)
+        self.pause_resume_requested.connect(self._toggle_pause)
+        self.profile_switch_requested.connect(self._switch_profile)
+
         self.start_button.clicked.connect(self._on_start_button_clicked)
         self.stop_button.clicked.connect(self._on_stop_button_clicked)
 
+        self.__telemetry_timer.timeout.connect(self._update_telemetry_status)
+        self.export_telemetry_button.clicked.connect(
+            self._on_export_telemetry_button_clicked
+        )
+
         for line_edit in self.findChildren(QLineEdit):
             line_edit.returnPressed.connect(line_edit.clearFocus)
 
@@ -400,6 +600,13 @@ class Window(QMainWindow):
             return
         self.__input_manager.update_location_y(self.simple_location_y_input)
 
+    def _update_mouse_button(self) -> None:
+        """Updates the input manager with the field's current mouse button."""
+        if self.viewing_advanced_tab:
+            self.__input_manager.update_mouse_button(self.advanced_mouse_button_input)
+            return
+        self.__input_manager.update_mouse_button(self.simple_mouse_button_input)
+
     def _update_hotkey(self) -> None:
         """Updates the input manager with the field's current hotkey."""
         if self.viewing_advanced_tab:
@@ -407,6 +614,12 @@ class Window(QMainWindow):
             return
         self.__input_manager.update_hotkey(self.simple_hotkey_input)
 
+    def _update_action_hotkey(self, action: HotkeyAction) -> None:
+        """Updates the input manager with the field's current hotkey for the action."""
+        self.__input_manager.update_action_hotkey(
+            action, self.action_hotkey_inputs[action]
+        )
+
     def _update_inputs(self) -> None:
         """Updates the input manager with of the current field values."""
         self._update_unscaled_interval()
@@ -417,15 +630,32 @@ class Window(QMainWindow):
         self._update_event_count()
         self._update_location_x()
         self._update_location_y()
+        self._update_mouse_button()
         self._update_hotkey()
 
+    def _retune_click_worker(self) -> None:
+        """Hands the current inputs to the click worker if it is running."""
+        self.__click_worker_manager.update(self.__input_manager.worker_inputs)
+        self._snapshot_hotkey_inputs()
+
+    def _snapshot_hotkey_inputs(self) -> None:
+        """
+        Stores the current inputs and softlock check for the hotkey handlers,
+        which run on the hook thread and must not read the input manager while
+        the window changes it.
+        """
+        self.__hotkey_snapshot = (
+            self.__input_manager.worker_inputs,
+            self.__input_manager.can_softlock,
+        )
+
     def _on_change_location_button_clicked(self) -> None:
         """Starts the input manager's listeners to change the location."""
         self.__input_manager.listen_for_location()
 
     def _on_start_button_clicked(self) -> None:
         """
-        Checks if the softlock prevention message should pop up,
+        Checks if the softlock prevention or hold overrun message should pop up,
         otherwise toggles the start/stop buttons and starts the click worker.
         """
         if self.__input_manager.can_softlock:
@@ -433,29 +663,160 @@ class Window(QMainWindow):
             logging.debug("Displaying softlock prevention message")
             self.__softlock_message_box.exec()
             return
-        self.stop_button.setDisabled(False)
-        self.start_button.setDisabled(True)
+        if self.__input_manager.worker_inputs.is_overrunning and (
+            not self._confirm_hold_overrun(self.__input_manager.worker_inputs)
+        ):
+            return
         self.__click_worker_manager.start(self.__input_manager.worker_inputs)
+        self._sync_engine_state()
 
     def _on_stop_button_clicked(self) -> None:
         """Toggles the start/stop buttons and stops the click worker."""
-        self.stop_button.setDisabled(True)
-        self.start_button.setDisabled(False)
         self.__click_worker_manager.stop()
+        self._sync_engine_state()
+
+    def _sync_engine_state(self) -> None:
+        """Matches the start/stop buttons and telemetry refresh to the click worker."""
+        is_running = self.__click_worker_manager.is_running
+        self.stop_button.setDisabled(not is_running)
+        self.start_button.setDisabled(is_running)
+        if is_running:
+            self.export_telemetry_button.setEnabled(False)
+            self.__telemetry_timer.start()
+            return
+        self.__telemetry_timer.stop()
+        self._update_telemetry_status()
+        self.export_telemetry_button.setEnabled(
+            self.__click_worker_manager.telemetry.event_count > 0
+        )
+
+    @classmethod
+    def _format_telemetry_stats(cls, stats: TelemetryStats) -> str:
+        """Returns a compact description of the telemetry stats for the status bar."""
+        return (
+            f"err {stats.mean_error_ns / 1e6:.2f}ms  "
+            f"p50 {stats.p50_jitter_ns / 1e6:.2f}ms  "
+            f"p99 {stats.p99_jitter_ns / 1e6:.2f}ms  "
+            f"max {stats.max_overrun_ns / 1e6:.2f}ms  "
+            f"{stats.clicks_per_second:.1f} CPS"
+        )
+
+    def _update_telemetry_status(self) -> None:
+        """Shows the click worker's current timing telemetry in the status bar."""
+        if self.__click_worker_manager.is_paused:
+            self.telemetry_label.setText("Paused")
+            return
+        stats = self.__click_worker_manager.telemetry.stats
+        if stats.event_count == 0:
+            self.telemetry_label.setText("Not running")
+            return
+        self.telemetry_label.setText(self._format_telemetry_stats(stats))
+
+    def _on_export_telemetry_button_clicked(self) -> None:
+        """Asks for a file path and exports the most recent run's telemetry as CSV."""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Telemetry", "clikr_telemetry.csv", "CSV Files (*.csv)"
+        )
+        if not file_path:
+            return
+        self.__click_worker_manager.telemetry.export_csv(Path(file_path))
+        logging.debug("Exported telemetry to %s", file_path)
 
-    def start_stop_toggle(self) -> None:
-        """Toggles the start/stop buttons."""
-        if self.stop_button.isEnabled():
-            logging.debug("Clicking stop button")
-            self.stop_button.click()
+    def _on_toggle_action(self, press_time_ns: int) -> None:
+        """Stops the click worker if it is running, otherwise starts it."""
+        if self.__click_worker_manager.is_running:
+            self._on_stop_action(press_time_ns)
             return
-        logging.debug("Clicking start button")
-        self.start_button.click()
+        self._on_start_action(press_time_ns)
 
-    def _on_tab_changed(self) -> None:
+    def _on_start_action(self, press_time_ns: int) -> None:
         """
-        Stops the click worker and updates
-        the input manager for the new tab's input fields.
+        Starts the click worker from a hotkey unless it could softlock the mouse.
+        An idle click worker is started right on the hook thread with the inputs
+        last snapshot by the window, while a restart waits for the running click
+        worker to stop and so is handed to the window's thread.
         """
-        self.__click_worker_manager.stop()
+        self._start_from_hook(press_time_ns, False)
+
+    def _on_stop_action(self, _: int) -> None:
+        """Asks the window's thread to stop the click worker from a hotkey."""
+        self.stop_requested.emit()
+
+    def _on_pause_resume_action(self, _: int) -> None:
+        """Asks the window's thread to pause or resume the click worker."""
+        self.pause_resume_requested.emit()
+
+    def _on_burst_once_action(self, press_time_ns: int) -> None:
+        """Runs a single click event from a hotkey if the click worker is idle."""
+        if self.__click_worker_manager.is_running:
+            logging.debug(
+                "Ignoring burst once hotkey while the click worker is running"
+            )
+            return
+        self._start_from_hook(press_time_ns, True)
+
+    def _on_switch_profile_action(self, _: int) -> None:
+        """Requests the window to switch between the simple and advanced profiles."""
+        self.profile_switch_requested.emit()
+
+    def _start_from_hook(self, press_time_ns: int, is_single_event: bool) -> None:
+        """
+        Starts the click worker on the hook thread with the snapshot inputs, or
+        hands the start to the window's thread if the click worker is running or
+        the held clicks overrun the interval and the window must ask about it.
+        """
+        worker_inputs, can_softlock = self.__hotkey_snapshot
+        if can_softlock:
+            logging.warning("Ignoring start hotkey while a location has no stop hotkey")
+            return
+        if self.__click_worker_manager.is_running or (
+            not is_single_event and worker_inputs.is_overrunning
+        ):
+            self.start_requested.emit(press_time_ns, is_single_event)
+            return
+        if is_single_event:
+            worker_inputs = worker_inputs._replace(event_count=1, is_continuous=False)
+        self.__click_worker_manager.start(worker_inputs, press_time_ns)
+        self.engine_state_changed.emit()
+
+    def _start_from_hotkey(self, press_time_ns: int, is_single_event: bool) -> None:
+        """
+        Starts the click worker on the window's thread for a hotkey, first asking
+        how to handle held clicks that overrun the interval like the start button.
+        The first click latency is then measured from the answer, not the press.
+        """
+        worker_inputs = self.__input_manager.worker_inputs
+        trigger_time_ns: Optional[int] = press_time_ns
+        if is_single_event:
+            worker_inputs = worker_inputs._replace(event_count=1, is_continuous=False)
+        elif worker_inputs.is_overrunning:
+            if not self._confirm_hold_overrun(worker_inputs):
+                return
+            worker_inputs = self.__input_manager.worker_inputs
+            trigger_time_ns = None
+        self.__click_worker_manager.start(worker_inputs, trigger_time_ns)
+        self._sync_engine_state()
+
+    def _toggle_pause(self) -> None:
+        """Pauses the click worker, or resumes it if already paused."""
+        self.__click_worker_manager.toggle_pause()
+        self._sync_engine_state()
+
+    def _switch_profile(self) -> None:
+        """Shows the profile tab that is not currently in use."""
+        if self.viewing_advanced_tab:
+            self.tab_widget.setCurrentIndex(self.simple_tab_index)
+            return
+        self.tab_widget.setCurrentIndex(self.advanced_tab_index)
+
+    def _on_tab_changed(self, tab_index: int) -> None:
+        """
+        Updates the input manager for the new profile tab's input fields and
+        retunes a running click worker to them without stopping it.
+        Viewing the hotkeys tab keeps the profile.
+        """
+        if tab_index == self.hotkeys_tab_index:
+            return
+        self.__profile_tab_index = tab_index
         self._update_inputs()
+        self._retune_click_worker()
@@ -0,0 +1,203 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the events and device requests the uinput backend sends."""
+
+import errno
+import fcntl
+import os
+import struct
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+from pynput.mouse import Button as MouseButton
+
+from src.core import backends
+from src.core.backends import InputBackendError, UInputBackend
+
+SCREEN_SIZE: tuple[int, int] = (1920, 1080)
+FILE_DESCRIPTOR: int = 42
+EVENT_FIELDS_SIZE: int = 8
+
+
+class FakeUInputDevice:
+    """A uinput device file that records the requests and writes made to it."""
+
+    def __init__(self, failing_request: Optional[int] = None) -> None:
+        self.__failing_request: Optional[int] = failing_request
+        self.__requests: list[tuple[int, Any]] = []
+        self.__writes: list[bytes] = []
+        self.__is_open: bool = False
+
+    @property
+    def requests(self) -> list[tuple[int, Any]]:
+        """Returns each ioctl request and its argument, in order."""
+        return self.__requests
+
+    @property
+    def writes(self) -> list[bytes]:
+        """Returns the bytes of each write, in order."""
+        return self.__writes
+
+    @property
+    def is_open(self) -> bool:
+        """Returns whether the device file is open."""
+        return self.__is_open
+
+    def open(self, path: str, flags: int) -> int:
+        """Opens the device file and returns its file descriptor."""
+        assert path == UInputBackend.UINPUT_PATH
+        assert flags & os.O_WRONLY
+        self.__is_open = True
+        return FILE_DESCRIPTOR
+
+    def ioctl(self, file_descriptor: int, request: int, argument: Any = 0) -> int:
+        """Records the request, failing it if it is the failing request."""
+        assert file_descriptor == FILE_DESCRIPTOR and self.__is_open
+        if request == self.__failing_request:
+            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL))
+        self.__requests.append((request, argument))
+        return 0
+
+    def write(self, file_descriptor: int, data: bytes) -> int:
+        """Records the written bytes."""
+        assert file_descriptor == FILE_DESCRIPTOR and self.__is_open
+        self.__writes.append(bytes(data))
+        return len(data)
+
+    def close(self, file_descriptor: int) -> None:
+        """Closes the device file."""
+        assert file_descriptor == FILE_DESCRIPTOR
+        self.__is_open = False
+
+
+def _install(monkeypatch: pytest.MonkeyPatch, device: FakeUInputDevice) -> None:
+    """Routes the backend's device file access to the fake device."""
+    monkeypatch.setattr(fcntl, "ioctl", device.ioctl)
+    monkeypatch.setattr(
+        backends,
+        "os",
+        SimpleNamespace(
+            O_WRONLY=os.O_WRONLY,
+            O_NONBLOCK=os.O_NONBLOCK,
+            open=device.open,
+            write=device.write,
+            close=device.close,
+        ),
+    )
+    monkeypatch.setattr(backends, "time", SimpleNamespace(sleep=lambda seconds: None))
+
+
+def _events(data: bytes) -> list[tuple[int, int, int]]:
+    """Returns the type, code and value of each input event in the bytes."""
+    return [
+        (event_type, code, value)
+        for *_, event_type, code, value in UInputBackend.INPUT_EVENT_FORMAT.iter_unpack(
+            data
+        )
+    ]
+
+
+def test_input_event_matches_the_kernel_layout() -> None:
+    """Checks that an input event packs as a timeval, then type, code and value."""
+    timeval_size = 2 * struct.calcsize("l")
+    packed = UInputBackend.INPUT_EVENT_FORMAT.pack(0, 0, 0x01, 0x110, -1)
+    assert len(packed) == timeval_size + EVENT_FIELDS_SIZE
+    assert packed[timeval_size:] == struct.pack("=HHi", 0x01, 0x110, -1)
+
+
+def test_device_is_set_up_before_it_is_created(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Checks the order of the requests that register and create the device."""
+    device = FakeUInputDevice()
+    _install(monkeypatch, device)
+    UInputBackend(SCREEN_SIZE)
+
+    requests = [request for request, _ in device.requests]
+    assert requests[0] == UInputBackend.UI_SET_EVBIT
+    assert requests[-2:] == [UInputBackend.UI_DEV_SETUP, UInputBackend.UI_DEV_CREATE]
+    assert (UInputBackend.UI_SET_EVBIT, UInputBackend.EV_KEY) in device.requests
+    assert (UInputBackend.UI_SET_EVBIT, UInputBackend.EV_ABS) in device.requests
+    for button_code in UInputBackend.BUTTON_CODES.values():
+        assert (UInputBackend.UI_SET_KEYBIT, button_code) in device.requests
+
+    axis_maximums = [
+        UInputBackend.ABS_SETUP_FORMAT.unpack(argument)[3]
+        for request, argument in device.requests
+        if request == UInputBackend.UI_ABS_SETUP
+    ]
+    assert axis_maximums == [SCREEN_SIZE[0] - 1, SCREEN_SIZE[1] - 1]
+    device_name = UInputBackend.DEVICE_SETUP_FORMAT.unpack(device.requests[-2][1])[4]
+    assert device_name.rstrip(b"\0") == UInputBackend.DEVICE_NAME
+
+
+def test_click_is_written_in_one_flush(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Checks that a queued click is written at once as two synchronized reports."""
+    device = FakeUInputDevice()
+    _install(monkeypatch, device)
+    uinput_backend = UInputBackend(SCREEN_SIZE)
+    uinput_backend.click(MouseButton.left)
+    assert not device.writes
+    uinput_backend.flush()
+    uinput_backend.flush()
+
+    left_code = UInputBackend.BUTTON_CODES["left"]
+    report = (UInputBackend.EV_SYN, UInputBackend.SYN_REPORT, 0)
+    assert len(device.writes) == 1
+    assert _events(device.writes[0]) == [
+        (UInputBackend.EV_KEY, left_code, 1),
+        report,
+        (UInputBackend.EV_KEY, left_code, 0),
+        report,
+    ]
+
+
+def test_move_writes_both_axes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Checks that a move sets both absolute axes in a single report."""
+    device = FakeUInputDevice()
+    _install(monkeypatch, device)
+    uinput_backend = UInputBackend(SCREEN_SIZE)
+    uinput_backend.move(640, 360)
+    uinput_backend.flush()
+    assert _events(device.writes[0]) == [
+        (UInputBackend.EV_ABS, UInputBackend.ABS_X, 640),
+        (UInputBackend.EV_ABS, UInputBackend.ABS_Y, 360),
+        (UInputBackend.EV_SYN, UInputBackend.SYN_REPORT, 0),
+    ]
+
+
+def test_close_flushes_then_destroys_the_device(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that closing writes the queued events before destroying the device."""
+    device = FakeUInputDevice()
+    _install(monkeypatch, device)
+    uinput_backend = UInputBackend(SCREEN_SIZE)
+    uinput_backend.press(MouseButton.right)
+    uinput_backend.close()
+    assert len(device.writes) == 1
+    assert device.requests[-1][0] == UInputBackend.UI_DEV_DESTROY
+    assert not device.is_open
+
+
+def test_failed_device_creation_closes_the_file(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that a rejected device request is reported and closes the device file."""
+    device = FakeUInputDevice(failing_request=UInputBackend.UI_DEV_CREATE)
+    _install(monkeypatch, device)
+    with pytest.raises(InputBackendError):
+        UInputBackend(SCREEN_SIZE)
+    assert not device.is_open
@@ -0,0 +1,111 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the exit codes and imports of the headless runner."""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from src import cli
+
+PROJECT_ROOT: Path = Path(__file__).resolve().parents[1]
+STOP_DELAY_SECONDS: float = 0.2
+SUBPROCESS_TIMEOUT_SECONDS: float = 30.0
+NULL_RUN_ARGUMENTS: list[str] = ["run", "--backend", "null", "--interval-ms", "1"]
+
+
+def _exit_code(argv: list[str]) -> int | str | None:
+    """Runs the runner with the provided arguments and returns its exit code."""
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(argv)
+    return exit_info.value.code
+
+
+def test_completed_run_exits_with_0(capsys: pytest.CaptureFixture[str]) -> None:
+    """Checks that a run that reaches its event count exits with 0."""
+    assert _exit_code([*NULL_RUN_ARGUMENTS, "--count", "5"]) == 0
+    assert "event_count=5" in capsys.readouterr().out
+
+
+def test_config_options_are_overridden_by_flags(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Checks that a config file's options apply before the flags that follow it."""
+    config = tmp_path / "clicks.json"
+    config.write_text(json.dumps({"backend": "null", "count": 8, "interval_ms": 1}))
+    assert _exit_code(["run", "--config", str(config), "--count", "3"]) == 0
+    assert "event_count=3" in capsys.readouterr().out
+
+
+def test_failed_run_exits_with_1(tmp_path: Path) -> None:
+    """Checks that a run that cannot start exits with 1."""
+    missing_sequence = tmp_path / "missing.csv"
+    argv = [*NULL_RUN_ARGUMENTS, "--sequence", str(missing_sequence)]
+    assert _exit_code(argv) == cli.FAILED_EXIT_CODE
+
+
+def test_invalid_schedule_exits_with_1(tmp_path: Path) -> None:
+    """Checks that playing a file that is not a schedule exits with 1."""
+    schedule = tmp_path / "schedule.mac"
+    schedule.write_bytes(b"not a schedule")
+    argv = ["play", str(schedule), "--backend", "null"]
+    assert _exit_code(argv) == cli.FAILED_EXIT_CODE
+
+
+def test_stopped_run_exits_with_130() -> None:
+    """Checks that a run stopped by SIGTERM exits with 130."""
+    previous_handlers = {
+        signal_number: signal.getsignal(signal_number)
+        for signal_number in (signal.SIGINT, signal.SIGTERM)
+    }
+    stop_timer = threading.Timer(
+        STOP_DELAY_SECONDS, os.kill, (os.getpid(), signal.SIGTERM)
+    )
+    stop_timer.start()
+    try:
+        assert _exit_code(NULL_RUN_ARGUMENTS) == cli.STOPPED_EXIT_CODE
+    finally:
+        stop_timer.cancel()
+        for signal_number, handler in previous_handlers.items():
+            signal.signal(signal_number, handler)
+
+
+def test_run_imports_neither_qt_nor_numpy() -> None:
+    """Checks that a fresh interpreter runs clicks without loading PyQt6 or NumPy."""
+    script = (
+        "import sys\n"
+        "from src import cli\n"
+        "try:\n"
+        f"    cli.main({[*NULL_RUN_ARGUMENTS, '--count', '3']!r})\n"
+        "except SystemExit as exit:\n"
+        "    loaded = [name for name in ('PyQt6', 'numpy') if name in sys.modules]\n"
+        "    print(exit.code, loaded)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=SUBPROCESS_TIMEOUT_SECONDS,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "0 []"
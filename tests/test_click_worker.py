@@ -0,0 +1,239 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the click worker manager's control of a running click worker."""
+
+import logging
+import statistics
+import threading
+import time
+from typing import override
+
+import pytest
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordedInput, RecordingBackend
+from src.core.click_worker import LIVE_FIELDS, ClickWorkerManager, WorkerInputs
+from src.core.holds import HoldOverrunPolicy
+
+SLOW_INTERVAL_SECONDS: float = 0.02
+FAST_INTERVAL_SECONDS: float = 0.005
+RUN_SECONDS: float = 0.2
+LONG_WAIT_SECONDS: float = 60.0
+POLL_SECONDS: float = 0.001
+REPEATED_RUNS: int = 3
+EVENTS_PER_RUN: int = 2
+
+
+class ThreadRecordingBackend(RecordingBackend):
+    """A recording backend that also records which thread sent each click."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.__thread_ids: list[int] = []
+
+    @property
+    def thread_ids(self) -> list[int]:
+        """Returns the identifier of the thread that sent each click."""
+        return self.__thread_ids
+
+    @override
+    def click(self, button: MouseButton) -> None:
+        """Records the sending thread, then captures the click."""
+        self.__thread_ids.append(threading.get_ident())
+        super().click(button)
+
+
+def _continuous_inputs(input_backend: RecordingBackend) -> WorkerInputs:
+    """Returns the inputs of a continuous run at the slow interval."""
+    return WorkerInputs(
+        interval=SLOW_INTERVAL_SECONDS,
+        hold_length=0.0,
+        clicks_per_event=1,
+        event_count=None,
+        mouse_button=MouseButton.left,
+        location=(None, None),
+        is_using_location_x=False,
+        is_using_location_y=False,
+        is_using_held_clicks=False,
+        is_continuous=True,
+        input_backend=input_backend,
+    )
+
+
+def _presses(input_backend: RecordingBackend) -> list[RecordedInput]:
+    """Returns the press requests the backend recorded."""
+    return [record for record in input_backend.records if record.action == "press"]
+
+
+def _wait_for_press(input_backend: RecordingBackend) -> None:
+    """Waits until the backend has recorded a press, or fails after the stop timeout."""
+    deadline = time.perf_counter() + ClickWorkerManager.STOP_TIMEOUT_SECONDS
+    while not _presses(input_backend):
+        assert time.perf_counter() < deadline, "the click worker never pressed"
+        time.sleep(POLL_SECONDS)
+
+
+def _stop_within_timeout(click_worker_manager: ClickWorkerManager) -> None:
+    """Stops the click worker and checks that it finished within the stop timeout."""
+    start_time = time.perf_counter()
+    click_worker_manager.stop()
+    assert time.perf_counter() - start_time < ClickWorkerManager.STOP_TIMEOUT_SECONDS
+    assert not click_worker_manager.is_running
+    assert click_worker_manager.last_stop_latency_ns is not None
+
+
+def test_with_live_fields_only_swaps_the_live_fields() -> None:
+    """Checks that a retune keeps the fields a running worker cannot change."""
+    worker_inputs = _continuous_inputs(RecordingBackend())
+    changed_inputs = worker_inputs._replace(
+        interval=FAST_INTERVAL_SECONDS,
+        mouse_button=MouseButton.right,
+        event_count=5,
+        hold_overrun_policy=HoldOverrunPolicy.TRUNCATE,
+    )
+    live_fields = changed_inputs.live_fields
+    assert set(live_fields) == set(LIVE_FIELDS)
+    retuned_inputs = worker_inputs.with_live_fields(live_fields)
+    assert retuned_inputs.interval == FAST_INTERVAL_SECONDS
+    assert retuned_inputs.mouse_button == MouseButton.right
+    assert retuned_inputs.event_count is None
+    assert retuned_inputs.hold_overrun_policy == worker_inputs.hold_overrun_policy
+    assert retuned_inputs.input_backend is worker_inputs.input_backend
+
+
+def test_update_retunes_a_running_worker_without_restarting_it() -> None:
+    """Checks that new inputs take effect mid-run within the same run."""
+    input_backend = RecordingBackend()
+    worker_inputs = _continuous_inputs(input_backend)
+    click_worker_manager = ClickWorkerManager(lambda: None)
+    try:
+        click_worker_manager.start(worker_inputs)
+        time.sleep(RUN_SECONDS)
+        click_worker_manager.update(
+            worker_inputs._replace(
+                interval=FAST_INTERVAL_SECONDS, mouse_button=MouseButton.right
+            )
+        )
+        time.sleep(RUN_SECONDS)
+        assert click_worker_manager.is_running
+        click_worker_manager.stop()
+    finally:
+        click_worker_manager.shutdown()
+
+    presses = _presses(input_backend)
+    buttons = [press.button for press in presses]
+    first_right = buttons.index(MouseButton.right)
+    assert 0 < first_right
+    assert MouseButton.left not in buttons[first_right:]
+    assert click_worker_manager.telemetry.event_count == len(presses)
+    right_gaps = [
+        later.time_ns - earlier.time_ns
+        for earlier, later in zip(presses[first_right:], presses[first_right + 1 :])
+    ]
+    assert statistics.median(right_gaps) < SLOW_INTERVAL_SECONDS / 2 * 1e9
+
+
+def test_update_is_ignored_while_idle() -> None:
+    """Checks that updating an idle manager does not start the click worker."""
+    input_backend = RecordingBackend()
+    click_worker_manager = ClickWorkerManager(lambda: None)
+    try:
+        click_worker_manager.update(_continuous_inputs(input_backend))
+        assert not click_worker_manager.is_running
+    finally:
+        click_worker_manager.shutdown()
+    assert input_backend.request_count == 0
+
+
+def test_stop_interrupts_a_long_interval() -> None:
+    """Checks that stopping during a long wait between events returns promptly."""
+    input_backend = RecordingBackend()
+    click_worker_manager = ClickWorkerManager(lambda: None)
+    try:
+        click_worker_manager.start(
+            _continuous_inputs(input_backend)._replace(interval=LONG_WAIT_SECONDS)
+        )
+        _wait_for_press(input_backend)
+        _stop_within_timeout(click_worker_manager)
+    finally:
+        click_worker_manager.shutdown()
+
+
+def test_stop_releases_a_held_button() -> None:
+    """Checks that stopping in the middle of a long hold releases the button."""
+    input_backend = RecordingBackend()
+    click_worker_manager = ClickWorkerManager(lambda: None)
+    try:
+        click_worker_manager.start(
+            _continuous_inputs(input_backend)._replace(
+                interval=2 * LONG_WAIT_SECONDS,
+                hold_length=LONG_WAIT_SECONDS,
+                is_using_held_clicks=True,
+            )
+        )
+        _wait_for_press(input_backend)
+        _stop_within_timeout(click_worker_manager)
+    finally:
+        click_worker_manager.shutdown()
+    assert [record.action for record in input_backend.records] == [
+        "press",
+        "release",
+    ]
+
+
+def test_stop_ends_a_paused_run() -> None:
+    """Checks that stopping a paused click worker does not wait for a resume."""
+    input_backend = RecordingBackend()
+    click_worker_manager = ClickWorkerManager(lambda: None)
+    try:
+        click_worker_manager.start(_continuous_inputs(input_backend))
+        _wait_for_press(input_backend)
+        click_worker_manager.pause()
+        assert click_worker_manager.is_paused
+        _stop_within_timeout(click_worker_manager)
+    finally:
+        click_worker_manager.shutdown()
+
+
+def test_engine_thread_is_reused_across_runs(caplog: pytest.LogCaptureFixture) -> None:
+    """Checks that every run clicks on the same persistent engine thread."""
+    caplog.set_level(logging.INFO)
+    input_backend = ThreadRecordingBackend()
+    run_finished = threading.Event()
+    click_worker_manager = ClickWorkerManager(run_finished.set)
+    try:
+        for _ in range(REPEATED_RUNS):
+            run_finished.clear()
+            click_worker_manager.start(
+                _continuous_inputs(input_backend)._replace(
+                    interval=FAST_INTERVAL_SECONDS,
+                    event_count=EVENTS_PER_RUN,
+                    is_continuous=False,
+                )
+            )
+            assert run_finished.wait(ClickWorkerManager.STOP_TIMEOUT_SECONDS)
+    finally:
+        click_worker_manager.shutdown()
+
+    assert len(input_backend.thread_ids) == REPEATED_RUNS * EVENTS_PER_RUN
+    assert len(set(input_backend.thread_ids)) == 1
+    assert threading.get_ident() not in input_backend.thread_ids
+    latency_messages = [
+        record.message
+        for record in caplog.records
+        if record.message.startswith("Hotkey-to-first-click latency")
+    ]
+    assert len(latency_messages) == REPEATED_RUNS
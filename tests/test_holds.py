@@ -0,0 +1,137 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the hold overrun accounting of held click events."""
+
+import threading
+import time
+from typing import override
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.holds import HoldController, HoldOverrunPolicy, HoldStats
+
+SLOW_CLICK_SECONDS: float = 0.005
+TRUNCATED_INTERVAL_SECONDS: float = 0.01
+TRUNCATED_HOLD_LENGTH_SECONDS: float = 0.004
+TRUNCATED_RUNS: int = 3
+
+
+class SlowClickBackend(RecordingBackend):
+    """A recording backend whose clicks take longer than a short interval."""
+
+    @override
+    def click(self, button: MouseButton) -> None:
+        """Records the click after a delay."""
+        time.sleep(SLOW_CLICK_SECONDS)
+        super().click(button)
+
+
+def _worker_inputs(hold_length: float) -> WorkerInputs:
+    """Returns the inputs of three events at an interval the clicks overrun."""
+    return WorkerInputs(
+        interval=SLOW_CLICK_SECONDS / 5,
+        hold_length=hold_length,
+        clicks_per_event=1,
+        event_count=3,
+        mouse_button=MouseButton.left,
+        location=(None, None),
+        is_using_location_x=False,
+        is_using_location_y=False,
+        is_using_held_clicks=hold_length > 0,
+        is_continuous=False,
+        input_backend=SlowClickBackend(),
+    )
+
+
+def test_record_event_counts_only_events_longer_than_the_period() -> None:
+    """Checks that only events outlasting a non-zero period are overruns."""
+    hold_controller = HoldController()
+    hold_controller.record_event(5_000_000, 10_000_000)
+    hold_controller.record_event(15_000_000, 10_000_000)
+    hold_controller.record_event(15_000_000, 0)
+    assert hold_controller.stats == HoldStats(1, 0, 0)
+
+
+def test_truncate_splits_the_remaining_time_between_the_clicks() -> None:
+    """Checks that a truncated hold fits the remaining clicks into the event."""
+    hold_controller = HoldController(HoldOverrunPolicy.TRUNCATE)
+    assert hold_controller.hold_length_ns(8_000_000, 10_000_000, 2, 0) == 5_000_000
+    assert hold_controller.hold_length_ns(4_000_000, 10_000_000, 2, 0) == 4_000_000
+    assert hold_controller.stats == HoldStats(0, 1, 0)
+
+
+def test_stretch_never_truncates() -> None:
+    """Checks that the stretch policy keeps every hold length."""
+    hold_controller = HoldController(HoldOverrunPolicy.STRETCH)
+    assert hold_controller.hold_length_ns(8_000_000, 10_000_000, 2, 0) == 8_000_000
+    assert hold_controller.stats == HoldStats(0, 0, 0)
+
+
+def test_slow_events_without_held_clicks_are_not_hold_overruns() -> None:
+    """Checks that slow events of plain clicks are not counted as hold overruns."""
+    click_worker = ClickWorker(threading.Event(), threading.Event())
+    click_worker.start(_worker_inputs(hold_length=0.0))
+    assert click_worker.hold_stats == HoldStats(0, 0, 0)
+
+
+def test_slow_held_events_are_hold_overruns() -> None:
+    """Checks that held events outlasting the interval are counted as overruns."""
+    click_worker = ClickWorker(threading.Event(), threading.Event())
+    click_worker.start(_worker_inputs(hold_length=0.001))
+    assert click_worker.hold_stats.overrun_events == 3
+
+
+def test_truncated_holds_keep_every_event_inside_its_slot() -> None:
+    """
+    Checks that truncated holds leave room to send the clicks and wake up.
+    A run can still be made late by the system preempting the click thread,
+    so one of a few runs must keep every slot, which untruncated holds never do.
+    """
+    late_slots: list[int] = []
+    for _ in range(TRUNCATED_RUNS):
+        worker_inputs = WorkerInputs(
+            interval=TRUNCATED_INTERVAL_SECONDS,
+            hold_length=TRUNCATED_HOLD_LENGTH_SECONDS,
+            clicks_per_event=3,
+            event_count=3,
+            mouse_button=MouseButton.left,
+            location=(None, None),
+            is_using_location_x=False,
+            is_using_location_y=False,
+            is_using_held_clicks=True,
+            is_continuous=False,
+            input_backend=RecordingBackend(),
+            hold_overrun_policy=HoldOverrunPolicy.TRUNCATE,
+        )
+        click_worker = ClickWorker(threading.Event(), threading.Event())
+        click_worker.start(worker_inputs)
+        assert click_worker.hold_stats.truncated_holds == 9
+        late_slots.append(click_worker.schedule_stats.late_slots)
+    assert min(late_slots) == 0, late_slots
+
+
+def test_truncate_leaves_room_for_the_send_cost_and_wake_margin() -> None:
+    """Checks that the send cost and wake margin are taken off before splitting."""
+    hold_controller = HoldController(HoldOverrunPolicy.TRUNCATE)
+    hold_controller.record_send_cost(500_000)
+    hold_controller.record_send_cost(100_000)
+    assert hold_controller.send_cost_ns == 500_000
+    assert (
+        hold_controller.hold_length_ns(8_000_000, 10_000_000, 2, 0, 1_000_000)
+        == 4_000_000
+    )
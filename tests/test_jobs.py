@@ -0,0 +1,94 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests that the click job engine serializes holds across jobs."""
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import InputBackendType, RecordedInput, RecordingBackend
+from src.core.click_worker import WorkerInputs
+from src.core.jobs import ClickJobEngine
+
+HOLD_LENGTH_SECONDS: float = 0.02
+IDLE_TIMEOUT_SECONDS: float = 5.0
+
+
+class PointerBackend(RecordingBackend):
+    """A recording backend that stands in for one driving the real pointer."""
+
+    BACKEND_TYPE: InputBackendType = InputBackendType.PYNPUT
+
+
+def _job_inputs(
+    input_backend: RecordingBackend,
+    mouse_button: MouseButton,
+    location: tuple[int, int],
+    hold_length: float,
+) -> WorkerInputs:
+    """Returns the inputs of a job clicking three times at the provided location."""
+    return WorkerInputs(
+        interval=HOLD_LENGTH_SECONDS / 4,
+        hold_length=hold_length,
+        clicks_per_event=1,
+        event_count=3,
+        mouse_button=mouse_button,
+        location=location,
+        is_using_location_x=True,
+        is_using_location_y=True,
+        is_using_held_clicks=hold_length > 0,
+        is_continuous=False,
+        input_backend=input_backend,
+    )
+
+
+def _inputs_during_holds(input_backend: RecordingBackend) -> list[RecordedInput]:
+    """Returns the recorded inputs sent while the left button was held."""
+    is_holding = False
+    inputs_during_holds: list[RecordedInput] = []
+    for record in input_backend.records:
+        if record.button == MouseButton.left:
+            is_holding = record.action == "press"
+        elif is_holding:
+            inputs_during_holds.append(record)
+    return inputs_during_holds
+
+
+def _run_jobs(input_backend: RecordingBackend) -> None:
+    """
+    Runs a job holding the left button and a job clicking the right button at
+    another location until both finish.
+    """
+    engine = ClickJobEngine()
+    engine.add(
+        _job_inputs(input_backend, MouseButton.left, (1, 1), HOLD_LENGTH_SECONDS)
+    )
+    engine.add(_job_inputs(input_backend, MouseButton.right, (2, 2), 0.0))
+    assert engine.wait_until_idle(IDLE_TIMEOUT_SECONDS)
+    assert all(stats.is_finished for stats in engine.job_stats.values())
+    engine.shutdown()
+
+
+def test_holds_are_not_broken_by_other_jobs() -> None:
+    """Checks that no other job moves or clicks while a job holds its button."""
+    input_backend = PointerBackend()
+    _run_jobs(input_backend)
+    assert not _inputs_during_holds(input_backend)
+
+
+def test_holds_on_the_null_backend_do_not_defer_other_jobs() -> None:
+    """Checks that other jobs keep clicking during holds that send nothing."""
+    input_backend = RecordingBackend()
+    _run_jobs(input_backend)
+    assert _inputs_during_holds(input_backend)
@@ -0,0 +1,167 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests how the template locator finds a template image on screen."""
+
+from pathlib import Path
+from typing import override
+
+import numpy as np
+import pytest
+
+from src.core.locator import TemplateLocator, TemplateLocatorSettings, load_template
+from src.core.screen import ScreenCapture, ScreenRegion
+
+SCREEN_SIZE: tuple[int, int] = (160, 120)
+TEMPLATE_SIZE: tuple[int, int] = (12, 9)
+TARGET: tuple[int, int] = (37, 21)
+MOVED_TARGET: tuple[int, int] = (45, 16)
+SEARCH_MARGIN: int = 16
+SEED: int = 20
+
+
+class FakeScreen:
+    """A screen of random noise that a template can be planted on."""
+
+    def __init__(self) -> None:
+        self.__random: np.random.Generator = np.random.default_rng(SEED)
+        self.__template: np.ndarray = self.__random.integers(
+            0, 256, (TEMPLATE_SIZE[1], TEMPLATE_SIZE[0], 3), dtype=np.uint8
+        )
+        self.__image: np.ndarray = self._noise()
+
+    @property
+    def template(self) -> np.ndarray:
+        """Returns the RGB template that can be planted."""
+        return self.__template
+
+    @property
+    def image(self) -> np.ndarray:
+        """Returns the current BGRX frame of the whole screen."""
+        return self.__image
+
+    def _noise(self) -> np.ndarray:
+        """Returns a BGRX frame of random noise the size of the screen."""
+        return self.__random.integers(
+            0, 256, (SCREEN_SIZE[1], SCREEN_SIZE[0], 4), dtype=np.uint8
+        )
+
+    def plant(self, position: tuple[int, int]) -> None:
+        """Redraws the noise with the template's top-left corner at the position."""
+        self.__image = self._noise()
+        x, y = position
+        self.__image[y : y + TEMPLATE_SIZE[1], x : x + TEMPLATE_SIZE[0], :3] = (
+            self.__template[..., ::-1]
+        )
+
+    def clear(self) -> None:
+        """Redraws the noise without the template."""
+        self.__image = self._noise()
+
+
+class FakeScreenCapture(ScreenCapture):
+    """A screen capture of a region of the fake screen."""
+
+    def __init__(self, region: ScreenRegion, screen: FakeScreen) -> None:
+        super().__init__(region)
+        self.__screen: FakeScreen = screen
+
+    @property
+    @override
+    def screen_size(self) -> tuple[int, int]:
+        """Returns the width and height of the fake screen."""
+        return SCREEN_SIZE
+
+    @override
+    def capture(self) -> np.ndarray:
+        """Returns the pixels of the region on the fake screen."""
+        region = self.region
+        return self.__screen.image[
+            region.y : region.y + region.height, region.x : region.x + region.width
+        ]
+
+
+def _locator(screen: FakeScreen) -> TemplateLocator:
+    """Returns a template locator that captures the fake screen."""
+    return TemplateLocator(
+        TemplateLocatorSettings(screen.template, search_margin=SEARCH_MARGIN),
+        lambda region: FakeScreenCapture(region, screen),
+    )
+
+
+def _centre(position: tuple[int, int]) -> tuple[int, int]:
+    """Returns the centre of the template with its top-left corner at the position."""
+    return position[0] + TEMPLATE_SIZE[0] // 2, position[1] + TEMPLATE_SIZE[1] // 2
+
+
+def test_full_scan_finds_the_planted_template() -> None:
+    """Checks that the FFT search finds the template anywhere on the screen."""
+    screen = FakeScreen()
+    screen.plant(TARGET)
+    template_locator = _locator(screen)
+    assert template_locator.locate() == _centre(TARGET)
+    assert template_locator.stats.full_scans == 1
+
+
+def test_unmoved_target_is_verified_in_place() -> None:
+    """Checks that a target that stayed put is found without a search."""
+    screen = FakeScreen()
+    screen.plant(TARGET)
+    template_locator = _locator(screen)
+    template_locator.locate()
+    assert template_locator.locate() == _centre(TARGET)
+    assert template_locator.stats.verified_hits == 1
+    assert template_locator.stats.full_scans == 1
+
+
+def test_moved_target_is_found_in_the_recent_region() -> None:
+    """Checks that a target moved within the margin is found by the region search."""
+    screen = FakeScreen()
+    screen.plant(TARGET)
+    template_locator = _locator(screen)
+    template_locator.locate()
+    screen.plant(MOVED_TARGET)
+    assert template_locator.locate() == _centre(MOVED_TARGET)
+    assert template_locator.stats.region_hits == 1
+    assert template_locator.stats.full_scans == 1
+
+
+def test_missing_template_is_not_found() -> None:
+    """Checks that noise does not match the template within the maximum error."""
+    screen = FakeScreen()
+    screen.clear()
+    template_locator = _locator(screen)
+    assert template_locator.locate() is None
+    assert template_locator.stats.misses == 1
+
+
+def test_load_template_reads_ppm_and_npy_images(tmp_path: Path) -> None:
+    """Checks that both template file formats load as the same RGB array."""
+    template = FakeScreen().template
+    height, width, _ = template.shape
+    ppm_path = tmp_path / "template.ppm"
+    ppm_path.write_bytes(f"P6\n{width} {height}\n255\n".encode() + template.tobytes())
+    npy_path = tmp_path / "template.npy"
+    np.save(npy_path, template)
+    assert np.array_equal(load_template(ppm_path), template)
+    assert np.array_equal(load_template(npy_path), template)
+
+
+def test_load_template_rejects_other_arrays(tmp_path: Path) -> None:
+    """Checks that an array that is not an 8-bit RGB image is refused."""
+    npy_path = tmp_path / "template.npy"
+    np.save(npy_path, np.zeros((4, 4), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        load_template(npy_path)
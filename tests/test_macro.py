@@ -0,0 +1,217 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the recording, conversion and replay of macro files."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pynput.keyboard import KeyCode
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.macro import (
+    MACRO_EVENT_DTYPE,
+    MacroError,
+    MacroEventType,
+    MacroFile,
+    MacroPlayer,
+    MacroRecorder,
+    MacroSettings,
+    MacroWriter,
+    convert_script,
+)
+from src.core.timing import TimingEngine
+
+EVENT_SPACING_NS: int = 100_000
+STREAMED_EVENT_COUNT: int = 10_000
+PREFETCH_CHUNK_SIZE: int = 64
+
+
+def _replay(path: Path) -> RecordingBackend:
+    """Replays the macro file once and returns the backend that captured it."""
+    input_backend = RecordingBackend()
+    MacroPlayer(MacroSettings(path)).play(
+        input_backend, TimingEngine(), time.perf_counter_ns(), lambda: 0
+    )
+    return input_backend
+
+
+def test_written_events_read_back_across_chunks(tmp_path: Path) -> None:
+    """Checks that every written event reads back in order through small chunks."""
+    path = tmp_path / "events.mac"
+    macro_writer = MacroWriter(path)
+    for index in range(10):
+        macro_writer.append(index * EVENT_SPACING_NS, MacroEventType.MOVE, index, 0, 0)
+    macro_writer.close()
+
+    macro_file = MacroFile(path)
+    chunk = np.zeros(3, dtype=MACRO_EVENT_DTYPE)
+    xs = [int(x) for events in macro_file.chunks(chunk) for x in events["x"]]
+    buffers = [np.zeros(3, dtype=MACRO_EVENT_DTYPE) for _ in range(2)]
+    prefetched_xs = [
+        int(x) for events in macro_file.prefetched_chunks(buffers) for x in events["x"]
+    ]
+    assert macro_file.event_count == 10
+    assert xs == prefetched_xs == list(range(10))
+
+
+def test_non_macro_files_are_rejected(tmp_path: Path) -> None:
+    """Checks that a file without the macro header raises MacroError."""
+    path = tmp_path / "other.mac"
+    path.write_bytes(b"not a macro file")
+    with pytest.raises(MacroError):
+        MacroFile(path)
+
+
+def test_recorded_events_replay_in_order(tmp_path: Path) -> None:
+    """Checks that a recording replays the same moves, clicks and keys."""
+    path = tmp_path / "recorded.mac"
+    macro_recorder = MacroRecorder(path)
+    macro_recorder.record_move(1, 2)
+    macro_recorder.record_click(3, 4, MouseButton.right, True)
+    macro_recorder.record_click(3, 4, MouseButton.right, False)
+    macro_recorder.record_key(KeyCode.from_vk(65), True)
+    macro_recorder.record_key(KeyCode.from_vk(65), False)
+    macro_recorder.close()
+
+    records = _replay(path).records
+    assert [record.action for record in records] == [
+        "move",
+        "move",
+        "press",
+        "move",
+        "release",
+        "key_press",
+        "key_release",
+    ]
+    assert [record.button for record in records if record.button] == [
+        MouseButton.right,
+        MouseButton.right,
+    ]
+    assert [record.key_code for record in records if record.key_code] == [65, 65]
+
+
+def test_csv_scripts_convert_and_replay(tmp_path: Path) -> None:
+    """Checks that a CSV script converts into clicks that replay at their spots."""
+    script = tmp_path / "script.csv"
+    script.write_text("time_ms,action,x,y,button\n0,,5,6,\n0.1,click,7,8,middle\n")
+    path = tmp_path / "script.mac"
+    assert convert_script(script, path) == 2
+
+    records = _replay(path).records
+    assert [(record.action, record.x, record.y) for record in records] == [
+        ("move", 5, 6),
+        ("press", None, None),
+        ("release", None, None),
+        ("move", 7, 8),
+        ("press", None, None),
+        ("release", None, None),
+    ]
+    assert records[-1].button == MouseButton.middle
+
+
+def test_jsonl_scripts_must_not_go_back_in_time(tmp_path: Path) -> None:
+    """Checks that an event earlier than the one before it is rejected with its row."""
+    script = tmp_path / "script.jsonl"
+    script.write_text(
+        "\n".join(
+            json.dumps(row)
+            for row in (
+                {"time_ns": 1000, "x": 1, "y": 2},
+                {"time_ns": 500, "x": 1, "y": 2},
+            )
+        )
+    )
+    with pytest.raises(ValueError, match="row 2"):
+        convert_script(script, tmp_path / "script.mac")
+
+
+def test_scripts_with_unknown_actions_are_rejected(tmp_path: Path) -> None:
+    """Checks that an unknown action is rejected with its row."""
+    script = tmp_path / "script.csv"
+    script.write_text("time_ms,action,x,y\n0,double_click,1,2\n")
+    with pytest.raises(ValueError, match="row 1"):
+        convert_script(script, tmp_path / "script.mac")
+
+
+def test_script_rows_fill_in_their_defaults(tmp_path: Path) -> None:
+    """Checks that rows default to left clicks and prefer time_ns over time_ms."""
+    script = tmp_path / "script.jsonl"
+    script.write_text(
+        "\n".join(
+            json.dumps(row)
+            for row in (
+                {"time_ms": 0.5, "x": 1, "y": 2},
+                {"time_ns": 600_000, "time_ms": 99, "action": "key_press", "key": 65},
+                {
+                    "time_ns": 700_000,
+                    "action": "release",
+                    "x": 3,
+                    "y": 4,
+                    "button": "right",
+                },
+            )
+        )
+    )
+    path = tmp_path / "script.mac"
+    assert convert_script(script, path) == 3
+
+    chunk = np.zeros(PREFETCH_CHUNK_SIZE, dtype=MACRO_EVENT_DTYPE)
+    events = next(MacroFile(path).chunks(chunk))
+    assert events["time_ns"].tolist() == [500_000, 600_000, 700_000]
+    assert events["event_type"].tolist() == [
+        MacroEventType.CLICK,
+        MacroEventType.KEY_PRESS,
+        MacroEventType.RELEASE,
+    ]
+    assert events["code"].tolist() == [1, 65, 3]
+
+
+def test_long_scripts_stream_through_the_prefetch_buffers(tmp_path: Path) -> None:
+    """Checks that a long script reads back in order through a fixed ring of arrays."""
+    script = tmp_path / "script.jsonl"
+    with script.open("w") as file:
+        for index in range(STREAMED_EVENT_COUNT):
+            row = {"time_ns": index * EVENT_SPACING_NS, "x": index, "y": 0}
+            file.write(json.dumps(row) + "\n")
+    path = tmp_path / "script.mac"
+    assert convert_script(script, path) == STREAMED_EVENT_COUNT
+
+    buffers = [np.zeros(PREFETCH_CHUNK_SIZE, dtype=MACRO_EVENT_DTYPE) for _ in range(2)]
+    xs: list[int] = []
+    for events in MacroFile(path).prefetched_chunks(buffers):
+        assert any(np.shares_memory(events, buffer) for buffer in buffers)
+        xs.extend(int(x) for x in events["x"])
+    assert xs == list(range(STREAMED_EVENT_COUNT))
+
+
+def test_abandoned_prefetch_stops_its_reader(tmp_path: Path) -> None:
+    """Checks that leaving a prefetched replay early ends the reader thread."""
+    path = tmp_path / "events.mac"
+    macro_writer = MacroWriter(path)
+    for index in range(4 * PREFETCH_CHUNK_SIZE):
+        macro_writer.append(index * EVENT_SPACING_NS, MacroEventType.MOVE, index, 0, 0)
+    macro_writer.close()
+
+    buffers = [np.zeros(PREFETCH_CHUNK_SIZE, dtype=MACRO_EVENT_DTYPE) for _ in range(2)]
+    chunks = MacroFile(path).prefetched_chunks(buffers)
+    next(chunks)
+    chunks.close()
+    assert not any(thread.name == "MacroPrefetch" for thread in threading.enumerate())
@@ -0,0 +1,86 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests how the pointer tracker avoids position queries and moves."""
+
+from src.core.backends import RecordingBackend
+from src.core.pointer import PointerStats, PointerTracker
+
+REVALIDATION_PERIOD_NS: int = 100_000_000
+EVENT_PERIOD_NS: int = 10_000_000
+TARGET: tuple[int, int] = (50, 60)
+
+
+def _moves(input_backend: RecordingBackend) -> list[tuple[int, int]]:
+    """Returns the positions the pointer was moved to."""
+    return [
+        (record.x, record.y)
+        for record in input_backend.records
+        if record.action == "move" and record.x is not None and record.y is not None
+    ]
+
+
+def test_fixed_target_skips_queries_within_the_period() -> None:
+    """Checks that a fully fixed target is only queried once per period."""
+    input_backend = RecordingBackend()
+    pointer_tracker = PointerTracker(input_backend, TARGET, REVALIDATION_PERIOD_NS)
+    for event_index in range(10):
+        pointer_tracker.move_to_target(event_index * EVENT_PERIOD_NS)
+    assert pointer_tracker.stats == PointerStats(1, 9, 1, 9)
+    assert _moves(input_backend) == [TARGET]
+
+
+def test_fixed_target_is_revalidated_after_the_period() -> None:
+    """Checks that a pointer moved away is moved back once the period passes."""
+    input_backend = RecordingBackend()
+    pointer_tracker = PointerTracker(input_backend, TARGET, REVALIDATION_PERIOD_NS)
+    pointer_tracker.move_to_target(0)
+    input_backend.move(0, 0)
+    pointer_tracker.move_to_target(REVALIDATION_PERIOD_NS - 1)
+    assert input_backend.position == (0, 0)
+    pointer_tracker.move_to_target(REVALIDATION_PERIOD_NS)
+    assert input_backend.position == TARGET
+    assert pointer_tracker.stats.queries == 2
+
+
+def test_partial_target_queries_every_event() -> None:
+    """Checks that a user-controlled coordinate is read on every event."""
+    input_backend = RecordingBackend(initial_position=(5, 5))
+    pointer_tracker = PointerTracker(
+        input_backend, (TARGET[0], None), REVALIDATION_PERIOD_NS
+    )
+    pointer_tracker.move_to_target(0)
+    pointer_tracker.move_to_target(EVENT_PERIOD_NS)
+    assert pointer_tracker.stats == PointerStats(2, 0, 1, 1)
+    assert _moves(input_backend) == [(TARGET[0], 5)]
+
+
+def test_retarget_revalidates_on_the_next_event() -> None:
+    """Checks that a new target is moved to without waiting for the period."""
+    input_backend = RecordingBackend()
+    pointer_tracker = PointerTracker(input_backend, TARGET, REVALIDATION_PERIOD_NS)
+    pointer_tracker.move_to_target(0)
+    pointer_tracker.retarget((70, 80))
+    pointer_tracker.move_to_target(EVENT_PERIOD_NS)
+    assert _moves(input_backend) == [TARGET, (70, 80)]
+
+
+def test_no_target_never_queries_or_moves() -> None:
+    """Checks that clicking wherever the pointer is needs no queries."""
+    input_backend = RecordingBackend()
+    pointer_tracker = PointerTracker(input_backend, (None, None), 0)
+    pointer_tracker.move_to_target(0)
+    assert pointer_tracker.stats == PointerStats(0, 0, 0, 0)
+    assert input_backend.request_count == 0
@@ -0,0 +1,89 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the closed-loop target rate of click events."""
+
+import threading
+
+from pynput.mouse import Button as MouseButton
+
+from src.core.backends import RecordingBackend
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.rate import RateController
+
+TARGET_CPS: float = 200.0
+SIMULATED_EVENTS: int = 400
+SIMULATED_EVENT_COST_NS: int = 1_500_000
+SIMULATED_WAKE_LATENCY_NS: int = 500_000
+SIMULATED_TOLERANCE: float = 0.01
+WORKER_EVENTS: int = 100
+WORKER_TOLERANCE: float = 0.1
+
+
+def _simulate(rate_controller: RateController, event_cost_ns: int) -> None:
+    """
+    Runs events of a fixed cost on a simulated clock that always wakes a little
+    after each deadline, so only the feedback can make up the difference.
+    """
+    now_ns = 0
+    for _ in range(SIMULATED_EVENTS):
+        deadline_ns = rate_controller.next_deadline(now_ns)
+        now_ns = max(now_ns, deadline_ns + SIMULATED_WAKE_LATENCY_NS)
+        rate_controller.record_event(now_ns, now_ns + event_cost_ns)
+        now_ns += event_cost_ns
+
+
+def test_rate_controller_converges_on_the_target() -> None:
+    """Checks that the feedback absorbs the event cost and late wakes."""
+    rate_controller = RateController(TARGET_CPS, 1)
+    _simulate(rate_controller, SIMULATED_EVENT_COST_NS)
+    stats = rate_controller.stats
+    assert abs(stats.sustained_cps - TARGET_CPS) < TARGET_CPS * SIMULATED_TOLERANCE
+    assert stats.is_reachable
+
+
+def test_rate_controller_reports_an_unreachable_target() -> None:
+    """Checks that clicks costing more than the period make the target unreachable."""
+    rate_controller = RateController(TARGET_CPS, 1)
+    _simulate(rate_controller, 2 * round(1e9 / TARGET_CPS))
+    assert not rate_controller.stats.is_reachable
+
+
+def test_click_worker_sustains_the_target_rate() -> None:
+    """Checks that a target rate run with the recording backend sustains the target."""
+    input_backend = RecordingBackend()
+    click_worker = ClickWorker(threading.Event(), threading.Event())
+    click_worker.start(
+        WorkerInputs(
+            interval=0.0,
+            hold_length=0.0,
+            clicks_per_event=1,
+            event_count=WORKER_EVENTS,
+            mouse_button=MouseButton.left,
+            location=(None, None),
+            is_using_location_x=False,
+            is_using_location_y=False,
+            is_using_held_clicks=False,
+            is_continuous=False,
+            input_backend=input_backend,
+            target_cps=TARGET_CPS,
+        )
+    )
+
+    rate_stats = click_worker.rate_stats
+    assert rate_stats is not None
+    assert abs(rate_stats.sustained_cps - TARGET_CPS) < TARGET_CPS * WORKER_TOLERANCE
+    presses = [record for record in input_backend.records if record.action == "press"]
+    assert len(presses) == WORKER_EVENTS
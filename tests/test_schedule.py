@@ -0,0 +1,70 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the absolute deadlines and overrun policies of the event schedule."""
+
+from src.core.schedule import EventSchedule, OverrunPolicy, ScheduleStats
+
+INTERVAL_NS: int = 1000
+
+
+def test_deadlines_follow_the_anchor_regardless_of_wake_ups() -> None:
+    """Checks that on-time slots are spaced from the anchor, not from each wake-up."""
+    schedule = EventSchedule(INTERVAL_NS, anchor_ns=0)
+    assert [schedule.next_deadline(now_ns) for now_ns in (0, 900, 1500)] == [
+        0,
+        1000,
+        2000,
+    ]
+    assert schedule.stats == ScheduleStats(3, 0, 0, 0)
+
+
+def test_catch_up_fires_every_missed_slot() -> None:
+    """Checks that catch up hands out each missed slot in turn."""
+    schedule = EventSchedule(INTERVAL_NS, OverrunPolicy.CATCH_UP, anchor_ns=0)
+    assert [schedule.next_deadline(3500) for _ in range(5)] == [
+        0,
+        1000,
+        2000,
+        3000,
+        4000,
+    ]
+    assert schedule.stats == ScheduleStats(5, 4, 0, 0)
+
+
+def test_skip_fires_only_the_latest_missed_slot() -> None:
+    """Checks that skip drops the slots before the latest missed one."""
+    schedule = EventSchedule(INTERVAL_NS, OverrunPolicy.SKIP, anchor_ns=0)
+    schedule.next_deadline(0)
+    assert schedule.next_deadline(3500) == 3000
+    assert schedule.next_deadline(3500) == 4000
+    assert schedule.stats == ScheduleStats(3, 1, 2, 0)
+
+
+def test_reanchor_restarts_the_timeline_from_now() -> None:
+    """Checks that reanchor moves the timeline to the late wake-up."""
+    schedule = EventSchedule(INTERVAL_NS, OverrunPolicy.REANCHOR, anchor_ns=0)
+    schedule.next_deadline(0)
+    assert schedule.next_deadline(3500) == 3500
+    assert schedule.next_deadline(3500) == 4500
+    assert schedule.stats == ScheduleStats(3, 1, 0, 1)
+
+
+def test_shift_moves_the_remaining_timeline() -> None:
+    """Checks that a pause shifts every later slot by its length."""
+    schedule = EventSchedule(INTERVAL_NS, anchor_ns=0)
+    schedule.next_deadline(0)
+    schedule.shift(250)
+    assert schedule.next_deadline(0) == 1250
@@ -0,0 +1,77 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the loading and compiling of click sequences."""
+
+from pathlib import Path
+
+import pytest
+from pynput.mouse import Button as MouseButton
+
+from src.core.sequence import ClickSequence, SequenceStep, load_sequence
+
+
+def _write_sequence(tmp_path: Path, text: str) -> Path:
+    """Writes the provided CSV text to a sequence file and returns its path."""
+    path = tmp_path / "sequence.csv"
+    path.write_text(text)
+    return path
+
+
+def test_load_sequence_fills_in_optional_columns(tmp_path: Path) -> None:
+    """Checks that missing optional columns take their defaults."""
+    path = _write_sequence(tmp_path, "x,y,button,hold_ms\n1,2,right,5\n3,4,,\n")
+    assert load_sequence(path) == [
+        SequenceStep(1, 2, MouseButton.right, 0.005),
+        SequenceStep(3, 4),
+    ]
+
+
+@pytest.mark.parametrize("button", ["button8", "unknown", "LEFT"])
+def test_load_sequence_rejects_unsupported_buttons(tmp_path: Path, button: str) -> None:
+    """Checks that buttons the players cannot send are rejected with the line."""
+    path = _write_sequence(tmp_path, f"x,y,button\n1,2,left\n1,2,{button}\n")
+    with pytest.raises(ValueError, match="line 3"):
+        load_sequence(path)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["x\n1\n", "x,y,speed\n1,2,3\n", "x,y\n1,a\n", "x,y,clicks\n1,2,1.5\n"],
+)
+def test_load_sequence_rejects_invalid_files(tmp_path: Path, text: str) -> None:
+    """Checks that bad headers and values raise ValueError."""
+    with pytest.raises(ValueError):
+        load_sequence(_write_sequence(tmp_path, text))
+
+
+def test_click_sequence_rejects_unsupported_buttons() -> None:
+    """Checks that a step built in code with an unsupported button is rejected."""
+    with pytest.raises(ValueError):
+        ClickSequence([SequenceStep(0, 0, MouseButton.unknown)])
+
+
+def test_click_sequence_offsets_include_clicks_holds_and_delays() -> None:
+    """Checks that each step starts after the clicks, holds and delay before it."""
+    sequence = ClickSequence(
+        [
+            SequenceStep(0, 0, hold_length=0.002, clicks=2, delay=0.001),
+            SequenceStep(1, 1, delay=0.003),
+            SequenceStep(2, 2),
+        ]
+    )
+    offsets_ns = sequence.timeline()[0]
+    assert offsets_ns == [0, 5_000_000, 8_000_000]
+    assert sequence.duration_ns == 8_000_000
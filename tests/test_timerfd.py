@@ -0,0 +1,106 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the Linux timerfd timer and the wakeable stop event."""
+
+import os
+import select
+import threading
+import time
+
+import pytest
+
+from src.core.timerfd import TimerFd, WakeableEvent
+
+PERIOD_NS: int = 2_000_000
+MISSED_PERIODS: int = 5
+STOP_DELAY_SECONDS: float = 0.05
+STOP_TIMEOUT_SECONDS: float = 1.0
+
+requires_timerfd = pytest.mark.skipif(
+    not TimerFd.is_supported(), reason="timerfd is only available on Linux"
+)
+
+
+@requires_timerfd
+def test_single_deadline_expires_once() -> None:
+    """Checks that a timer armed without a period expires once at its deadline."""
+    timer = TimerFd()
+    try:
+        deadline_ns = time.perf_counter_ns() + PERIOD_NS
+        timer.arm(deadline_ns)
+        assert timer.wait(WakeableEvent()) == 1
+        assert time.perf_counter_ns() >= deadline_ns
+    finally:
+        timer.close()
+
+
+@requires_timerfd
+def test_periodic_timer_counts_missed_expirations() -> None:
+    """Checks that a wait after several periods reports every expiration."""
+    timer = TimerFd()
+    try:
+        deadline_ns = time.perf_counter_ns() + PERIOD_NS
+        timer.arm(deadline_ns, PERIOD_NS)
+        assert timer.is_armed_for(deadline_ns, PERIOD_NS)
+        time.sleep((MISSED_PERIODS + 0.5) * PERIOD_NS / 1e9)
+        expirations = timer.wait(WakeableEvent())
+        assert expirations >= MISSED_PERIODS
+        assert timer.is_armed_for(deadline_ns + expirations * PERIOD_NS, PERIOD_NS)
+    finally:
+        timer.close()
+
+
+@requires_timerfd
+def test_setting_the_stop_event_interrupts_a_wait() -> None:
+    """Checks that a wait on a far deadline ends as soon as the event is set."""
+    timer = TimerFd()
+    stop_event = WakeableEvent()
+    try:
+        timer.arm(time.perf_counter_ns() + round(10 * STOP_TIMEOUT_SECONDS * 1e9))
+        threading.Timer(STOP_DELAY_SECONDS, stop_event.set).start()
+        start_ns = time.perf_counter_ns()
+        with pytest.raises(InterruptedError):
+            timer.wait(stop_event)
+        assert time.perf_counter_ns() - start_ns < STOP_TIMEOUT_SECONDS * 1e9
+    finally:
+        timer.close()
+        stop_event.close()
+
+
+def test_wakeable_event_is_readable_only_while_set() -> None:
+    """Checks that the event's file descriptor follows setting and clearing it."""
+    wakeable_event = WakeableEvent()
+    try:
+        assert not select.select([wakeable_event], [], [], 0)[0]
+        wakeable_event.set()
+        assert select.select([wakeable_event], [], [], 0)[0]
+        wakeable_event.clear()
+        assert not select.select([wakeable_event], [], [], 0)[0]
+    finally:
+        wakeable_event.close()
+
+
+def test_closed_wakeable_event_releases_its_pipe() -> None:
+    """Checks that closing the event closes its pipe and keeps it usable as a flag."""
+    wakeable_event = WakeableEvent()
+    read_fd = wakeable_event.fileno()
+    wakeable_event.close()
+    with pytest.raises(OSError):
+        os.fstat(read_fd)
+    wakeable_event.set()
+    assert wakeable_event.is_set()
+    wakeable_event.clear()
+    wakeable_event.close()
@@ -0,0 +1,123 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests the timing engine's policies and spin threshold calibration."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import timing
+from src.core.timing import NANOSECONDS_PER_SECOND, TimingEngine, TimingPolicy
+
+TYPICAL_OVERSLEEP_NS: int = 100_000
+OUTLIER_OVERSLEEP_NS: int = 3_000_000
+WAIT_NS: int = 2_000_000
+WAITS_PER_POLICY: int = 5
+
+
+class FakeClock:
+    """A clock whose timed waits each oversleep by the next of the provided amounts."""
+
+    def __init__(self, oversleeps_ns: list[int]) -> None:
+        self.__now_ns: int = 0
+        self.__oversleeps_ns: list[int] = oversleeps_ns
+        self.__waits: int = 0
+
+    @property
+    def waits(self) -> int:
+        """Returns the number of timed waits so far."""
+        return self.__waits
+
+    def perf_counter_ns(self) -> int:
+        """Returns the current fake time."""
+        return self.__now_ns
+
+    def wait(self, timeout: float) -> bool:
+        """Advances the fake time past the timeout by the next oversleep."""
+        oversleep_ns = self.__oversleeps_ns[self.__waits % len(self.__oversleeps_ns)]
+        self.__now_ns += round(timeout * NANOSECONDS_PER_SECOND) + oversleep_ns
+        self.__waits += 1
+        return False
+
+
+def _calibrate(monkeypatch: pytest.MonkeyPatch, oversleeps_ns: list[int]) -> int:
+    """Returns a fresh calibration measured against the fake clock."""
+    fake_clock = FakeClock(oversleeps_ns)
+    monkeypatch.setattr(timing, "time", fake_clock)
+    monkeypatch.setattr(timing, "threading", SimpleNamespace(Event=lambda: fake_clock))
+    monkeypatch.setattr(
+        TimingEngine, "_TimingEngine__calibrated_spin_threshold_ns", None
+    )
+    return TimingEngine.calibrate()
+
+
+def test_calibration_covers_the_typical_oversleep(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that the threshold covers the percentile without a rare outlier."""
+    oversleeps_ns = [TYPICAL_OVERSLEEP_NS] * (TimingEngine.CALIBRATION_SAMPLES - 1)
+    spin_threshold_ns = _calibrate(monkeypatch, [*oversleeps_ns, OUTLIER_OVERSLEEP_NS])
+    assert spin_threshold_ns == (
+        TYPICAL_OVERSLEEP_NS + TimingEngine.SPIN_THRESHOLD_MARGIN_NS
+    )
+
+
+def test_calibration_is_clamped(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Checks that the threshold stays within its minimum and maximum."""
+    assert _calibrate(monkeypatch, [0]) == TimingEngine.MIN_SPIN_THRESHOLD_NS
+    assert (
+        _calibrate(monkeypatch, [2 * TimingEngine.MAX_SPIN_THRESHOLD_NS])
+        == TimingEngine.MAX_SPIN_THRESHOLD_NS
+    )
+
+
+def test_calibration_is_measured_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Checks that later calibrations and engines reuse the first measurement."""
+    spin_threshold_ns = _calibrate(monkeypatch, [TYPICAL_OVERSLEEP_NS])
+    fake_clock = timing.time
+    assert isinstance(fake_clock, FakeClock)
+    waits = fake_clock.waits
+    assert TimingEngine.calibrate() == spin_threshold_ns
+    assert TimingEngine(TimingPolicy.HYBRID).spin_threshold_ns == spin_threshold_ns
+    assert fake_clock.waits == waits
+
+
+@pytest.mark.parametrize("policy", list(TimingPolicy))
+def test_waits_never_end_before_the_deadline(policy: TimingPolicy) -> None:
+    """Checks that every policy waits at least until each deadline."""
+    timing_engine = TimingEngine(policy)
+    try:
+        for _ in range(WAITS_PER_POLICY):
+            deadline_ns = time.perf_counter_ns() + WAIT_NS
+            timing_engine.wait_until(deadline_ns)
+            assert time.perf_counter_ns() >= deadline_ns
+    finally:
+        timing_engine.close()
+
+
+@pytest.mark.parametrize("policy", list(TimingPolicy))
+def test_setting_the_stop_event_interrupts_a_wait(policy: TimingPolicy) -> None:
+    """Checks that every policy ends a long wait once the stop event is set."""
+    stop_event = threading.Event()
+    timing_engine = TimingEngine(policy, stop_event=stop_event)
+    threading.Timer(WAIT_NS / NANOSECONDS_PER_SECOND, stop_event.set).start()
+    try:
+        with pytest.raises(InterruptedError):
+            timing_engine.wait(NANOSECONDS_PER_SECOND)
+    finally:
+        timing_engine.close()
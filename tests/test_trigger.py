@@ -0,0 +1,154 @@
+# Copyright (C) 2025  Cayman Freeman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests how the pixel trigger gates click events on a screen region's colour."""
+
+import threading
+from typing import Optional, override
+
+import numpy as np
+import pytest
+from pynput.mouse import Button as MouseButton
+
+from src.core import trigger
+from src.core.backends import RecordingBackend
+from src.core.click_worker import ClickWorker, WorkerInputs
+from src.core.screen import ScreenCapture, ScreenRegion
+from src.core.timing import TimingEngine
+from src.core.trigger import PixelTrigger, PixelTriggerSettings
+
+REGION: ScreenRegion = ScreenRegion(0, 0, 4, 2)
+COLOUR: tuple[int, int, int] = (255, 128, 0)
+POLL_RATE: float = 2000.0
+POLLS_PER_MATCH: int = 3
+
+
+class FakeScreenCapture(ScreenCapture):
+    """
+    A screen capture that shows the trigger colour on every few captures
+    and black otherwise.
+    """
+
+    def __init__(self, region: ScreenRegion, polls_per_match: int) -> None:
+        super().__init__(region)
+        self.__polls_per_match: int = polls_per_match
+        self.__captures: int = 0
+        self.__black_frame: np.ndarray = np.zeros(
+            (region.height, region.width, 4), dtype=np.uint8
+        )
+        self.__colour_frame: np.ndarray = _frame(region, COLOUR)
+
+    @property
+    @override
+    def screen_size(self) -> tuple[int, int]:
+        """Returns the size of the captured region as the whole screen."""
+        return self.region.width, self.region.height
+
+    @override
+    def capture(self) -> np.ndarray:
+        """Returns the colour frame on every few captures, otherwise black."""
+        self.__captures += 1
+        if self.__captures % self.__polls_per_match == 0:
+            return self.__colour_frame
+        return self.__black_frame
+
+
+def _frame(region: ScreenRegion, colour: tuple[int, int, int]) -> np.ndarray:
+    """Returns a BGRX frame of the region filled with the RGB colour."""
+    frame = np.zeros((region.height, region.width, 4), dtype=np.uint8)
+    frame[..., :3] = colour[::-1]
+    return frame
+
+
+def _settings(tolerance: int = 0, min_fraction: float = 1.0) -> PixelTriggerSettings:
+    """Returns trigger settings for the test region and colour."""
+    return PixelTriggerSettings(REGION, COLOUR, tolerance, min_fraction, POLL_RATE)
+
+
+def _is_matching(settings: PixelTriggerSettings, frame: np.ndarray) -> bool:
+    """Returns whether a trigger with the settings matches the frame."""
+    return PixelTrigger(settings, FakeScreenCapture(REGION, 1)).is_matching(frame)
+
+
+def test_is_matching_applies_the_tolerance() -> None:
+    """Checks that channels within the tolerance of the colour still match."""
+    frame = _frame(REGION, (250, 133, 5))
+    assert not _is_matching(_settings(tolerance=4), frame)
+    assert _is_matching(_settings(tolerance=5), frame)
+
+
+def test_is_matching_requires_the_minimum_fraction() -> None:
+    """Checks that enough of the region's pixels must match for the trigger."""
+    frame = _frame(REGION, COLOUR)
+    frame[0, :, :3] = 0
+    assert not _is_matching(_settings(min_fraction=0.75), frame)
+    assert _is_matching(_settings(min_fraction=0.5), frame)
+
+
+def test_wait_for_match_polls_until_the_region_matches() -> None:
+    """Checks that the trigger keeps polling until a capture matches."""
+    pixel_trigger = PixelTrigger(
+        _settings(), FakeScreenCapture(REGION, POLLS_PER_MATCH)
+    )
+    pixel_trigger.wait_for_match(TimingEngine())
+    assert pixel_trigger.stats.polls == POLLS_PER_MATCH
+
+
+def test_wait_for_match_is_interrupted_by_the_stop_event() -> None:
+    """Checks that a stopped timing engine ends a wait that never matches."""
+    stop_event = threading.Event()
+    stop_event.set()
+    pixel_trigger = PixelTrigger(_settings(), FakeScreenCapture(REGION, 2))
+    with pytest.raises(InterruptedError):
+        pixel_trigger.wait_for_match(TimingEngine(stop_event=stop_event))
+
+
+def test_click_worker_clicks_only_after_each_match(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that each triggered click event waits for its own matching capture."""
+
+    def create_screen_capture(
+        region: ScreenRegion, display_name: Optional[str] = None
+    ) -> ScreenCapture:
+        """Returns the fake screen capture for the trigger's region."""
+        return FakeScreenCapture(region, POLLS_PER_MATCH)
+
+    monkeypatch.setattr(trigger, "create_screen_capture", create_screen_capture)
+    input_backend = RecordingBackend()
+    click_worker = ClickWorker(threading.Event(), threading.Event())
+    click_worker.start(
+        WorkerInputs(
+            interval=0.0,
+            hold_length=0.0,
+            clicks_per_event=1,
+            event_count=2,
+            mouse_button=MouseButton.left,
+            location=(None, None),
+            is_using_location_x=False,
+            is_using_location_y=False,
+            is_using_held_clicks=False,
+            is_continuous=False,
+            input_backend=input_backend,
+            pixel_trigger=_settings(),
+        )
+    )
+
+    trigger_stats = click_worker.trigger_stats
+    assert trigger_stats is not None
+    assert trigger_stats.polls == 2 * POLLS_PER_MATCH
+    assert trigger_stats.matches == 2
+    presses = [record for record in input_backend.records if record.action == "press"]
+    assert len(presses) == 2